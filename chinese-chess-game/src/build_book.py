@@ -0,0 +1,65 @@
+import argparse
+import random
+import sys
+from game.board import Board
+from utils.book import BookBuilder, DEFAULT_BOOK_PATH, format_iccs
+from utils.ComputerPlayer import ComputerPlayer
+from utils.const import COLOR_RED, COLOR_BLACK
+
+# Tạo sách khai cuộc nhị phân từ biên bản ván cờ (ký hiệu ICCS) và/hoặc các ván máy tự đấu.
+
+def self_play_game(depth, plies, random_plies, rng):
+    """
+    Cho máy tự đấu plies nửa nước, random_plies nửa nước đầu được chọn ngẫu nhiên để các ván khác nhau.
+    :return: Danh sách nước đi
+    """
+    board = Board()
+    board.initialize_board()
+    players = {
+        color: ComputerPlayer(is_red=color == COLOR_RED, depth=depth, book_path=None)
+        for color in (COLOR_RED, COLOR_BLACK)
+    }
+    moves = []
+    try:
+        for ply in range(plies):
+            legal_moves = board.generate_legal_moves()
+            if not legal_moves:
+                break
+            if ply < random_plies:
+                move = rng.choice(legal_moves)
+            else:
+                move = players[board.side_to_move].get_move(board)
+            board.make_move(move)
+            moves.append(move)
+    finally:
+        for player in players.values():
+            player.close()  # Bảng tàn cục đã ánh xạ bộ nhớ, bộ nhớ dùng chung của tìm kiếm song song
+    return moves
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tạo sách khai cuộc từ biên bản ván cờ và ván tự đấu.")
+    parser.add_argument("records", nargs="*", help="Tệp biên bản: mỗi dòng một ván gồm các nước ICCS")
+    parser.add_argument("-o", "--output", default=DEFAULT_BOOK_PATH, help="Tệp sách đầu ra")
+    parser.add_argument("--max-ply", type=int, default=20, help="Số nửa nước đầu mỗi ván được đưa vào sách")
+    parser.add_argument("--min-weight", type=int, default=1, help="Bỏ các nước có trọng số nhỏ hơn")
+    parser.add_argument("--selfplay", type=int, default=0, help="Số ván máy tự đấu thêm vào sách")
+    parser.add_argument("--depth", type=int, default=3, help="Độ sâu tìm kiếm khi tự đấu")
+    parser.add_argument("--random-plies", type=int, default=1,
+                        help="Số nửa nước đầu được chọn ngẫu nhiên khi tự đấu (không đưa vào sách)")
+    parser.add_argument("--seed", type=int, default=None, help="Hạt giống ngẫu nhiên cho ván tự đấu")
+    args = parser.parse_args(argv)
+
+    builder = BookBuilder(args.max_ply)
+    for path in args.records:
+        print(f"{path}: {builder.add_record_file(path)} ván")
+    rng = random.Random(args.seed)
+    for game in range(args.selfplay):
+        moves = self_play_game(args.depth, args.max_ply, args.random_plies, rng)
+        builder.add_game(moves, record_from=args.random_plies)
+        print(f"tự đấu {game + 1}: {' '.join(format_iccs(move) for move in moves)}")
+    count = builder.write(args.output, args.min_weight)
+    print(f"Đã ghi {count} bản ghi vào {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import argparse
+import sys
+import time
+from utils.tablebase import TablebaseGenerator, DEFAULT_TABLEBASE_DIR, GENERAL, material_name, parse_material, canonical_material
+
+# Tạo bảng tàn cục bằng phân tích ngược cho các tổ hợp ít quân (các bảng con được tạo kèm).
+
+# Mặc định: mọi tổ hợp một quân (ngoài Tướng) chống Tướng trơ trọi
+DEFAULT_MATERIALS = [material_name([GENERAL, kind], [GENERAL]) for kind in range(GENERAL + 1, GENERAL + 7)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tạo bảng tàn cục (thắng/hòa/thua và số nửa nước đến khi chiếu hết).")
+    parser.add_argument("materials", nargs="*", default=DEFAULT_MATERIALS,
+                        help="Tổ hợp quân, ví dụ KRvK KNvKA (mặc định: các tổ hợp 3 quân)")
+    parser.add_argument("-o", "--output", default=DEFAULT_TABLEBASE_DIR, help="Thư mục chứa bảng")
+    args = parser.parse_args(argv)
+
+    generator = TablebaseGenerator(args.output, log=print)
+    for name in args.materials:
+        try:
+            red_kinds, black_kinds = parse_material(name)
+        except ValueError as error:
+            print(error)
+            return 1
+        start = time.perf_counter()
+        generator.table(canonical_material(red_kinds, black_kinds)[0])
+        print(f"{name}: {time.perf_counter() - start:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,51 @@
 import pygame
 from game.pieces import General, Advisor, Elephant, Horse, Chariot, Cannon, Soldier
-from utils.const import BOARD_ROWS, BOARD_COLS, COLOR_BLACK, COLOR_RED, TYPE_GENERAL
-from game.rules import validate_move, is_check_condition, set_valid_moves, remove_piece_from_board, place_piece_on_board
+from utils.const import BOARD_ROWS, BOARD_COLS, COLOR_BLACK, COLOR_RED, TYPE_GENERAL, FEN_PIECE_LETTERS
+from game.rules import (
+    validate_move, is_check_condition, set_valid_moves, remove_piece_from_board, place_piece_on_board,
+    move_piece_on_board, assign_valid_mask, is_square_attacked
+)
+from game.position import Position, square_of, SQUARE_POSITIONS, EMPTY, color_of_code, type_of_code
+from game.movegen import (
+    generate_legal_moves, generate_legal_captures, generate_legal_quiets, is_legal_move, has_legal_move
+)
+
+# Lớp quân cờ theo ký hiệu FEN (chấp nhận thêm "e"/"h" cho Tượng/Mã như một số phần mềm khác)
+FEN_PIECE_CLASSES = {
+    FEN_PIECE_LETTERS[piece_class(COLOR_RED).type]: piece_class
+    for piece_class in (General, Advisor, Elephant, Horse, Chariot, Cannon, Soldier)
+}
+FEN_PIECE_CLASSES.update({"e": Elephant, "h": Horse})
+
+# Lớp quân cờ theo loại quân
+PIECE_CLASSES = {
+    piece_class(COLOR_RED).type: piece_class
+    for piece_class in (General, Advisor, Elephant, Horse, Chariot, Cannon, Soldier)
+}
+
+# Các thuộc tính suy ra từ trạng thái gọn; sau clone/restore chúng được dựng lại khi truy cập lần đầu
+DERIVED_ATTRIBUTES = frozenset(("board", "red_pieces", "black_pieces", "general_positions", "attack_maps", "mobility"))
+
+class UndoRecord:
+    """
+    Thông tin cần thiết để hoàn tác một nước đi đã thực hiện bằng Board.make_move.
+    """
+    __slots__ = (
+        "start_pos", "end_pos", "piece", "can_mask", "captured", "captured_index",
+        "captured_can_mask", "general_position", "core_undo", "journal"
+    )
+
+    def __init__(self, start_pos, end_pos, piece, captured):
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.piece = piece
+        self.can_mask = piece.can_mask
+        self.captured = captured
+        self.captured_index = -1
+        self.captured_can_mask = captured.can_mask if captured else 0
+        self.general_position = None
+        self.core_undo = None  # Giá trị trả về của Position.move
+        self.journal = []  # Danh sách (quân cờ, valid_mask cũ) đã bị tính lại
 
 class Board:
     def __init__(self):
@@ -10,14 +54,93 @@ class Board:
             COLOR_BLACK: (0, 4),  # Vị trí ban đầu của Tướng đen
             COLOR_RED: (9, 4)     # Vị trí ban đầu của Tướng đỏ
         }
-        self.simulator_pieces = None
         self.black_pieces = []  # Danh sách các quân cờ màu đen
         self.red_pieces = []    # Danh sách các quân cờ màu đỏ
+        self.position = Position()  # Trạng thái gọn: mảng 90 ô chứa mã quân
+        self.undo_stack = []  # Ngăn xếp UndoRecord của các nước đi bằng make_move
+        self.journal = None   # Nhật ký valid_mask cũ trong lúc make_move đang chạy
+        self.fullmove_number = 1  # Số nước của ván như trong FEN: bắt đầu từ 1, tăng sau mỗi nước của bên đen
+        self._reset_attack_maps()
+
+    def __getattr__(self, name):
+        # Chỉ được gọi khi thuộc tính chưa tồn tại: dựng lại lưới quân cờ sau clone/restore
+        if name in DERIVED_ATTRIBUTES:
+            self._materialize()
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def clone(self):
+        """
+        Tạo bản sao độc lập của bàn cờ bằng cách chỉ sao chép trạng thái gọn.
+        Lưới quân cờ, danh sách quân và nước đi hợp lệ của bản sao được dựng lại khi cần đến.
+        Ngăn xếp hoàn tác không được sao chép.
+        """
+        other = Board.__new__(Board)
+        other.position = self.position.copy()
+        other.undo_stack = []
+        other.journal = None
+        other.fullmove_number = self.fullmove_number
+        return other
+
+    def snapshot(self):
+        """
+        Chụp lại thế cờ hiện tại (trạng thái gọn và số nước) để khôi phục bằng restore.
+        """
+        return self.position.copy(), self.fullmove_number
+
+    def restore(self, snapshot):
+        """
+        Khôi phục thế cờ từ snapshot. Lưới quân cờ được dựng lại khi truy cập lần đầu;
+        ngăn xếp hoàn tác bị xóa vì các nước đi cũ không còn áp dụng được.
+        """
+        position, self.fullmove_number = snapshot
+        self.position = position.copy()
+        self.undo_stack = []
+        self.journal = None
+        for name in DERIVED_ATTRIBUTES:
+            self.__dict__.pop(name, None)
+
+    def _materialize(self):
+        """
+        Dựng lại lưới quân cờ, danh sách quân, vị trí Tướng và nước đi hợp lệ từ trạng thái gọn.
+        """
+        self.board = [[None for _ in range(BOARD_COLS)] for _ in range(BOARD_ROWS)]
+        self.general_positions = {}
+        self.black_pieces = []
+        self.red_pieces = []
+        self._reset_attack_maps()
+        for square, code in enumerate(self.position.squares):
+            if code == EMPTY:
+                continue
+            row, col = SQUARE_POSITIONS[square]
+            piece = PIECE_CLASSES[type_of_code(code)](color_of_code(code))
+            piece.set_position((row, col))
+            self.board[row][col] = piece
+            self.get_pieces_by_color(piece.color).append(piece)
+            if piece.type == TYPE_GENERAL:
+                self.general_positions[piece.color] = (row, col)
+        for piece in self.get_all_pieces():
+            set_valid_moves(piece, self)
+
+    @property
+    def side_to_move(self):
+        """
+        Bên đến lượt đi (COLOR_RED hoặc COLOR_BLACK), đổi sau mỗi make_move/unmake_move.
+        """
+        return self.position.side_to_move
+
+    @property
+    def zobrist_key(self):
+        """
+        Khóa Zobrist 64 bit của thế cờ hiện tại (gồm cả lượt đi), được cập nhật dần.
+        """
+        return self.position.key
 
     def initialize_board(self):
         """
         Khởi tạo bàn cờ tướng với các quân cờ ở vị trí ban đầu.
         """
+        self.clear()
         place_piece_on_board(self, Soldier(COLOR_BLACK), (3, 4))
         place_piece_on_board(self, General(COLOR_BLACK), (0, 4))
         place_piece_on_board(self, General(COLOR_RED), (9, 4))
@@ -55,6 +178,76 @@ class Board:
         place_piece_on_board(self, Soldier(COLOR_RED), (6, 6))
         place_piece_on_board(self, Soldier(COLOR_RED), (6, 8))
 
+    def load_fen(self, fen):
+        """
+        Đặt bàn cờ theo chuỗi FEN (vị trí quân, lượt đi và số nước; các trường còn lại bị bỏ qua).
+        :param fen: Ví dụ "rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w - - 0 1"
+        """
+        fields = fen.split()
+        rows = fields[0].split("/")
+        if len(rows) != BOARD_ROWS:
+            raise ValueError(f"FEN phải có {BOARD_ROWS} hàng: {fen}")
+        self.clear()
+        for row, text in enumerate(rows):
+            col = 0
+            for char in text:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                piece_class = FEN_PIECE_CLASSES.get(char.lower())
+                if piece_class is None or col >= BOARD_COLS:
+                    raise ValueError(f"FEN không hợp lệ tại hàng {row}: {text}")
+                place_piece_on_board(self, piece_class(COLOR_RED if char.isupper() else COLOR_BLACK), (row, col))
+                col += 1
+            if col != BOARD_COLS:
+                raise ValueError(f"FEN không hợp lệ tại hàng {row}: {text}")
+        if len(fields) > 1 and fields[1] == "b":
+            self.position.switch_side()
+        if len(fields) > 5 and fields[5].isdigit():
+            self.fullmove_number = max(1, int(fields[5]))
+
+    def to_fen(self):
+        """
+        Trả về chuỗi FEN của thế cờ hiện tại.
+        """
+        rows = []
+        for row in self.board:
+            text, empty = "", 0
+            for piece in row:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_PIECE_LETTERS[piece.type]
+                text += letter.upper() if piece.color == COLOR_RED else letter
+            rows.append(text + (str(empty) if empty else ""))
+        side = "w" if self.side_to_move == COLOR_RED else "b"
+        return f"{'/'.join(rows)} {side} - - 0 {self.fullmove_number}"
+
+    def clear(self):
+        """
+        Xóa toàn bộ quân cờ trên bàn cờ (cả lưới quân cờ lẫn trạng thái gọn).
+        """
+        self.board = [[None for _ in range(BOARD_COLS)] for _ in range(BOARD_ROWS)]
+        self.black_pieces = []
+        self.red_pieces = []
+        self.general_positions = {}  # Chưa đặt Tướng nào: get_general_position trả về None
+        self.position.clear()
+        self.undo_stack = []
+        self.fullmove_number = 1
+        self._reset_attack_maps()
+
+    def _reset_attack_maps(self):
+        """
+        Bản đồ tấn công của từng bên: attack_maps[color][square] là số quân bên color
+        có ô đó trong valid_mask; mobility[color] là tổng số nước đi của bên đó.
+        Cả hai được cập nhật dần qua rules.assign_valid_mask.
+        """
+        self.attack_maps = {COLOR_RED: [0] * (BOARD_ROWS * BOARD_COLS), COLOR_BLACK: [0] * (BOARD_ROWS * BOARD_COLS)}
+        self.mobility = {COLOR_RED: 0, COLOR_BLACK: 0}
+
     def is_checkmate(self, color):
         """
         Kiểm tra xem bên nào bị chiếu hết hay không.
@@ -62,36 +255,98 @@ class Board:
         :return: True nếu bị chiếu hết, False nếu không
         """
         if is_check_condition(self, color):
-            pieces = self.get_pieces_by_color(color)
-            for piece in pieces:
-                # Lấy danh sách nước đi hợp lệ của quân cờ
-                valid_moves = piece.valid_positions.copy()
-                current_pos = piece.current_position
-                for move in valid_moves:
-                    valid = self.simulator_move(current_pos, move)
-                    self.undo_simulator_move(current_pos, move)
-                    if valid:
-                        return False
-            return True
+            return not has_legal_move(self.position, color)
         return False
+
     def is_stalemate(self, color):
         """
         Kiểm tra xem bên nào bị cờ hòa hay không.
         :param color: Màu sắc của quân cờ (COLOR_BLACK hoặc COLOR_RED)
         :return: True nếu bị cờ hòa, False nếu không
         """
-        pieces = self.get_pieces_by_color(color)
-        for piece in pieces:
-            # Lấy danh sách nước đi hợp lệ của quân cờ
-            valid_moves = piece.valid_positions.copy()
-            current_pos = piece.current_position
-            for move in valid_moves:
-                valid = self.simulator_move(current_pos, move)
-                self.undo_simulator_move(current_pos, move)
-                if valid:
-                    return False
-        return True
-    
+        return not has_legal_move(self.position, color)
+
+    def generate_legal_moves(self, color=None):
+        """
+        Sinh tất cả nước đi hợp lệ của một bên (mặc định là bên đến lượt).
+        Thông tin chiếu, quân bị ghim và ngòi Pháo được tính một lần cho cả thế cờ.
+        :return: Danh sách nước đi dạng ((row, col), (row, col))
+        """
+        if color is None:
+            color = self.side_to_move
+        return [
+            (SQUARE_POSITIONS[from_square], SQUARE_POSITIONS[to_square])
+            for from_square, to_square in generate_legal_moves(self.position, color)
+        ]
+
+    def perft(self, depth):
+        """
+        Đếm số thế cờ lá sau depth nước đi hợp lệ (kiểm tra tính đúng và tốc độ sinh nước đi).
+        Mỗi nút đi qua make_move/unmake_move nên cập nhật dần của rules.py cũng được kiểm tra.
+        :param depth: Độ sâu (số nửa nước)
+        :return: Số nút lá
+        """
+        if depth == 0:
+            return 1
+        moves = self.generate_legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.make_move(move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def perft_divide(self, depth):
+        """
+        Chế độ divide của perft: số nút lá theo từng nước đi ở gốc, dùng để khoanh vùng lỗi.
+        :return: Dict {move: số nút lá}
+        """
+        result = {}
+        for move in self.generate_legal_moves():
+            self.make_move(move)
+            result[move] = self.perft(depth - 1)
+            self.unmake_move()
+        return result
+
+    def generate_captures(self, color=None):
+        """
+        Sinh các nước ăn quân hợp lệ của một bên (mặc định là bên đến lượt), dùng cho tìm kiếm tĩnh.
+        :return: Danh sách nước đi dạng ((row, col), (row, col))
+        """
+        if color is None:
+            color = self.side_to_move
+        return [
+            (SQUARE_POSITIONS[from_square], SQUARE_POSITIONS[to_square])
+            for from_square, to_square in generate_legal_captures(self.position, color)
+        ]
+
+    def generate_quiet_moves(self, color=None):
+        """
+        Sinh các nước đi hợp lệ không ăn quân của một bên (mặc định là bên đến lượt).
+        :return: Danh sách nước đi dạng ((row, col), (row, col))
+        """
+        if color is None:
+            color = self.side_to_move
+        return [
+            (SQUARE_POSITIONS[from_square], SQUARE_POSITIONS[to_square])
+            for from_square, to_square in generate_legal_quiets(self.position, color)
+        ]
+
+    def is_legal_move(self, move, color=None):
+        """
+        Kiểm tra một nước đi ((row, col), (row, col)) có hợp lệ cho một bên hay không
+        mà không sinh toàn bộ nước đi (dùng cho nước đi từ bảng chuyển vị, killer moves).
+        """
+        if color is None:
+            color = self.side_to_move
+        (start_row, start_col), (end_row, end_col) = move
+        if not (0 <= start_row < BOARD_ROWS and 0 <= start_col < BOARD_COLS
+                and 0 <= end_row < BOARD_ROWS and 0 <= end_col < BOARD_COLS):
+            return False
+        return is_legal_move(self.position, color, (square_of(start_row, start_col), square_of(end_row, end_col)))
+
     def is_check(self, color):
         """
         Kiểm tra xem bên nào đang bị chiếu hay không.
@@ -100,9 +355,97 @@ class Board:
         """
         return is_check_condition(self, color)
 
+    def is_square_attacked(self, position, by_color):
+        """
+        Kiểm tra xem ô position có bị bên by_color tấn công hay không, tra từ bản đồ tấn công.
+        :param position: Tuple (row, col)
+        :param by_color: Màu của bên tấn công (COLOR_BLACK hoặc COLOR_RED)
+        """
+        return is_square_attacked(self, position, by_color)
+
+    def attack_count(self, position, by_color):
+        """
+        Trả về số quân bên by_color đang tấn công ô position.
+        """
+        row, col = position
+        return self.attack_maps[by_color][square_of(row, col)]
+
+    def make_move(self, move):
+        """
+        Thực hiện một nước đi và đẩy thông tin hoàn tác vào ngăn xếp.
+        Nước đi phải nằm trong valid_positions của quân cờ; hàm không kiểm tra chiếu.
+        Chỉ các quân cờ bị ảnh hưởng bởi hai ô thay đổi mới được tính lại nước đi.
+        :param move: Tuple (start_pos, end_pos)
+        :return: UndoRecord dùng cho unmake_move
+        """
+        start_pos, end_pos = move
+        piece = self.board[start_pos[0]][start_pos[1]]
+        record = UndoRecord(start_pos, end_pos, piece, self.board[end_pos[0]][end_pos[1]])
+        if piece.type == TYPE_GENERAL:
+            record.general_position = self.general_positions[piece.color]
+
+        self.journal = record.journal
+        record.captured_index, record.core_undo = move_piece_on_board(self, start_pos, end_pos)
+        self.journal = None
+        if self.position.side_to_move == COLOR_BLACK:
+            self.fullmove_number += 1
+        self.position.switch_side()
+
+        self.undo_stack.append(record)
+        return record
+
+    def unmake_move(self, record=None):
+        """
+        Hoàn tác nước đi trên đỉnh ngăn xếp, khôi phục ô cờ, danh sách quân,
+        vị trí Tướng và nước đi đã lưu mà không phải tính lại.
+        :param record: UndoRecord trả về từ make_move (mặc định là nước đi gần nhất)
+        """
+        top = self.undo_stack.pop()
+        if record is not None and record is not top:
+            raise ValueError("unmake_move phải hoàn tác theo thứ tự ngược với make_move")
+        record = top
+        start_pos, end_pos = record.start_pos, record.end_pos
+        piece, captured = record.piece, record.captured
+
+        # Khôi phục nước đi hợp lệ đã bị tính lại (theo thứ tự ngược), kể cả của quân bị ăn
+        for other_piece, valid_mask in reversed(record.journal):
+            assign_valid_mask(other_piece, self, valid_mask)
+
+        # Khôi phục quân di chuyển
+        self.board[start_pos[0]][start_pos[1]] = piece
+        self.board[end_pos[0]][end_pos[1]] = captured
+        piece.current_position = start_pos
+        piece.can_mask = record.can_mask
+        if record.general_position is not None:
+            self.general_positions[piece.color] = record.general_position
+
+        # Khôi phục quân bị ăn
+        if captured is not None:
+            captured.current_position = end_pos
+            captured.can_mask = record.captured_can_mask
+            self.get_pieces_by_color(captured.color).insert(record.captured_index, captured)
+        self.position.unmove(square_of(*start_pos), square_of(*end_pos), *record.core_undo)
+        self.position.switch_side()
+        if self.position.side_to_move == COLOR_BLACK:
+            self.fullmove_number -= 1
+
+    def make_null_move(self):
+        """
+        Nước đi rỗng: chỉ đổi lượt đi (và khóa Zobrist), không di chuyển quân nào.
+        Dùng cho null-move pruning; không đẩy vào ngăn xếp hoàn tác, hoàn tác bằng unmake_null_move.
+        """
+        self.position.switch_side()
+
+    def unmake_null_move(self):
+        """
+        Hoàn tác make_null_move.
+        """
+        self.position.switch_side()
+
     def simulator_move(self, start_pos, end_pos):
         """
         Giả lập di chuyển quân cờ từ start_pos đến end_pos.
+        Nước đi được đẩy vào ngăn xếp hoàn tác; gọi undo_simulator_move để hoàn tác.
         :param start_pos: Tuple (row, col) của vị trí bắt đầu.
         :param end_pos: Tuple (row, col) của vị trí kết thúc.
         :return: True nếu nước đi hợp lệ, False nếu không hợp lệ.
@@ -118,12 +461,9 @@ class Board:
         # Kiểm tra xem vị trí bắt đầu và kết thúc có giống nhau không
         if start_pos == end_pos:
             return False
-        
-        start_row, start_col = start_pos
-        end_row, end_col = end_pos
 
         # Lấy quân cờ tại vị trí bắt đầu
-        piece = self.get_piece_at(start_row, start_col)
+        piece = self.get_piece_at(*start_pos)
         if piece is None:
             return False  # Không có quân cờ để di chuyển
 
@@ -131,60 +471,35 @@ class Board:
         if not validate_move(start_pos, end_pos, self):
             return False  # Nước đi không hợp lệ
 
-        # Lấy quân cờ tại vị trí kết thúc
-        self.simulator_pieces = self.get_piece_at(end_row, end_col)
-        # Di chuyển quân cờ
-        remove_piece_from_board(self, (start_row, start_col))  # Xóa quân cờ tại vị trí bắt đầu
-        place_piece_on_board(self, piece, (end_row, end_col))  # Đặt quân cờ vào vị trí mới
-        # Kiểm tra xem nước đi có khiến bên mình bị chiếu không
-        return is_check_condition(self, piece.color)
-    
+        self.make_move((start_pos, end_pos))
+        # Nước đi hợp lệ nếu không khiến bên mình bị chiếu
+        return not is_check_condition(self, piece.color)
+
     def undo_simulator_move(self, start_pos, end_pos):
-        if self.simulator_pieces is not None:
-            end_row, end_col = end_pos
-            # Lấy quân cờ tại vị trí bắt đầu
-            piece = self.get_piece_at(end_row, end_col)
-            remove_piece_from_board(self, end_pos)
-            place_piece_on_board(self, piece, start_pos)
-            # Đặt lại quân cờ tại vị trí cũ
-            place_piece_on_board(self, self.simulator_pieces, end_pos)
-            self.simulator_pieces = None
+        """
+        Hoàn tác nước đi đã giả lập bằng simulator_move (kể cả khi không ăn quân).
+        """
+        if self.undo_stack and self.undo_stack[-1].start_pos == start_pos and self.undo_stack[-1].end_pos == end_pos:
+            self.unmake_move()
 
     def would_be_check(self, start_pos, end_pos, color):
         """Kiểm tra nếu di chuyển này sẽ gây chiếu tướng"""
-        # Lưu trạng thái hiện tại
-        moving_piece = self.get_piece_at(*start_pos)
-        captured_piece = self.get_piece_at(*end_pos)
-        
-        # Giả lập nước đi
-        self.board[end_pos[0]][end_pos[1]] = moving_piece
-        self.board[start_pos[0]][start_pos[1]] = None
-        if moving_piece:
-            moving_piece.current_position = end_pos
-        
-        # Kiểm tra chiếu tướng
+        self.make_move((start_pos, end_pos))
         result = self.is_check(color)
-        
-        # Hoàn tác nước đi
-        self.board[start_pos[0]][start_pos[1]] = moving_piece
-        self.board[end_pos[0]][end_pos[1]] = captured_piece
-        if moving_piece:
-            moving_piece.current_position = start_pos
-        
+        self.unmake_move()
         return result
+
     def move_piece(self, start_pos, end_pos):
         """
         Di chuyển quân cờ từ start_pos đến end_pos nếu hợp lệ.
         Nếu nước đi khiến bên mình bị chiếu, undo nước đi.
+        Nước đi hợp lệ là nước đi của ván cờ: không đẩy vào ngăn xếp hoàn tác.
         :param start_pos: Tuple (row, col) của vị trí bắt đầu.
         :param end_pos: Tuple (row, col) của vị trí kết thúc.
         :return: True nếu nước đi hợp lệ, False nếu không hợp lệ.
         """
-        start_row, start_col = start_pos
-        end_row, end_col = end_pos
-
         # Lấy quân cờ tại vị trí bắt đầu
-        piece = self.get_piece_at(start_row, start_col)
+        piece = self.get_piece_at(*start_pos)
         if piece is None:
             return False  # Không có quân cờ để di chuyển
 
@@ -192,24 +507,16 @@ class Board:
         if not validate_move(start_pos, end_pos, self):
             return False  # Nước đi không hợp lệ
 
-        # Lấy quân cờ tại vị trí kết thúc
-        target_piece = self.get_piece_at(end_row, end_col)
-        # Di chuyển quân cờ
-        remove_piece_from_board(self, (start_row, start_col))  # Xóa quân cờ tại vị trí bắt đầu
-        place_piece_on_board(self, piece, (end_row, end_col))  # Đặt quân cờ vào vị trí mới
+        self.make_move((start_pos, end_pos))
 
         # Kiểm tra xem nước đi có khiến bên mình bị chiếu không
         if is_check_condition(self, piece.color):
             # Undo nước đi nếu bị chiếu
-            remove_piece_from_board(self, (end_row, end_col))
-            place_piece_on_board(self, piece, (start_row, start_col))
-            # Đặt lại quân cờ tại vị trí cũ
-            if target_piece:
-                place_piece_on_board(self, target_piece, (end_row, end_col))
+            self.unmake_move()
             return False
-        if piece.type == TYPE_GENERAL:
-            # Cập nhật vị trí của quân Tướng
-            self.general_positions[piece.color] = (end_row, end_col)
+        # Nước đi đã xác nhận trong ván không bao giờ được hoàn tác: bỏ UndoRecord (và nhật ký
+        # valid_mask giữ tham chiếu tới quân cờ) để ngăn xếp không lớn dần suốt ván
+        self.undo_stack.pop()
         return True
 
     def get_general_position(self, color):
@@ -0,0 +1,87 @@
+from utils.const import (
+    BOARD_ROWS, COLOR_RED,
+    TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER
+)
+
+# Bảng giá trị quân và điểm vị trí dùng cho đánh giá tĩnh.
+# Position cộng dồn các giá trị này (theo góc nhìn bên đỏ) mỗi khi đặt, xóa hay di chuyển quân,
+# nên phần vật chất + vị trí của hàm đánh giá không phải quét lại bàn cờ.
+
+PIECE_VALUES = {
+    TYPE_GENERAL: 10000,
+    TYPE_CHARIOT: 900,
+    TYPE_CANNON: 450,
+    TYPE_HORSE: 300,
+    TYPE_ELEPHANT: 150,
+    TYPE_ADVISOR: 120,
+    TYPE_SOLDIER: {
+        'before_river': 60,
+        'after_river': 100,
+        'near_palace': 80
+    }
+}
+
+POSITION_WEIGHT = 0.8  # Trọng số của điểm vị trí so với giá trị quân
+
+
+def _init_position_scores():
+    """
+    Điểm vị trí theo loại quân, nhìn từ phía quân đỏ (hàng 9 là hàng cuối của đỏ).
+    """
+    base_scores = [
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 10, 20, 10, 0, 0, 0],
+        [0, 0, 10, 20, 30, 20, 10, 0, 0],
+        [0, 10, 20, 30, 40, 30, 20, 10, 0],
+        [0, 20, 30, 40, 50, 40, 30, 20, 0],
+        [0, 10, 20, 30, 40, 30, 20, 10, 0],
+        [0, 0, 10, 20, 30, 20, 10, 0, 0],
+        [0, 0, 0, 10, 20, 10, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0]
+    ]
+    scores = {
+        TYPE_CHARIOT: base_scores,
+        TYPE_CANNON: [[int(score * 0.8) for score in row] for row in base_scores],
+        TYPE_HORSE: [[int(score * 0.7) for score in row] for row in base_scores],
+        TYPE_ELEPHANT: [[int(score * 0.5) for score in row] for row in base_scores],
+        TYPE_ADVISOR: [[int(score * 0.3) for score in row] for row in base_scores],
+        TYPE_SOLDIER: [[int(score * 0.6) for score in row] for row in base_scores],
+        TYPE_GENERAL: [[0] * 9 for _ in range(10)]
+    }
+    for r in range(7, 10):
+        for c in range(3, 6):
+            scores[TYPE_GENERAL][r][c] = 20
+    for r in range(0, 3):
+        for c in range(3, 6):
+            scores[TYPE_GENERAL][r][c] = 20
+    return scores
+
+
+POSITION_SCORES = _init_position_scores()
+
+
+def piece_value(piece_type, color, row):
+    """
+    Giá trị vật chất của một quân; giá trị Tốt phụ thuộc vào việc đã qua sông hay chưa.
+    """
+    value = PIECE_VALUES[piece_type]
+    if piece_type != TYPE_SOLDIER:
+        return value
+    advanced = BOARD_ROWS - 1 - row if color == COLOR_RED else row  # Số hàng đã tiến (0 ở hàng cuối của mình)
+    if advanced < 5:
+        return value['before_river']
+    if advanced <= 6:
+        return value['after_river']
+    return value['near_palace']
+
+
+def piece_square_score(piece_type, color, row, col):
+    """
+    Giá trị vật chất cộng điểm vị trí của một quân, theo góc nhìn của chính quân đó.
+    Quân đen dùng cùng bảng điểm vị trí với quân đỏ, lật theo chiều dọc.
+    """
+    table_row = row if color == COLOR_RED else BOARD_ROWS - 1 - row
+    position = POSITION_SCORES[piece_type][table_row][col]
+    return int(round(piece_value(piece_type, color, row) + POSITION_WEIGHT * position))
+
@@ -0,0 +1,369 @@
+from utils.const import (
+    BOARD_ROWS, BOARD_COLS, COLOR_BLACK, COLOR_RED,
+    TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER
+)
+from game.position import EMPTY, BLACK_FLAG, TYPE_CODES, ROW_OF, COL_OF
+from game.tables import (
+    RANK_ATTACKS, FILE_ATTACKS, LINE_BITS,
+    GENERAL_MOVES, ADVISOR_MOVES, ELEPHANT_MOVES, HORSE_MOVES, SOLDIER_MOVES,
+    HORSE_ATTACKERS, SOLDIER_ATTACKERS
+)
+
+# Sinh nước đi trực tiếp trên trạng thái gọn (Position). Nước đi là tuple (from_square, to_square).
+
+GENERAL = TYPE_CODES[TYPE_GENERAL]
+ADVISOR = TYPE_CODES[TYPE_ADVISOR]
+ELEPHANT = TYPE_CODES[TYPE_ELEPHANT]
+HORSE = TYPE_CODES[TYPE_HORSE]
+CHARIOT = TYPE_CODES[TYPE_CHARIOT]
+CANNON = TYPE_CODES[TYPE_CANNON]
+SOLDIER = TYPE_CODES[TYPE_SOLDIER]
+
+_RAYS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def opponent_of(color):
+    return COLOR_RED if color == COLOR_BLACK else COLOR_BLACK
+
+
+def generate_pseudo_moves(position, color):
+    """
+    Sinh tất cả nước đi theo luật di chuyển của từng quân (chưa kiểm tra Tướng bị chiếu).
+    :param position: Trạng thái gọn của bàn cờ
+    :param color: Bên đi (COLOR_RED hoặc COLOR_BLACK)
+    :return: Danh sách tuple (from_square, to_square)
+    """
+    squares = position.squares
+    own_flag = BLACK_FLAG if color == COLOR_BLACK else 0
+    moves = []
+    append = moves.append
+    for origin in position.piece_lists[color]:
+        kind = squares[origin] & 7
+        if kind == CHARIOT or kind == CANNON:
+            row, col = ROW_OF[origin], COL_OF[origin]
+            rank_slides, rank_blockers, rank_screens = RANK_ATTACKS[col][position.rank_occ[row]]
+            file_slides, file_blockers, file_screens = FILE_ATTACKS[row][position.file_occ[col]]
+            base = row * BOARD_COLS
+            for c in LINE_BITS[rank_slides]:
+                append((origin, base + c))
+            for r in LINE_BITS[file_slides]:
+                append((origin, r * BOARD_COLS + col))
+            rank_targets, file_targets = (
+                (rank_blockers, file_blockers) if kind == CHARIOT else (rank_screens, file_screens)
+            )
+            for c in LINE_BITS[rank_targets]:
+                if squares[base + c] & BLACK_FLAG != own_flag:
+                    append((origin, base + c))
+            for r in LINE_BITS[file_targets]:
+                dest = r * BOARD_COLS + col
+                if squares[dest] & BLACK_FLAG != own_flag:
+                    append((origin, dest))
+        elif kind == HORSE or kind == ELEPHANT:
+            table = HORSE_MOVES[origin] if kind == HORSE else ELEPHANT_MOVES[color][origin]
+            for dest, block, _ in table:
+                if squares[block] == EMPTY:
+                    target = squares[dest]
+                    if target == EMPTY or target & BLACK_FLAG != own_flag:
+                        append((origin, dest))
+        else:
+            if kind == SOLDIER:
+                table = SOLDIER_MOVES[color][origin]
+            elif kind == ADVISOR:
+                table = ADVISOR_MOVES[color][origin]
+            else:
+                table = GENERAL_MOVES[color][origin]
+            for dest, _ in table:
+                target = squares[dest]
+                if target == EMPTY or target & BLACK_FLAG != own_flag:
+                    append((origin, dest))
+    return moves
+
+
+def generate_pseudo_captures(position, color):
+    """
+    Chỉ sinh các nước ăn quân theo luật di chuyển (chưa kiểm tra Tướng bị chiếu).
+    Dùng cho tìm kiếm tĩnh (quiescence), nơi các nước đi thường không cần thiết.
+    :return: Danh sách tuple (from_square, to_square)
+    """
+    squares = position.squares
+    own_flag = BLACK_FLAG if color == COLOR_BLACK else 0
+    moves = []
+    append = moves.append
+    for origin in position.piece_lists[color]:
+        kind = squares[origin] & 7
+        if kind == CHARIOT or kind == CANNON:
+            row, col = ROW_OF[origin], COL_OF[origin]
+            _, rank_blockers, rank_screens = RANK_ATTACKS[col][position.rank_occ[row]]
+            _, file_blockers, file_screens = FILE_ATTACKS[row][position.file_occ[col]]
+            rank_targets, file_targets = (
+                (rank_blockers, file_blockers) if kind == CHARIOT else (rank_screens, file_screens)
+            )
+            base = row * BOARD_COLS
+            for c in LINE_BITS[rank_targets]:
+                if squares[base + c] & BLACK_FLAG != own_flag:
+                    append((origin, base + c))
+            for r in LINE_BITS[file_targets]:
+                dest = r * BOARD_COLS + col
+                if squares[dest] & BLACK_FLAG != own_flag:
+                    append((origin, dest))
+        elif kind == HORSE or kind == ELEPHANT:
+            table = HORSE_MOVES[origin] if kind == HORSE else ELEPHANT_MOVES[color][origin]
+            for dest, block, _ in table:
+                target = squares[dest]
+                if target != EMPTY and target & BLACK_FLAG != own_flag and squares[block] == EMPTY:
+                    append((origin, dest))
+        else:
+            if kind == SOLDIER:
+                table = SOLDIER_MOVES[color][origin]
+            elif kind == ADVISOR:
+                table = ADVISOR_MOVES[color][origin]
+            else:
+                table = GENERAL_MOVES[color][origin]
+            for dest, _ in table:
+                target = squares[dest]
+                if target != EMPTY and target & BLACK_FLAG != own_flag:
+                    append((origin, dest))
+    return moves
+
+
+def square_attacked(position, square, by_color):
+    """
+    Kiểm tra xem một ô có bị bên by_color tấn công hay không.
+    Dùng cho ô của Tướng: tính cả luật lộ mặt Tướng, bỏ qua Sĩ/Tượng (không thể chiếu Tướng).
+    """
+    squares = position.squares
+    flag = BLACK_FLAG if by_color == COLOR_BLACK else 0
+    row, col = ROW_OF[square], COL_OF[square]
+    base = row * BOARD_COLS
+    _, rank_blockers, rank_screens = RANK_ATTACKS[col][position.rank_occ[row]]
+    _, file_blockers, file_screens = FILE_ATTACKS[row][position.file_occ[col]]
+
+    # Xe (theo hàng/cột) và Tướng đối phương (lộ mặt theo cột)
+    chariot, general = CHARIOT | flag, GENERAL | flag
+    for c in LINE_BITS[rank_blockers]:
+        if squares[base + c] == chariot:
+            return True
+    for r in LINE_BITS[file_blockers]:
+        code = squares[r * BOARD_COLS + col]
+        if code == chariot or code == general:
+            return True
+
+    # Pháo (cách đúng một ngòi)
+    cannon = CANNON | flag
+    for c in LINE_BITS[rank_screens]:
+        if squares[base + c] == cannon:
+            return True
+    for r in LINE_BITS[file_screens]:
+        if squares[r * BOARD_COLS + col] == cannon:
+            return True
+
+    # Mã (không bị cản chân)
+    horse = HORSE | flag
+    for origin, leg in HORSE_ATTACKERS[square]:
+        if squares[origin] == horse and squares[leg] == EMPTY:
+            return True
+
+    # Tốt
+    soldier = SOLDIER | flag
+    for origin in SOLDIER_ATTACKERS[by_color][square]:
+        if squares[origin] == soldier:
+            return True
+    return False
+
+
+class CheckInfo:
+    """
+    Thông tin về an toàn của Tướng, tính một lần cho mỗi thế cờ:
+    - in_check: Tướng đang bị chiếu (checkers không rỗng)
+    - pinned_mask: các ô có quân mình mà nếu rời đi có thể làm lộ Tướng
+      (bị ghim bởi Xe, Tướng đối phương, Pháo hoặc đang cản chân Mã đối phương)
+    - screen_mask: các ô trống giữa Tướng và Pháo đối phương; đặt quân vào đó sẽ tạo ngòi
+    Nước đi của quân không bị ghim, không đi vào screen_mask khi không bị chiếu thì chắc chắn hợp lệ;
+    các nước còn lại được kiểm tra bằng cách thử đi trên trạng thái gọn.
+    """
+    __slots__ = ("color", "opponent", "general_square", "in_check", "pinned_mask", "screen_mask")
+
+    def __init__(self, position, color):
+        self.color = color
+        self.opponent = opponent_of(color)
+        self.general_square = position.general_square(color)
+        self.in_check = False
+        self.pinned_mask = 0
+        self.screen_mask = 0
+        if self.general_square is not None:
+            self.in_check = square_attacked(position, self.general_square, self.opponent)
+            self._find_pins(position)
+
+    def _find_pins(self, position):
+        squares = position.squares
+        general_square = self.general_square
+        own_flag = BLACK_FLAG if self.color == COLOR_BLACK else 0
+        enemy_flag = BLACK_FLAG ^ own_flag
+        row, col = ROW_OF[general_square], COL_OF[general_square]
+
+        # Bốn hướng từ Tướng: ghi lại ba quân đầu tiên và các ô trống trước quân đầu tiên
+        for dr, dc in _RAYS:
+            r, c = row + dr, col + dc
+            empties = 0
+            blockers = []
+            while 0 <= r < BOARD_ROWS and 0 <= c < BOARD_COLS and len(blockers) < 3:
+                square = r * BOARD_COLS + c
+                if squares[square] == EMPTY:
+                    if not blockers:
+                        empties |= 1 << square
+                else:
+                    blockers.append(square)
+                r, c = r + dr, c + dc
+            codes = [squares[square] for square in blockers]
+            if codes and codes[0] == CANNON | enemy_flag:
+                # Đặt quân vào giữa Tướng và Pháo sẽ tạo ngòi
+                self.screen_mask |= empties
+            danger = (
+                len(codes) >= 2 and codes[1] in (CHARIOT | enemy_flag, GENERAL | enemy_flag)
+            ) or (
+                len(codes) >= 3 and codes[2] == CANNON | enemy_flag
+            )
+            if danger:
+                for square, code in zip(blockers[:2], codes[:2]):
+                    if code & BLACK_FLAG == own_flag:
+                        self.pinned_mask |= 1 << square
+
+        # Quân mình đang cản chân Mã đối phương
+        horse = HORSE | enemy_flag
+        for origin, leg in HORSE_ATTACKERS[general_square]:
+            if squares[origin] == horse and squares[leg] != EMPTY and squares[leg] & BLACK_FLAG == own_flag:
+                self.pinned_mask |= 1 << leg
+
+    def needs_verification(self, move):
+        """
+        Kiểm tra xem nước đi có cần thử trên trạng thái gọn để xác định tính hợp lệ hay không.
+        """
+        from_square, to_square = move
+        return (
+            self.in_check or from_square == self.general_square
+            or self.pinned_mask >> from_square & 1 or self.screen_mask >> to_square & 1
+        )
+
+
+def is_move_safe(position, move, check_info):
+    """
+    Thử nước đi trên trạng thái gọn và kiểm tra Tướng bên đi có bị tấn công sau đó hay không.
+    """
+    from_square, to_square = move
+    undo = position.move(from_square, to_square)
+    target = to_square if from_square == check_info.general_square else check_info.general_square
+    safe = not square_attacked(position, target, check_info.opponent)
+    position.unmove(from_square, to_square, *undo)
+    return safe
+
+
+def generate_legal_moves(position, color):
+    """
+    Sinh tất cả nước đi hợp lệ (không để Tướng bên mình bị chiếu hay lộ mặt).
+    :return: Danh sách tuple (from_square, to_square)
+    """
+    moves = generate_pseudo_moves(position, color)
+    check_info = CheckInfo(position, color)
+    if check_info.general_square is None:
+        return moves
+    return [
+        move for move in moves
+        if not check_info.needs_verification(move) or is_move_safe(position, move, check_info)
+    ]
+
+
+def generate_legal_captures(position, color):
+    """
+    Sinh các nước ăn quân hợp lệ (không để Tướng bên mình bị chiếu hay lộ mặt).
+    :return: Danh sách tuple (from_square, to_square)
+    """
+    moves = generate_pseudo_captures(position, color)
+    check_info = CheckInfo(position, color)
+    if check_info.general_square is None:
+        return moves
+    return [
+        move for move in moves
+        if not check_info.needs_verification(move) or is_move_safe(position, move, check_info)
+    ]
+
+
+def generate_legal_quiets(position, color):
+    """
+    Sinh các nước đi hợp lệ không ăn quân (phần bù của generate_legal_captures).
+    :return: Danh sách tuple (from_square, to_square)
+    """
+    squares = position.squares
+    moves = [move for move in generate_pseudo_moves(position, color) if squares[move[1]] == EMPTY]
+    check_info = CheckInfo(position, color)
+    if check_info.general_square is None:
+        return moves
+    return [
+        move for move in moves
+        if not check_info.needs_verification(move) or is_move_safe(position, move, check_info)
+    ]
+
+
+def is_pseudo_legal(position, color, move):
+    """
+    Kiểm tra một nước đi đơn lẻ theo luật di chuyển của quân (chưa kiểm tra Tướng bị chiếu),
+    không cần sinh toàn bộ nước đi. Dùng để xác minh nước đi lấy từ bảng chuyển vị hoặc killer moves.
+    """
+    from_square, to_square = move
+    squares = position.squares
+    own_flag = BLACK_FLAG if color == COLOR_BLACK else 0
+    code = squares[from_square]
+    if code == EMPTY or code & BLACK_FLAG != own_flag or from_square == to_square:
+        return False
+    target = squares[to_square]
+    if target != EMPTY and target & BLACK_FLAG == own_flag:
+        return False
+    kind = code & 7
+    if kind == CHARIOT or kind == CANNON:
+        row, col = ROW_OF[from_square], COL_OF[from_square]
+        if ROW_OF[to_square] == row:
+            slides, blockers, screens = RANK_ATTACKS[col][position.rank_occ[row]]
+            bit = 1 << COL_OF[to_square]
+        elif COL_OF[to_square] == col:
+            slides, blockers, screens = FILE_ATTACKS[row][position.file_occ[col]]
+            bit = 1 << ROW_OF[to_square]
+        else:
+            return False
+        if target == EMPTY:
+            return bool(slides & bit)
+        return bool((blockers if kind == CHARIOT else screens) & bit)
+    if kind == HORSE or kind == ELEPHANT:
+        table = HORSE_MOVES[from_square] if kind == HORSE else ELEPHANT_MOVES[color][from_square]
+        return any(dest == to_square and squares[block] == EMPTY for dest, block, _ in table)
+    if kind == SOLDIER:
+        table = SOLDIER_MOVES[color][from_square]
+    elif kind == ADVISOR:
+        table = ADVISOR_MOVES[color][from_square]
+    else:
+        table = GENERAL_MOVES[color][from_square]
+    return any(dest == to_square for dest, _ in table)
+
+
+def is_legal_move(position, color, move):
+    """
+    Kiểm tra một nước đi đơn lẻ có hợp lệ hay không (đúng luật di chuyển và không để Tướng bị chiếu).
+    """
+    if not is_pseudo_legal(position, color, move):
+        return False
+    check_info = CheckInfo(position, color)
+    if check_info.general_square is None:
+        return True
+    return not check_info.needs_verification(move) or is_move_safe(position, move, check_info)
+
+
+def has_legal_move(position, color):
+    """
+    Kiểm tra xem bên color còn nước đi hợp lệ nào không (dừng ngay khi tìm thấy một nước).
+    """
+    moves = generate_pseudo_moves(position, color)
+    check_info = CheckInfo(position, color)
+    if check_info.general_square is None:
+        return bool(moves)
+    for move in moves:
+        if not check_info.needs_verification(move) or is_move_safe(position, move, check_info):
+            return True
+    return False
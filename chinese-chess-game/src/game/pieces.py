@@ -4,6 +4,8 @@ from utils.const import (
     COLOR_BLACK, COLOR_RED, COLOR_NONE,
     TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER
 )
+from game.position import square_of, SquareSet
+from game.tables import GENERAL_REACH, ADVISOR_REACH, ELEPHANT_REACH, HORSE_REACH, SOLDIER_REACH, LINE_REACH
 
 class Piece:
     def __init__(self, color):
@@ -12,8 +14,23 @@ class Piece:
         self.type = None  # Loại quân cờ (ví dụ: "general", "advisor", "elephant", ...)
         self.image_path = None
         self.current_position = None  # Vị trí hiện tại của quân cờ
-        self.valid_positions = []  # Danh sách các vị trí có thể di chuyển đến  
-        self.can_moves = []  # Danh sách các vị trí có thể di chuyển đến
+        self.valid_mask = 0  # Mặt nạ 90 bit các vị trí có thể di chuyển đến (đã xét quân cản)
+        self.can_mask = 0  # Mặt nạ 90 bit các vị trí có thể di chuyển đến (chưa xét quân cản)
+
+    @property
+    def valid_positions(self):
+        """
+        Các vị trí có thể di chuyển đến, dạng SquareSet (hỗ trợ `in`, duyệt và len).
+        Chỉ cập nhật qua rules.assign_valid_mask để bản đồ tấn công luôn khớp.
+        """
+        return SquareSet(self.valid_mask)
+
+    @property
+    def can_moves(self):
+        """
+        Các vị trí có thể di chuyển đến khi không xét quân cản, dạng SquareSet.
+        """
+        return SquareSet(self.can_mask)
 
     def __eq__(self, other):
         """
@@ -56,24 +73,8 @@ class General(Piece):
         Không được phép ra khỏi cung.
         """
         row, col = self.current_position
-        self.can_moves = []
-        
-        # Xác định cung (palace) dựa vào màu quân
-        if self.color == COLOR_BLACK:
-            palace = BLACK_PALACE
-        else:  # COLOR_RED
-            palace = RED_PALACE
-        
-        # Các hướng di chuyển có thể (lên, xuống, trái, phải)
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in moves:
-            new_row, new_col = row + dr, col + dc
-            
-            # Kiểm tra xem vị trí mới có nằm trong cung không
-            if (palace["row_min"] <= new_row <= palace["row_max"] and
-                palace["col_min"] <= new_col <= palace["col_max"]):
-                self.can_moves.append((new_row, new_col))
+        # Tra bảng nước đi tính sẵn theo cung của từng bên
+        self.can_mask = GENERAL_REACH[self.color][square_of(row, col)]
 
 class Advisor(Piece):
     def __init__(self, color):
@@ -87,24 +88,8 @@ class Advisor(Piece):
         Quân Sĩ chỉ được đi 1 ô chéo trong cung (palace), không đi ngang/dọc.
         """
         row, col = self.current_position
-        self.can_moves = []
-        
-        # Xác định cung (palace) dựa vào màu quân
-        if self.color == COLOR_BLACK:
-            palace = BLACK_PALACE
-        else:  # COLOR_RED
-            palace = RED_PALACE
-        
-        # Các hướng di chuyển chéo có thể (4 hướng chéo)
-        diagonal_moves = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        
-        for dr, dc in diagonal_moves:
-            new_row, new_col = row + dr, col + dc
-            
-            # Kiểm tra xem vị trí mới có nằm trong cung không
-            if (palace["row_min"] <= new_row <= palace["row_max"] and
-                palace["col_min"] <= new_col <= palace["col_max"]):
-                self.can_moves.append((new_row, new_col))
+        # Tra bảng nước đi tính sẵn theo cung của từng bên
+        self.can_mask = ADVISOR_REACH[self.color][square_of(row, col)]
 
 class Elephant(Piece):
     def __init__(self, color):
@@ -121,23 +106,8 @@ class Elephant(Piece):
         - Bị cản nếu có quân nằm ở ô giữa.
         """
         row, col = self.current_position
-        self.can_moves = []
-
-        # Xác định phạm vi sân nhà (không vượt sông)
-        # Xác định khu vực mà Tượng có thể di chuyển (nửa bàn cờ của mỗi bên)
-        if self.color == COLOR_BLACK:
-            min_row = 0
-            max_row = RIVER_ROW_TOP  # Tượng đen không được vượt qua sông
-        else:
-            min_row = RIVER_ROW_BOTTOM  # Tượng đỏ không được vượt qua sông
-            max_row = BOARD_ROWS - 1
-
-        # Kiểm tra các hướng di chuyển
-        for dr, dc in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-            new_row, new_col = row + dr, col + dc
-            # Kiểm tra xem vị trí mới có nằm trên bàn cờ và trong khu vực của Tượng không
-            if min_row <= new_row <= max_row and 0 <= new_col < BOARD_COLS:
-                self.can_moves.append((new_row, new_col))
+        # Tra bảng nước đi tính sẵn theo nửa bàn cờ của từng bên
+        self.can_mask = ELEPHANT_REACH[self.color][square_of(row, col)]
 
 class Horse(Piece):
     def __init__(self, color):
@@ -154,23 +124,8 @@ class Horse(Piece):
         - Không kiểm tra điều kiện "cản mã".
         """
         row, col = self.current_position
-        self.can_moves = []
-
-        # 8 hướng đi có thể của Mã (hình chữ NHẬT)
-        moves = [
-            (-2, -1), (-2, 1),  # Lên 2 ô + ngang 1 ô
-            (-1, -2), (-1, 2),   # Lên 1 ô + ngang 2 ô
-            (1, -2), (1, 2),     # Xuống 1 ô + ngang 2 ô
-            (2, -1), (2, 1)       # Xuống 2 ô + ngang 1 ô
-        ]
-
-        for dr, dc in moves:
-            new_row, new_col = row + dr, col + dc
-            
-            # Kiểm tra xem có nằm trong bàn cờ không (9 cột x 10 hàng)
-            if 0 <= new_row < BOARD_ROWS and 0 <= new_col < BOARD_COLS:
-                self.can_moves.append((new_row, new_col))
-
+        # Tra bảng nước đi tính sẵn (bỏ qua ô chân Mã)
+        self.can_mask = HORSE_REACH[square_of(row, col)]
         return self.can_moves
 
 class Chariot(Piece):
@@ -188,18 +143,8 @@ class Chariot(Piece):
         - Không kiểm tra quân cản, có thể "đi xuyên" qua mọi quân.
         """
         row, col = self.current_position
-        self.can_moves = []
-        
-        # Tất cả các ô cùng hàng (ngang)
-        for c in range(BOARD_COLS):  # Bàn cờ có 9 cột (0-8)
-            if c != col:
-                self.can_moves.append((row, c))
-        
-        # Tất cả các ô cùng cột (dọc)
-        for r in range(BOARD_ROWS):  # Bàn cờ có 10 hàng (0-9)
-            if r != row:
-                self.can_moves.append((r, col))
-        
+        # Tất cả các ô cùng hàng và cùng cột
+        self.can_mask = LINE_REACH[square_of(row, col)]
         return self.can_moves
 
 class Cannon(Piece):
@@ -217,18 +162,8 @@ class Cannon(Piece):
         - Không kiểm tra quân cản, có thể "đi xuyên" qua mọi quân.
         """
         row, col = self.current_position
-        self.can_moves = []
-        
-        # Tất cả các ô cùng hàng (ngang)
-        for c in range(BOARD_COLS):  # Bàn cờ có 9 cột (0-8)
-            if c != col:
-                self.can_moves.append((row, c))
-        
-        # Tất cả các ô cùng cột (dọc)
-        for r in range(BOARD_ROWS):  # Bàn cờ có 10 hàng (0-9)
-            if r != row:
-                self.can_moves.append((r, col))
-        
+        # Tất cả các ô cùng hàng và cùng cột
+        self.can_mask = LINE_REACH[square_of(row, col)]
         return self.can_moves
 
 class Soldier(Piece):
@@ -246,30 +181,6 @@ class Soldier(Piece):
         - Không kiểm tra quân cản (vì Tốt ăn quân đối phương theo cách di chuyển)
         """
         row, col = self.current_position
-        self.can_moves = []
-
-        if self.color == COLOR_BLACK:  # Quân đen (đi từ trên xuống)
-            # Tiến 1 ô (xuống dưới)
-            if row + 1 < BOARD_ROWS:  # Kiểm tra biên dưới
-                self.can_moves.append((row + 1, col))
-            
-            # Nếu đã qua sông (row >= 5) thì được đi ngang
-            if row >= RIVER_ROW_BOTTOM:
-                if col - 1 >= 0:  # Sang trái
-                    self.can_moves.append((row, col - 1))
-                if col + 1 < BOARD_COLS:  # Sang phải
-                    self.can_moves.append((row, col + 1))
-
-        else:  # Quân đỏ (đi từ dưới lên)
-            # Tiến 1 ô (lên trên)
-            if row - 1 >= 0:  # Kiểm tra biên trên
-                self.can_moves.append((row - 1, col))
-            
-            # Nếu đã qua sông (row <= 4) thì được đi ngang
-            if row <= RIVER_ROW_TOP:
-                if col - 1 >= 0:  # Sang trái
-                    self.can_moves.append((row, col - 1))
-                if col + 1 < BOARD_COLS:  # Sang phải
-                    self.can_moves.append((row, col + 1))
-
-        return self.can_moves
\ No newline at end of file
+        # Tra bảng nước đi tính sẵn theo màu và vị trí so với sông
+        self.can_mask = SOLDIER_REACH[self.color][square_of(row, col)]
+        return self.can_moves
@@ -0,0 +1,294 @@
+import random
+from array import array
+from game.evaluation import piece_square_score
+from utils.const import (
+    BOARD_ROWS, BOARD_COLS, COLOR_BLACK, COLOR_RED,
+    TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER
+)
+
+NUM_SQUARES = BOARD_ROWS * BOARD_COLS
+
+# Mã quân cờ: 0 là ô trống, 1..7 là loại quân, cộng thêm BLACK_FLAG nếu là quân đen
+EMPTY = 0
+BLACK_FLAG = 8
+PIECE_TYPES = (TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER)
+TYPE_CODES = {piece_type: index + 1 for index, piece_type in enumerate(PIECE_TYPES)}
+
+# Hàng và cột của từng ô, tra cứu nhanh thay cho divmod
+ROW_OF = tuple(square // BOARD_COLS for square in range(NUM_SQUARES))
+COL_OF = tuple(square % BOARD_COLS for square in range(NUM_SQUARES))
+SQUARE_POSITIONS = tuple(zip(ROW_OF, COL_OF))
+
+# Khóa Zobrist 64 bit cho từng (mã quân, ô) và cho lượt đi của bên đen.
+# Dùng seed cố định để khóa giống nhau giữa các lần chạy (sách khai cuộc, bảng tàn cục).
+_zobrist_random = random.Random(0x5A0B)
+ZOBRIST_PIECE = tuple(
+    tuple(_zobrist_random.getrandbits(64) if code & 7 else 0 for _ in range(NUM_SQUARES))
+    for code in range(2 * BLACK_FLAG)
+)
+ZOBRIST_SIDE = _zobrist_random.getrandbits(64)
+
+# Giá trị vật chất + điểm vị trí của từng (mã quân, ô) theo góc nhìn bên đỏ (quân đen mang dấu âm)
+PIECE_SQUARE_SCORE = tuple(
+    tuple(
+        (-1 if code & BLACK_FLAG else 1)
+        * piece_square_score(PIECE_TYPES[(code & 7) - 1], COLOR_BLACK if code & BLACK_FLAG else COLOR_RED,
+                             square // BOARD_COLS, square % BOARD_COLS)
+        if code & 7 else 0
+        for square in range(NUM_SQUARES)
+    )
+    for code in range(2 * BLACK_FLAG)
+)
+
+
+def iter_squares(mask):
+    """
+    Duyệt các chỉ số ô được bật trong mặt nạ 90 bit, theo thứ tự tăng dần.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def count_squares(mask):
+    """
+    Đếm số ô được bật trong mặt nạ 90 bit.
+    """
+    return bin(mask).count("1")
+
+
+def square_of(row, col):
+    """
+    Chuyển tọa độ (row, col) thành chỉ số ô trong mảng phẳng 90 ô.
+    """
+    return row * BOARD_COLS + col
+
+
+def row_col(square):
+    """
+    Chuyển chỉ số ô trong mảng phẳng thành tọa độ (row, col).
+    """
+    return divmod(square, BOARD_COLS)
+
+
+def encode_piece(color, piece_type):
+    """
+    Mã hóa màu và loại quân thành một số nguyên nhỏ.
+    """
+    code = TYPE_CODES[piece_type]
+    return code | BLACK_FLAG if color == COLOR_BLACK else code
+
+
+def color_of_code(code):
+    """
+    Trả về màu của một mã quân (mã phải khác EMPTY).
+    """
+    return COLOR_BLACK if code & BLACK_FLAG else COLOR_RED
+
+
+def type_of_code(code):
+    """
+    Trả về loại quân của một mã quân (mã phải khác EMPTY).
+    """
+    return PIECE_TYPES[(code & 7) - 1]
+
+
+class SquareSet:
+    """
+    Tập ô dạng mặt nạ 90 bit, dùng như một danh sách (row, col) chỉ đọc:
+    kiểm tra `in` trong O(1), duyệt theo thứ tự ô tăng dần và len().
+    """
+    __slots__ = ("mask",)
+
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __contains__(self, position):
+        row, col = position
+        return 0 <= row < BOARD_ROWS and 0 <= col < BOARD_COLS and self.mask >> (row * BOARD_COLS + col) & 1 == 1
+
+    def __iter__(self):
+        for square in iter_squares(self.mask):
+            yield SQUARE_POSITIONS[square]
+
+    def __len__(self):
+        return count_squares(self.mask)
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __eq__(self, other):
+        if isinstance(other, SquareSet):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return f"SquareSet({list(self)})"
+
+
+class Position:
+    """
+    Trạng thái gọn của bàn cờ: mảng 90 ô chứa mã quân và danh sách ô của từng bên.
+    Board và module rules cập nhật trạng thái này qua place_piece_on_board/remove_piece_from_board.
+    rank_occ[row] và file_occ[col] là mặt nạ bit các ô có quân trên từng hàng/cột.
+    key là khóa Zobrist của thế cờ (gồm cả lượt đi), được cập nhật dần theo từng thay đổi.
+    score là tổng giá trị vật chất + điểm vị trí theo góc nhìn bên đỏ, cũng được cập nhật dần.
+    """
+    __slots__ = ("squares", "piece_lists", "rank_occ", "file_occ", "side_to_move", "key", "score")
+
+    def __init__(self):
+        self.clear()
+
+    def put(self, square, code):
+        """
+        Đặt mã quân vào một ô trống.
+        :param square: Chỉ số ô (0..89)
+        :param code: Mã quân (khác EMPTY)
+        """
+        self.squares[square] = code
+        self.piece_lists[color_of_code(code)].append(square)
+        self.key ^= ZOBRIST_PIECE[code][square]
+        self.score += PIECE_SQUARE_SCORE[code][square]
+        row, col = ROW_OF[square], COL_OF[square]
+        self.rank_occ[row] |= 1 << col
+        self.file_occ[col] |= 1 << row
+
+    def remove(self, square):
+        """
+        Xóa quân tại một ô.
+        :param square: Chỉ số ô (0..89)
+        :return: Mã quân đã bị xóa, hoặc EMPTY nếu ô trống
+        """
+        code = self.squares[square]
+        if code != EMPTY:
+            self.squares[square] = EMPTY
+            self.piece_lists[color_of_code(code)].remove(square)
+            self.key ^= ZOBRIST_PIECE[code][square]
+            self.score -= PIECE_SQUARE_SCORE[code][square]
+            row, col = ROW_OF[square], COL_OF[square]
+            self.rank_occ[row] &= ~(1 << col)
+            self.file_occ[col] &= ~(1 << row)
+        return code
+
+    def move(self, from_square, to_square):
+        """
+        Di chuyển quân từ from_square đến to_square, ăn quân nếu có.
+        Ô của quân di chuyển được cập nhật tại chỗ trong danh sách quân để giữ nguyên thứ tự.
+        :return: Tuple (mã quân bị ăn hoặc EMPTY, vị trí của quân bị ăn trong danh sách quân)
+        """
+        squares = self.squares
+        code = squares[from_square]
+        captured = squares[to_square]
+        captured_index = -1
+        zobrist = ZOBRIST_PIECE[code]
+        self.key ^= zobrist[from_square] ^ zobrist[to_square] ^ ZOBRIST_PIECE[captured][to_square]
+        piece_square = PIECE_SQUARE_SCORE[code]
+        self.score += piece_square[to_square] - piece_square[from_square] - PIECE_SQUARE_SCORE[captured][to_square]
+        if captured != EMPTY:
+            captured_list = self.piece_lists[color_of_code(captured)]
+            captured_index = captured_list.index(to_square)
+            del captured_list[captured_index]
+        else:
+            row, col = ROW_OF[to_square], COL_OF[to_square]
+            self.rank_occ[row] |= 1 << col
+            self.file_occ[col] |= 1 << row
+        squares[from_square] = EMPTY
+        squares[to_square] = code
+        piece_list = self.piece_lists[color_of_code(code)]
+        piece_list[piece_list.index(from_square)] = to_square
+        row, col = ROW_OF[from_square], COL_OF[from_square]
+        self.rank_occ[row] &= ~(1 << col)
+        self.file_occ[col] &= ~(1 << row)
+        return captured, captured_index
+
+    def unmove(self, from_square, to_square, captured, captured_index):
+        """
+        Hoàn tác Position.move với các giá trị mà move đã trả về.
+        """
+        squares = self.squares
+        code = squares[to_square]
+        squares[from_square] = code
+        squares[to_square] = captured
+        zobrist = ZOBRIST_PIECE[code]
+        self.key ^= zobrist[from_square] ^ zobrist[to_square] ^ ZOBRIST_PIECE[captured][to_square]
+        piece_square = PIECE_SQUARE_SCORE[code]
+        self.score -= piece_square[to_square] - piece_square[from_square] - PIECE_SQUARE_SCORE[captured][to_square]
+        piece_list = self.piece_lists[color_of_code(code)]
+        piece_list[piece_list.index(to_square)] = from_square
+        row, col = ROW_OF[from_square], COL_OF[from_square]
+        self.rank_occ[row] |= 1 << col
+        self.file_occ[col] |= 1 << row
+        if captured != EMPTY:
+            self.piece_lists[color_of_code(captured)].insert(captured_index, to_square)
+        else:
+            row, col = ROW_OF[to_square], COL_OF[to_square]
+            self.rank_occ[row] &= ~(1 << col)
+            self.file_occ[col] &= ~(1 << row)
+
+    def clear(self):
+        """
+        Xóa toàn bộ quân trên bàn cờ.
+        """
+        self.squares = bytearray(NUM_SQUARES)
+        self.piece_lists = {COLOR_RED: array('B'), COLOR_BLACK: array('B')}
+        self.rank_occ = [0] * BOARD_ROWS
+        self.file_occ = [0] * BOARD_COLS
+        self.side_to_move = COLOR_RED
+        self.key = 0
+        self.score = 0
+
+    def switch_side(self):
+        """
+        Đổi lượt đi và cập nhật khóa Zobrist tương ứng.
+        """
+        self.side_to_move = COLOR_BLACK if self.side_to_move == COLOR_RED else COLOR_RED
+        self.key ^= ZOBRIST_SIDE
+
+    def compute_key(self):
+        """
+        Tính lại khóa Zobrist từ đầu (dùng để kiểm tra khóa cập nhật dần).
+        """
+        key = ZOBRIST_SIDE if self.side_to_move == COLOR_BLACK else 0
+        for square, code in enumerate(self.squares):
+            key ^= ZOBRIST_PIECE[code][square]
+        return key
+
+    def compute_score(self):
+        """
+        Tính lại tổng vật chất + điểm vị trí từ đầu (dùng để kiểm tra điểm cập nhật dần).
+        """
+        return sum(PIECE_SQUARE_SCORE[code][square] for square, code in enumerate(self.squares))
+
+    def copy(self):
+        """
+        Tạo bản sao độc lập của trạng thái gọn.
+        """
+        other = Position.__new__(Position)
+        other.squares = self.squares[:]
+        other.piece_lists = {color: squares[:] for color, squares in self.piece_lists.items()}
+        other.rank_occ = self.rank_occ[:]
+        other.file_occ = self.file_occ[:]
+        other.side_to_move = self.side_to_move
+        other.key = self.key
+        other.score = self.score
+        return other
+
+    def piece_at(self, square):
+        """
+        Trả về mã quân tại một ô.
+        """
+        return self.squares[square]
+
+    def general_square(self, color):
+        """
+        Trả về chỉ số ô của quân Tướng theo màu, hoặc None nếu không có.
+        """
+        code = encode_piece(color, TYPE_GENERAL)
+        for square in self.piece_lists[color]:
+            if self.squares[square] == code:
+                return square
+        return None
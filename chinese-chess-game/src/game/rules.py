@@ -2,36 +2,50 @@ from utils.const import (
     BLACK_PALACE, RED_PALACE, RIVER_ROW_TOP, RIVER_ROW_BOTTOM, BOARD_ROWS, BOARD_COLS,
     COLOR_BLACK, COLOR_RED, TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_CHARIOT, TYPE_CANNON, TYPE_SOLDIER
 )
+from game.position import square_of, encode_piece, iter_squares, count_squares, EMPTY, BLACK_FLAG
+from game.tables import (
+    RANK_ATTACKS, FILE_ATTACKS, LINE_BITS, FILE_SQUARES, HORSE_LEGS, ELEPHANT_EYES,
+    GENERAL_MOVES, ADVISOR_MOVES, ELEPHANT_MOVES, HORSE_MOVES, SOLDIER_MOVES
+)
 
 def validate_move(start_pos, end_pos, board):
     """
     Kiểm tra xem nước đi từ start_pos đến end_pos có hợp lệ hay không.
     """
     piece = board.board[start_pos[0]][start_pos[1]]
-    return piece is not None and end_pos in piece.valid_positions
+    row, col = end_pos
+    # Nước đi hợp lệ được lưu dạng mặt nạ 90 bit: kiểm tra một bit thay vì tìm trong danh sách
+    return (
+        piece is not None and 0 <= row < BOARD_ROWS and 0 <= col < BOARD_COLS
+        and piece.valid_mask >> square_of(row, col) & 1 == 1
+    )
 
 def is_check_condition(board, color):
     """
     Kiểm tra xem một bên có bị chiếu hay không.
+    Tra bản đồ tấn công của đối phương tại ô Tướng thay vì duyệt nước đi của từng quân.
     """
     general_position = board.get_general_position(color)
     opponent_color = COLOR_RED if color == COLOR_BLACK else COLOR_BLACK
 
-    for piece in board.get_pieces_by_color(opponent_color):
-        if general_position in piece.valid_positions:
-            return True
+    if is_square_attacked(board, general_position, opponent_color):
+        return True
     # Check xem 2 tướng có nằm trên cùng 1 cột không nếu có trả về True
-    if board.get_general_position(COLOR_BLACK)[1] == board.get_general_position(COLOR_RED)[1]:
+    opponent_row, opponent_col = board.get_general_position(opponent_color)
+    if general_position[1] == opponent_col:
         # nếu không tồn tại quân cờ nào nằm giữa 2 tướng thì trả về True
-        count_between = _count_pieces_between(
-            board.get_general_position(COLOR_BLACK),
-            board.get_general_position(COLOR_RED),
-            board.board
-        )
-        if count_between == 0: 
+        if board.position.file_occ[opponent_col] & _between_mask(general_position[0], opponent_row) == 0:
             return True
     return False
 
+def is_square_attacked(board, position, by_color):
+    """
+    Kiểm tra xem một ô có nằm trong nước đi hợp lệ của ít nhất một quân bên by_color hay không (O(1)).
+    :param position: Tuple (row, col)
+    """
+    row, col = position
+    return board.attack_maps[by_color][row * BOARD_COLS + col] > 0
+
 def place_piece_on_board(board, piece, position):
     """
     Đặt một quân cờ vào một vị trí trên bàn cờ và cập nhật thông tin liên quan.
@@ -44,7 +58,8 @@ def place_piece_on_board(board, piece, position):
 
     # Đặt quân cờ vào vị trí mới
     board.board[row][col] = piece
-    piece.set_position(position);
+    board.position.put(square_of(row, col), encode_piece(piece.color, piece.type))
+    piece.set_position(position)
 
     # Thêm quân cờ vào danh sách theo màu
     if piece.color == COLOR_BLACK:
@@ -72,10 +87,11 @@ def remove_piece_from_board(board, position):
     piece = board.board[row][col]
 
     if piece:
+        assign_valid_mask(piece, board, 0)
         piece.current_position = None
-        piece.can_moves = []
-        piece.valid_positions = []
+        piece.can_mask = 0
         board.board[row][col] = None
+        board.position.remove(square_of(row, col))
 
         # Loại bỏ quân cờ khỏi danh sách theo màu (nếu tồn tại)
         if piece.color == COLOR_BLACK and piece in board.black_pieces:
@@ -87,21 +103,73 @@ def remove_piece_from_board(board, position):
     for other_piece in board.get_all_pieces():
         _update_valid_moves_of_pieces_when_a_position_on_board_changed(other_piece, position, board)
 
+def move_piece_on_board(board, start_pos, end_pos):
+    """
+    Di chuyển quân cờ từ start_pos đến end_pos (ăn quân nếu có) và cập nhật nước đi
+    của các quân cờ bị ảnh hưởng trong một lượt duyệt duy nhất.
+    Hàm không kiểm tra tính hợp lệ của nước đi.
+    :return: Tuple (vị trí của quân bị ăn trong danh sách quân theo màu hoặc -1,
+             giá trị trả về của Position.move dùng để hoàn tác trạng thái gọn)
+    """
+    start_row, start_col = start_pos
+    end_row, end_col = end_pos
+    piece = board.board[start_row][start_col]
+    captured = board.board[end_row][end_col]
+    captured_index = -1
+
+    # Cập nhật lưới quân cờ và trạng thái gọn
+    board.board[start_row][start_col] = None
+    board.board[end_row][end_col] = piece
+    core_undo = board.position.move(square_of(start_row, start_col), square_of(end_row, end_col))
+
+    if captured is not None:
+        captured_list = board.get_pieces_by_color(captured.color)
+        captured_index = next(i for i, other in enumerate(captured_list) if other is captured)
+        del captured_list[captured_index]
+        assign_valid_mask(captured, board, 0)
+        captured.current_position = None
+        captured.can_mask = 0
+
+    piece.set_position(end_pos)
+    if piece.type == TYPE_GENERAL:
+        board.general_positions[piece.color] = end_pos
+
+    # Tính toán lại nước đi của quân vừa đi và các quân bị ảnh hưởng bởi hai ô thay đổi
+    set_valid_moves(piece, board)
+    for other_piece in board.get_all_pieces():
+        if other_piece is not piece and (
+            _depends_on_position(other_piece, start_pos) or _depends_on_position(other_piece, end_pos)
+        ):
+            set_valid_moves(other_piece, board)
+
+    return captured_index, core_undo
+
 def set_valid_moves(piece, board):
     """
     Tính toán và cập nhật các nước đi hợp lệ cho quân cờ.
     """
-    piece.valid_positions = []
-    move_setters = {
-        TYPE_GENERAL: _set_general_moves,
-        TYPE_ADVISOR: _set_advisor_moves,
-        TYPE_ELEPHANT: _set_elephant_moves,
-        TYPE_HORSE: _set_horse_moves,
-        TYPE_CHARIOT: _set_chariot_moves,
-        TYPE_CANNON: _set_cannon_moves,
-        TYPE_SOLDIER: _set_soldier_moves,
-    }
-    move_setters.get(piece.type, lambda p, b: None)(piece, board)
+    setter = _MOVE_SETTERS.get(piece.type)
+    assign_valid_mask(piece, board, setter(piece, board) if setter is not None else 0)
+
+def assign_valid_mask(piece, board, valid_mask):
+    """
+    Gán mặt nạ nước đi hợp lệ mới cho quân cờ. Mọi thay đổi valid_mask đều đi qua hàm này
+    để bản đồ tấn công (board.attack_maps) và tổng số nước đi (board.mobility) luôn khớp.
+    Nếu bàn cờ đang ghi nhật ký (trong Board.make_move), giá trị cũ được lưu lại để hoàn tác.
+    """
+    old_mask = piece.valid_mask
+    if board.journal is not None:
+        board.journal.append((piece, old_mask))
+    if old_mask == valid_mask:
+        return
+    # Chỉ cập nhật các ô thay đổi
+    counts = board.attack_maps[piece.color]
+    for square in iter_squares(old_mask & ~valid_mask):
+        counts[square] -= 1
+    for square in iter_squares(valid_mask & ~old_mask):
+        counts[square] += 1
+    board.mobility[piece.color] += count_squares(valid_mask) - count_squares(old_mask)
+    piece.valid_mask = valid_mask
 
 def _set_general_moves(piece, board):
     """
@@ -109,258 +177,160 @@ def _set_general_moves(piece, board):
     """
     # Lấy vị trí hiện tại của Tướng
     row, col = piece.current_position
-
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Xác định cung mà Tướng có thể di chuyển
-    palace = BLACK_PALACE if piece.color == COLOR_BLACK else RED_PALACE
-
-    # Kiểm tra các hướng di chuyển
-    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        new_row, new_col = row + dr, col + dc
-        if palace["row_min"] <= new_row <= palace["row_max"] and palace["col_min"] <= new_col <= palace["col_max"]:
-            # Kiểm tra xem có quân cờ nào tại vị trí mới không
-            target_piece = board.board[new_row][new_col]
-
-            if target_piece is None or target_piece.color != piece.color:
-                # Kiểm tra xem nước đi này có khiến Tướng đối mặt với Tướng đối phương không
-                opponent_color = COLOR_RED if piece.color == COLOR_BLACK else COLOR_BLACK
-                opponent_general_position = board.get_general_position(opponent_color)
-
-                if opponent_general_position is not None:
-                    opponent_row, opponent_col = opponent_general_position
-
-                    # Nếu Tướng đối phương nằm trên cùng cột
-                    if new_col == opponent_col:
-                        # Kiểm tra xem có quân cờ nào giữa hai Tướng không
-                        count_between = _count_pieces_between((new_row, new_col), opponent_general_position, board.board)
-                        if count_between == 0:
-                            # Nếu không có quân cờ nào ở giữa, loại bỏ nước đi này
-                            continue
-
-                valid_moves.append((new_row, new_col))
-
-    # Cập nhật danh sách nước đi hợp lệ của Tướng
-    piece.valid_positions = valid_moves
+    position = board.position
+    squares = position.squares
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
+
+    # Vị trí Tướng đối phương (để kiểm tra luật lộ mặt Tướng)
+    opponent_color = COLOR_RED if piece.color == COLOR_BLACK else COLOR_BLACK
+    opponent_general_position = board.get_general_position(opponent_color)
+
+    # Tạo mặt nạ các nước đi hợp lệ
+    valid_mask = 0
+
+    # Các nước đi trong cung được tra từ bảng tính sẵn
+    for dest, (new_row, new_col) in GENERAL_MOVES[piece.color][square_of(row, col)]:
+        target = squares[dest]
+        if target != EMPTY and target & BLACK_FLAG == own_flag:
+            continue
+        if opponent_general_position is not None:
+            opponent_row, opponent_col = opponent_general_position
+            # Nếu Tướng đối phương nằm trên cùng cột, kiểm tra xem có quân cờ nào giữa hai Tướng không
+            if new_col == opponent_col:
+                if position.file_occ[new_col] & _between_mask(new_row, opponent_row) == 0:
+                    # Nếu không có quân cờ nào ở giữa, loại bỏ nước đi này
+                    continue
+        valid_mask |= 1 << dest
+
+    # Trả về mặt nạ nước đi hợp lệ của Tướng
+    return valid_mask
 
 def _set_advisor_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Sĩ.
     """
-    # Lấy vị trí hiện tại của Sĩ
     row, col = piece.current_position
+    squares = board.position.squares
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
 
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Xác định cung mà Sĩ có thể di chuyển
-    palace = BLACK_PALACE if piece.color == COLOR_BLACK else RED_PALACE
-
-    # Kiểm tra các hướng di chuyển
-    for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-        new_row, new_col = row + dr, col + dc
-
-        # Kiểm tra xem vị trí mới có nằm trong cung điện không
-        if palace["row_min"] <= new_row <= palace["row_max"] and palace["col_min"] <= new_col <= palace["col_max"]:
-            # Kiểm tra xem có quân cờ nào tại vị trí mới không
-            target_piece = board.board[new_row][new_col]
-
-            # Nếu không có quân cờ hoặc quân cờ đó không cùng màu, thêm vào danh sách nước đi hợp lệ
-            if target_piece is None or target_piece.color != piece.color:
-                valid_moves.append((new_row, new_col))
-
-    # Cập nhật danh sách nước đi hợp lệ của Sĩ
-    piece.valid_positions = valid_moves
+    # Nếu không có quân cờ hoặc quân cờ đó không cùng màu, thêm vào mặt nạ nước đi hợp lệ
+    valid_mask = 0
+    for dest, _ in ADVISOR_MOVES[piece.color][square_of(row, col)]:
+        if squares[dest] == EMPTY or squares[dest] & BLACK_FLAG != own_flag:
+            valid_mask |= 1 << dest
+    return valid_mask
 
 def _set_elephant_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Tượng.
     """
-    # Lấy vị trí hiện tại của Tượng
     row, col = piece.current_position
+    squares = board.position.squares
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
 
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Xác định khu vực mà Tượng có thể di chuyển (nửa bàn cờ của mỗi bên)
-    if piece.color == COLOR_BLACK:
-        min_row = 0
-        max_row = RIVER_ROW_TOP  # Tượng đen không được vượt qua sông
-    else:
-        min_row = RIVER_ROW_BOTTOM  # Tượng đỏ không được vượt qua sông
-        max_row = BOARD_ROWS
-
-
-    # Kiểm tra các hướng di chuyển
-    for dr, dc in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-        new_row, new_col = row + dr, col + dc
-        # Kiểm tra xem vị trí mới có nằm trên bàn cờ và trong khu vực của Tượng không
-        if min_row <= new_row <= max_row and 0 <= new_col < BOARD_COLS:
-            # Kiểm tra xem có quân cờ nào tại vị trí mới không
-            target_piece = board.board[new_row][new_col]
-
-            # Kiểm tra xem có bị chặn ở "mắt" không
-            block_row, block_col = row + dr // 2, col + dc // 2
-            if board.board[block_row][block_col] is None:
-                # Nếu không có quân cờ hoặc quân cờ đó không cùng màu, thêm vào danh sách nước đi hợp lệ
-                if target_piece is None or target_piece.color != piece.color:
-                    valid_moves.append((new_row, new_col))
-
-    # Cập nhật danh sách nước đi hợp lệ của Tượng
-    piece.valid_positions = valid_moves
+    # Bảng tính sẵn chỉ chứa các ô thuộc nửa bàn cờ của Tượng; bị chặn nếu "mắt" có quân
+    valid_mask = 0
+    for dest, eye, _ in ELEPHANT_MOVES[piece.color][square_of(row, col)]:
+        if squares[eye] == EMPTY and (squares[dest] == EMPTY or squares[dest] & BLACK_FLAG != own_flag):
+            valid_mask |= 1 << dest
+    return valid_mask
 
 def _set_horse_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Mã.
     """
-    # Lấy vị trí hiện tại của Mã
     row, col = piece.current_position
+    squares = board.position.squares
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
 
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Các hướng di chuyển của Mã (hình chữ L)
-    move_directions = [
-        (-2, -1, -1, 0), (-2, 1, -1, 0), (2, -1, 1, 0), (2, 1, 1, 0),
-        (-1, -2, 0, -1), (-1, 2, 0, 1), (1, -2, 0, -1), (1, 2, 0, 1)
-    ]
-
-    # Kiểm tra từng hướng di chuyển
-    for dr, dc, block_dr, block_dc in move_directions:
-        new_row, new_col = row + dr, col + dc
-        # Kiểm tra xem vị trí mới có nằm trên bàn cờ không
-        if 0 <= new_row < BOARD_ROWS and 0 <= new_col < BOARD_COLS:
-            # Kiểm tra xem có bị chặn ở "chân" không
-            block_row, block_col = row + block_dr, col + block_dc
-            if board.board[block_row][block_col] is None:
-                # Nếu không bị chặn, kiểm tra xem có quân cờ nào tại vị trí mới không
-                target_piece = board.board[new_row][new_col]
-
-                # Nếu không có quân cờ hoặc quân cờ đó không cùng màu, thêm vào danh sách nước đi hợp lệ
-                if target_piece is None or target_piece.color != piece.color:
-                    valid_moves.append((new_row, new_col))
-
-    # Cập nhật danh sách nước đi hợp lệ của Mã
-    piece.valid_positions = valid_moves
+    # Bị chặn nếu "chân" Mã có quân
+    valid_mask = 0
+    for dest, leg, _ in HORSE_MOVES[square_of(row, col)]:
+        if squares[leg] == EMPTY and (squares[dest] == EMPTY or squares[dest] & BLACK_FLAG != own_flag):
+            valid_mask |= 1 << dest
+    return valid_mask
 
 def _set_chariot_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Xe.
+    Dùng mặt nạ chiếm chỗ của hàng/cột và bảng tra cứu tính sẵn thay vì duyệt từng ô.
     """
-    # Lấy vị trí hiện tại của Xe
     row, col = piece.current_position
+    position = board.position
+    rank_slides, rank_blockers, _ = RANK_ATTACKS[col][position.rank_occ[row]]
+    file_slides, file_blockers, _ = FILE_ATTACKS[row][position.file_occ[col]]
 
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Kiểm tra theo chiều ngang và chiều dọc
-    for direction in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        row_dir, col_dir = direction
-
-        # Tìm các vị trí có thể di chuyển đến
-        for i in range(1, max(BOARD_ROWS, BOARD_COLS)):
-            new_row, new_col = row + i * row_dir, col + i * col_dir
+    # Các ô trống trên đường đi
+    valid_mask = rank_slides << (row * BOARD_COLS) | FILE_SQUARES[col][file_slides]
 
-            # Kiểm tra xem vị trí mới có nằm trên bàn cờ không
-            if not (0 <= new_row < BOARD_ROWS and 0 <= new_col < BOARD_COLS):
-                break  # Ra khỏi bàn cờ
-
-            # Kiểm tra xem có quân cờ nào trên đường đi không
-            target_piece = board.board[new_row][new_col]
-
-            if target_piece is None:
-                # Nếu không có quân cờ, thêm vào danh sách nước đi hợp lệ
-                valid_moves.append((new_row, new_col))
-            else:
-                # Nếu có quân cờ, kiểm tra xem có phải quân đối phương không
-                if target_piece.color != piece.color:
-                    # Nếu là quân đối phương, thêm vào danh sách nước đi hợp lệ
-                    valid_moves.append((new_row, new_col))
-                break  # Dừng lại sau khi tìm thấy quân cờ
-
-    # Cập nhật danh sách nước đi hợp lệ của Xe
-    piece.valid_positions = valid_moves
+    # Quân chặn đầu tiên mỗi hướng: ăn được nếu là quân đối phương
+    return valid_mask | _line_captures(piece, position, row, col, rank_blockers, file_blockers)
 
 def _set_cannon_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Pháo.
+    Dùng mặt nạ chiếm chỗ của hàng/cột và bảng tra cứu tính sẵn thay vì duyệt từng ô.
     """
-    # Lấy vị trí hiện tại của Pháo
     row, col = piece.current_position
+    position = board.position
+    rank_slides, _, rank_screens = RANK_ATTACKS[col][position.rank_occ[row]]
+    file_slides, _, file_screens = FILE_ATTACKS[row][position.file_occ[col]]
 
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Kiểm tra theo chiều ngang và chiều dọc
-    for direction in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-        row_dir, col_dir = direction
-        
-        # Tìm các vị trí có thể di chuyển đến
-        found_obstacle = False  # Biến để theo dõi xem đã gặp chướng ngại vật chưa
-        for i in range(1, max(BOARD_ROWS, BOARD_COLS)):
-            new_row, new_col = row + i * row_dir, col + i * col_dir
-
-            # Kiểm tra xem vị trí mới có nằm trên bàn cờ không
-            if not (0 <= new_row < BOARD_ROWS and 0 <= new_col < BOARD_COLS):
-                break  # Ra khỏi bàn cờ
-
-            # Kiểm tra xem có quân cờ nào trên đường đi không
-            target_piece = board.board[new_row][new_col]
-
-            if not found_obstacle:
-                if target_piece is None:
-                    # Nếu không có quân cờ và chưa gặp chướng ngại vật, thêm vào danh sách nước đi hợp lệ
-                    valid_moves.append((new_row, new_col))
-                else:
-                    # Nếu có quân cờ và chưa gặp chướng ngại vật, đánh dấu là đã gặp chướng ngại vật
-                    found_obstacle = True
-            else:
-                if target_piece is not None:
-                    # Nếu đã gặp chướng ngại vật và có quân cờ tại vị trí này
-                    if target_piece.color != piece.color:
-                        # Nếu là quân đối phương, thêm vào danh sách nước đi hợp lệ (ăn quân)
-                        valid_moves.append((new_row, new_col))
-                    break  # Dừng lại sau khi ăn quân
-    # Cập nhật danh sách nước đi hợp lệ của Pháo
-    piece.valid_positions = valid_moves
+    # Các ô trống trên đường đi (Pháo đi như Xe khi không ăn quân)
+    valid_mask = rank_slides << (row * BOARD_COLS) | FILE_SQUARES[col][file_slides]
+
+    # Quân đứng sau ngòi mỗi hướng: ăn được nếu là quân đối phương
+    return valid_mask | _line_captures(piece, position, row, col, rank_screens, file_screens)
+
+def _line_captures(piece, position, row, col, rank_targets, file_targets):
+    """
+    Mặt nạ các nước ăn quân đối phương tại các ô mục tiêu trên hàng/cột của quân Xe hoặc Pháo.
+    """
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
+    squares = position.squares
+    capture_mask = 0
+    for c in LINE_BITS[rank_targets]:
+        target = square_of(row, c)
+        if squares[target] & BLACK_FLAG != own_flag:
+            capture_mask |= 1 << target
+    for r in LINE_BITS[file_targets]:
+        target = square_of(r, col)
+        if squares[target] & BLACK_FLAG != own_flag:
+            capture_mask |= 1 << target
+    return capture_mask
 
 def _set_soldier_moves(piece, board):
     """
     Tính toán các nước đi hợp lệ cho quân Tốt.
     """
-    # Lấy vị trí hiện tại của Tốt
     row, col = piece.current_position
-
-    # Tạo danh sách các nước đi hợp lệ
-    valid_moves = []
-
-    # Xác định hướng di chuyển của Tốt dựa trên màu sắc
-    if piece.color == COLOR_BLACK:
-        forward_direction = 1  # Tốt đen đi xuống
-        can_move_sideways = row > RIVER_ROW_TOP  # Tốt đen chỉ được đi ngang sau khi qua sông
-    else:
-        forward_direction = -1  # Tốt đỏ đi lên
-        can_move_sideways = row < RIVER_ROW_BOTTOM  # Tốt đỏ chỉ được đi ngang sau khi qua sông
-
-    # Kiểm tra hướng đi thẳng
-    new_row = row + forward_direction
-    if 0 <= new_row < BOARD_ROWS:
-        target_piece = board.board[new_row][col]
-        if target_piece is None or target_piece.color != piece.color:
-            valid_moves.append((new_row, col))
-
-    # Kiểm tra hướng đi ngang nếu đã qua sông
-    if can_move_sideways:
-        for dc in [-1, 1]:
-            new_col = col + dc
-            if 0 <= new_col < BOARD_COLS:
-                target_piece = board.board[row][new_col]
-                if target_piece is None or target_piece.color != piece.color:
-                    valid_moves.append((row, new_col))
-
-    # Cập nhật danh sách nước đi hợp lệ của Tốt
-    piece.valid_positions = valid_moves
+    squares = board.position.squares
+    own_flag = BLACK_FLAG if piece.color == COLOR_BLACK else 0
+
+    # Bảng tính sẵn đã gồm nước đi ngang khi Tốt qua sông
+    valid_mask = 0
+    for dest, _ in SOLDIER_MOVES[piece.color][square_of(row, col)]:
+        if squares[dest] == EMPTY or squares[dest] & BLACK_FLAG != own_flag:
+            valid_mask |= 1 << dest
+    return valid_mask
+
+# Hàm tính nước đi theo loại quân (dùng trong set_valid_moves, tạo một lần khi nạp module)
+_MOVE_SETTERS = {
+    TYPE_GENERAL: _set_general_moves,
+    TYPE_ADVISOR: _set_advisor_moves,
+    TYPE_ELEPHANT: _set_elephant_moves,
+    TYPE_HORSE: _set_horse_moves,
+    TYPE_CHARIOT: _set_chariot_moves,
+    TYPE_CANNON: _set_cannon_moves,
+    TYPE_SOLDIER: _set_soldier_moves,
+}
+
+def _between_mask(row_a, row_b):
+    """
+    Mặt nạ bit các hàng nằm giữa (không tính hai đầu) hai hàng trên cùng một cột.
+    """
+    low, high = min(row_a, row_b), max(row_a, row_b)
+    return (1 << high) - (1 << (low + 1)) if high > low else 0
 
 def _count_pieces_between(start_pos, end_pos, board):
     """
@@ -391,103 +361,30 @@ def _count_pieces_between(start_pos, end_pos, board):
 def _update_valid_moves_of_pieces_when_a_position_on_board_changed(piece, position, board):
     """
     Cập nhật các nước đi hợp lệ của quân cờ khi một vị trí trên bàn cờ thay đổi.
+    Nước đi được tính lại bằng bảng tra cứu nên chỉ cần xác định quân cờ có bị ảnh hưởng hay không.
     :param piece: Đối tượng quân cờ (Piece).
     :param position: Tuple (row, col) - vị trí đã thay đổi.
     :param board: Bàn cờ hiện tại (danh sách 2D).
     """
-    # Lấy các nước đi có thể hiện tại của quân cờ
-    can_moves = piece.can_moves.copy()
-    # Lấy các nước đi hợp lệ hiện tại của quân cờ
-    valid_moves = piece.valid_positions.copy()
-    # Nếu vị trí thay đổi nằm trong các nước đi hợp lệ, tính toán lại nước đi hợp lệ
-    if position in can_moves:
-        target_piece = board.board[position[0]][position[1]]
-        # Nếu có quân cờ tại vị trí này, loại bỏ vị trí này khỏi các nước đi hợp lệ
-        if piece.type in [TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_HORSE, TYPE_SOLDIER]:
-            if target_piece is None and position not in valid_moves:
-                valid_moves.append(position)
-            elif target_piece is not None and target_piece.color == piece.color and position in valid_moves:
-                valid_moves.remove(position)
-            piece.valid_positions = valid_moves
-        else:
-            set_valid_moves (piece, board) 
-    elif piece.type in [TYPE_HORSE, TYPE_ELEPHANT, TYPE_CANNON]:
-        _special_update_moves(piece, position, board)
-
-def _special_update_moves(piece, position, board):
-    """
-    Xử lý cập nhật nước đi cho các quân cờ có logic đặc biệt.
-    """
-    if piece.type == TYPE_HORSE:
-        _update_horse_moves(piece, position, board)
-    elif piece.type == TYPE_ELEPHANT:
-        _update_elephant_moves(piece, position, board)
-    elif piece.type == TYPE_CANNON:
-        if piece.current_position[0] == position[0] or piece.current_position[1] == position[1]:
-            set_valid_moves(piece, board)
+    if _depends_on_position(piece, position):
+        set_valid_moves(piece, board)
 
-def _update_horse_moves(piece, position, board):
-    """
-    Cập nhật nước đi hợp lệ của quân Mã khi một vị trí trên bàn cờ thay đổi.
+def _depends_on_position(piece, position):
     """
-    row, col = piece.current_position
-    valid_moves = piece.valid_positions.copy()
-    target_piece = board.board[position[0]][position[1]]
-    # Các vị trí chặn nước đi của Mã
-    block_positions = [
-        (row, col - 1), (row, col + 1),  # Chặn ngang
-        (row - 1, col), (row + 1, col)   # Chặn dọc
-    ]
-
-    for block_row, block_col in block_positions:
-        if position == (block_row, block_col):
-            # Nếu vị trí thay đổi là vị trí chặn, loại bỏ các nước đi bị ảnh hưởng
-            if block_row == row:
-                # Chặn ngang
-                invalid_moves = [
-                    (row - 1, col + (block_col - col) * 2),
-                    (row + 1, col + (block_col - col) * 2)
-                ]
-            else:
-                # Chặn dọc
-                invalid_moves = [
-                    (row + (block_row - row) * 2, col - 1),
-                    (row + (block_row - row) * 2, col + 1)
-                ]
-            for move in invalid_moves:
-                if target_piece is None:
-                    if move not in valid_moves:
-                        if 0<= move[0] < BOARD_ROWS and 0<= move[1] < BOARD_COLS:
-                            valid_moves.append(move)
-                else:
-                    if move in valid_moves:
-                        valid_moves.remove(move)
-
-    piece.valid_positions = valid_moves
-
-def _update_elephant_moves(piece, position, board):
-    """
-    Cập nhật nước đi hợp lệ của quân Tượng khi một vị trí trên bàn cờ thay đổi.
+    Kiểm tra xem nước đi hợp lệ của quân cờ có phụ thuộc vào một vị trí trên bàn cờ hay không.
     """
+    changed = square_of(*position)
+    # Vị trí nằm trong các nước đi có thể
+    if piece.can_mask >> changed & 1:
+        return True
     row, col = piece.current_position
-    valid_moves = piece.valid_positions.copy()
-    target_piece = board.board[position[0]][position[1]]
-    # Các vị trí chặn nước đi của Tượng
-    block_positions = [
-        (row + dr // 2, col + dc // 2)
-        for dr, dc in [(-2, -2), (-2, 2), (2, -2), (2, 2)]
-    ]
-
-    for block_row, block_col in block_positions:
-        if position == (block_row, block_col):
-            # Nếu vị trí thay đổi là vị trí chặn, loại bỏ nước đi bị ảnh hưởng
-            invalid_move = (row + (block_row - row) * 2, col + (block_col - col) * 2)
-            if target_piece is None:
-                if invalid_move not in valid_moves:
-                    valid_moves.append(invalid_move)
-            else:
-                if invalid_move in valid_moves:
-                    valid_moves.remove(invalid_move)
-
-    piece.valid_positions = valid_moves
-
+    if piece.type == TYPE_HORSE:
+        # Vị trí là "chân" Mã
+        return HORSE_LEGS[square_of(row, col)] >> changed & 1 == 1
+    if piece.type == TYPE_ELEPHANT:
+        # Vị trí là "mắt" Tượng
+        return ELEPHANT_EYES[piece.color][square_of(row, col)] >> changed & 1 == 1
+    if piece.type == TYPE_GENERAL:
+        # Luật lộ mặt Tướng phụ thuộc vào các cột Tướng có thể đi tới
+        return abs(position[1] - col) <= 1
+    return False
@@ -0,0 +1,199 @@
+from utils.const import (
+    BLACK_PALACE, RED_PALACE, RIVER_ROW_TOP, RIVER_ROW_BOTTOM, BOARD_ROWS, BOARD_COLS,
+    COLOR_BLACK, COLOR_RED
+)
+
+# Các bảng tra cứu nước đi được tính sẵn một lần khi import.
+
+
+def _line_attacks(index, occupancy, length):
+    """
+    Tính nước đi trên một đường thẳng (hàng hoặc cột) cho quân Xe và Pháo.
+    :param index: Vị trí của quân trên đường thẳng
+    :param occupancy: Mặt nạ bit các ô có quân trên đường thẳng
+    :param length: Độ dài đường thẳng (9 cho hàng, 10 cho cột)
+    :return: Tuple (slide_mask, blocker_mask, screen_mask):
+             - slide_mask: các ô trống đi tới được (dùng chung cho Xe và Pháo)
+             - blocker_mask: quân chặn đầu tiên mỗi hướng (Xe có thể ăn)
+             - screen_mask: quân thứ hai mỗi hướng, sau ngòi (Pháo có thể ăn)
+    """
+    slide_mask = blocker_mask = screen_mask = 0
+    for step in (-1, 1):
+        i = index + step
+        while 0 <= i < length and not occupancy >> i & 1:
+            slide_mask |= 1 << i
+            i += step
+        if 0 <= i < length:
+            blocker_mask |= 1 << i
+            i += step
+            while 0 <= i < length and not occupancy >> i & 1:
+                i += step
+            if 0 <= i < length:
+                screen_mask |= 1 << i
+    return slide_mask, blocker_mask, screen_mask
+
+
+def _build_line_table(length):
+    return [
+        [_line_attacks(index, occupancy, length) for occupancy in range(1 << length)]
+        for index in range(length)
+    ]
+
+
+# RANK_ATTACKS[col][rank_occupancy] và FILE_ATTACKS[row][file_occupancy]
+# trả về (slide_mask, blocker_mask, screen_mask) theo chỉ số trên đường thẳng
+RANK_ATTACKS = _build_line_table(BOARD_COLS)
+FILE_ATTACKS = _build_line_table(BOARD_ROWS)
+
+# LINE_BITS[mask] liệt kê các chỉ số bit được bật trong mặt nạ của một đường thẳng
+LINE_BITS = tuple(
+    tuple(i for i in range(max(BOARD_ROWS, BOARD_COLS)) if mask >> i & 1)
+    for mask in range(1 << max(BOARD_ROWS, BOARD_COLS))
+)
+
+
+def _square(row, col):
+    return row * BOARD_COLS + col
+
+
+def _region_mask(row_min, row_max, col_min, col_max):
+    """
+    Tạo mặt nạ 90 bit cho một vùng chữ nhật trên bàn cờ.
+    """
+    mask = 0
+    for row in range(row_min, row_max + 1):
+        for col in range(col_min, col_max + 1):
+            mask |= 1 << _square(row, col)
+    return mask
+
+
+def _in_mask(mask, row, col):
+    return 0 <= row < BOARD_ROWS and 0 <= col < BOARD_COLS and mask >> _square(row, col) & 1
+
+
+# Mặt nạ cung và nửa bàn cờ (phía mình của sông) cho từng bên
+PALACE_MASK = {
+    COLOR_BLACK: _region_mask(BLACK_PALACE["row_min"], BLACK_PALACE["row_max"],
+                              BLACK_PALACE["col_min"], BLACK_PALACE["col_max"]),
+    COLOR_RED: _region_mask(RED_PALACE["row_min"], RED_PALACE["row_max"],
+                            RED_PALACE["col_min"], RED_PALACE["col_max"]),
+}
+HOME_MASK = {
+    COLOR_BLACK: _region_mask(0, RIVER_ROW_TOP, 0, BOARD_COLS - 1),
+    COLOR_RED: _region_mask(RIVER_ROW_BOTTOM, BOARD_ROWS - 1, 0, BOARD_COLS - 1),
+}
+BOARD_MASK = _region_mask(0, BOARD_ROWS - 1, 0, BOARD_COLS - 1)
+
+
+def _step_moves(row, col, steps, mask):
+    """
+    Các nước đi một bước (Tướng, Sĩ, Tốt) nằm trong mặt nạ cho phép.
+    :return: Tuple các phần tử (dest_square, (row, col))
+    """
+    return tuple(
+        (_square(row + dr, col + dc), (row + dr, col + dc))
+        for dr, dc in steps if _in_mask(mask, row + dr, col + dc)
+    )
+
+
+def _blockable_moves(row, col, steps, mask):
+    """
+    Các nước đi có ô cản (chân Mã, mắt Tượng) nằm trong mặt nạ cho phép.
+    :param steps: Danh sách (dr, dc, block_dr, block_dc)
+    :return: Tuple các phần tử (dest_square, block_square, (row, col))
+    """
+    return tuple(
+        (_square(row + dr, col + dc), _square(row + bdr, col + bdc), (row + dr, col + dc))
+        for dr, dc, bdr, bdc in steps if _in_mask(mask, row + dr, col + dc)
+    )
+
+
+_ORTHOGONAL_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_DIAGONAL_STEPS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+_ELEPHANT_STEPS = ((-2, -2, -1, -1), (-2, 2, -1, 1), (2, -2, 1, -1), (2, 2, 1, 1))
+_HORSE_STEPS = (
+    (-2, -1, -1, 0), (-2, 1, -1, 0), (2, -1, 1, 0), (2, 1, 1, 0),
+    (-1, -2, 0, -1), (-1, 2, 0, 1), (1, -2, 0, -1), (1, 2, 0, 1)
+)
+_COORDS = [(square // BOARD_COLS, square % BOARD_COLS) for square in range(BOARD_ROWS * BOARD_COLS)]
+
+
+def _soldier_steps(color, row):
+    if color == COLOR_BLACK:
+        return ((1, 0), (0, -1), (0, 1)) if row > RIVER_ROW_TOP else ((1, 0),)
+    return ((-1, 0), (0, -1), (0, 1)) if row < RIVER_ROW_BOTTOM else ((-1, 0),)
+
+
+# Bảng nước đi theo ô xuất phát, phần tử là (dest_square, [block_square,] (row, col))
+GENERAL_MOVES = {
+    color: tuple(_step_moves(r, c, _ORTHOGONAL_STEPS, PALACE_MASK[color]) for r, c in _COORDS)
+    for color in (COLOR_BLACK, COLOR_RED)
+}
+ADVISOR_MOVES = {
+    color: tuple(_step_moves(r, c, _DIAGONAL_STEPS, PALACE_MASK[color]) for r, c in _COORDS)
+    for color in (COLOR_BLACK, COLOR_RED)
+}
+ELEPHANT_MOVES = {
+    color: tuple(_blockable_moves(r, c, _ELEPHANT_STEPS, HOME_MASK[color]) for r, c in _COORDS)
+    for color in (COLOR_BLACK, COLOR_RED)
+}
+HORSE_MOVES = tuple(_blockable_moves(r, c, _HORSE_STEPS, BOARD_MASK) for r, c in _COORDS)
+SOLDIER_MOVES = {
+    color: tuple(_step_moves(r, c, _soldier_steps(color, r), BOARD_MASK) for r, c in _COORDS)
+    for color in (COLOR_BLACK, COLOR_RED)
+}
+
+
+def _destination_mask(entries, index=0):
+    """
+    Gộp các ô (phần tử thứ index của mỗi mục trong bảng nước đi) thành mặt nạ 90 bit.
+    """
+    mask = 0
+    for entry in entries:
+        mask |= 1 << entry[index]
+    return mask
+
+
+# Mặt nạ 90 bit các ô đích khi không xét quân cản (can_moves) và các ô cản (chân Mã, mắt Tượng)
+GENERAL_REACH = {color: tuple(_destination_mask(entries) for entries in GENERAL_MOVES[color])
+                 for color in (COLOR_BLACK, COLOR_RED)}
+ADVISOR_REACH = {color: tuple(_destination_mask(entries) for entries in ADVISOR_MOVES[color])
+                 for color in (COLOR_BLACK, COLOR_RED)}
+ELEPHANT_REACH = {color: tuple(_destination_mask(entries) for entries in ELEPHANT_MOVES[color])
+                  for color in (COLOR_BLACK, COLOR_RED)}
+ELEPHANT_EYES = {color: tuple(_destination_mask(entries, 1) for entries in ELEPHANT_MOVES[color])
+                 for color in (COLOR_BLACK, COLOR_RED)}
+HORSE_REACH = tuple(_destination_mask(entries) for entries in HORSE_MOVES)
+HORSE_LEGS = tuple(_destination_mask(entries, 1) for entries in HORSE_MOVES)
+SOLDIER_REACH = {color: tuple(_destination_mask(entries) for entries in SOLDIER_MOVES[color])
+                 for color in (COLOR_BLACK, COLOR_RED)}
+
+# Các ô cùng hàng và cùng cột (nước đi của Xe/Pháo khi không bị chặn)
+LINE_REACH = tuple(
+    (_region_mask(r, r, 0, BOARD_COLS - 1) | _region_mask(0, BOARD_ROWS - 1, c, c)) & ~(1 << _square(r, c))
+    for r, c in _COORDS
+)
+
+# FILE_SQUARES[col][file_mask] chuyển mặt nạ theo hàng của một cột thành mặt nạ 90 bit.
+# Với hàng thì chỉ cần dịch trái: rank_mask << (row * BOARD_COLS).
+FILE_SQUARES = tuple(
+    tuple(_destination_mask([(_square(r, col),) for r in LINE_BITS[mask] if r < BOARD_ROWS])
+          for mask in range(1 << BOARD_ROWS))
+    for col in range(BOARD_COLS)
+)
+
+# Bảng ngược: các ô mà Mã/Tốt đứng ở đó có thể tấn công một ô cho trước.
+# HORSE_ATTACKERS[sq] gồm (horse_square, leg_square); SOLDIER_ATTACKERS[color][sq] gồm soldier_square.
+HORSE_ATTACKERS = tuple(
+    tuple((origin, leg) for origin in range(BOARD_ROWS * BOARD_COLS)
+          for dest, leg, _ in HORSE_MOVES[origin] if dest == square)
+    for square in range(BOARD_ROWS * BOARD_COLS)
+)
+SOLDIER_ATTACKERS = {
+    color: tuple(
+        tuple(origin for origin in range(BOARD_ROWS * BOARD_COLS)
+              for dest, _ in SOLDIER_MOVES[color][origin] if dest == square)
+        for square in range(BOARD_ROWS * BOARD_COLS)
+    )
+    for color in (COLOR_BLACK, COLOR_RED)
+}
@@ -4,7 +4,9 @@ from game.board import Board
 from view.draw import *
 from utils.const import *
 from utils.ComputerPlayer import ComputerPlayer  
-from copy import deepcopy
+from utils.background import BackgroundSearch
+
+AI_MOVE_DELAY = 0.1  # Thời gian tối thiểu giữa hai nước đi của máy (giây), để chế độ máy đấu máy dễ theo dõi
 
 class GameState:
     def __init__(self):
@@ -21,7 +23,9 @@ class GameState:
         self.black_captured = []
         self.game_mode = None  # 'human_vs_human', 'human_vs_ai', 'ai_vs_ai'
         self.mode_selected = False  # Thêm biến này
-        self.ai_thinking = False
+        self.ai_thinking = False  # Máy đang tìm nước đi trong luồng nền
+        self.ai_started = 0.0  # Thời điểm bắt đầu lần tìm kiếm hiện tại
+        self.ai_progress = (0, 0)  # (độ sâu đã hoàn thành, số nút) của lần tìm kiếm hiện tại, để hiển thị
 
     def update_timers(self):
         if not self.game_started or self.game_over:
@@ -58,13 +62,16 @@ def get_board_pos(pixel_pos):
             return row, col
     return None
 
+def is_ai_turn(game_state):
+    return (game_state.game_mode == 'human_vs_ai' and game_state.current_player == COLOR_BLACK) or \
+           (game_state.game_mode == 'ai_vs_ai')
+
 def handle_click(board, game_state, pixel_pos):
     if game_state.game_over or not game_state.game_started:
         return None
 
     # Nếu là chế độ AI và đến lượt AI thì không xử lý click
-    if (game_state.game_mode == 'human_vs_ai' and game_state.current_player == COLOR_BLACK) or \
-       (game_state.game_mode == 'ai_vs_ai'):
+    if is_ai_turn(game_state):
         return None
 
     board_pos = get_board_pos(pixel_pos)
@@ -101,34 +108,51 @@ def handle_click(board, game_state, pixel_pos):
 
     return None
 
-def reset_game(game_state, board):
+def reset_game(game_state, board, searches=()):
     """Reset trạng thái game"""
+    for search in searches:
+        search.cancel(wait_done=True)  # Bỏ kết quả của lần tìm kiếm dở dang, chờ nó dừng hẳn
+        search.computer.stop_pondering()
     game_state.__init__()
     board.initialize_board()
 
-def make_ai_move(board, game_state, computer):
-    if game_state.game_over or not game_state.game_started or game_state.ai_thinking:
+def make_ai_move(board, game_state, search):
+    """
+    Điều khiển lượt đi của máy mà không chặn vòng lặp sự kiện: lần gọi đầu tiên bắt đầu tìm kiếm
+    trong luồng nền, các lần gọi sau (mỗi khung hình) cập nhật tiến độ và áp dụng nước đi khi có kết quả.
+    """
+    if game_state.game_over or not game_state.game_started or not is_ai_turn(game_state):
         return
-    
-    # Chỉ thực hiện nếu đúng lượt của AI
-    if (game_state.game_mode == 'human_vs_ai' and game_state.current_player == COLOR_BLACK) or \
-       (game_state.game_mode == 'ai_vs_ai'):
-        
+
+    if not game_state.ai_thinking:
         game_state.ai_thinking = True
-        best_move = computer.get_move(deepcopy(board))
-        game_state.ai_thinking = False
-        
-        if best_move:
-            start_pos, end_pos = best_move
-            # Chỉ đổi lượt nếu nước đi hợp lệ
-            if board.move_piece(start_pos, end_pos):                
-                # Đổi lượt
-                game_state.current_player = COLOR_BLACK if game_state.current_player == COLOR_RED else COLOR_RED
-                
-                # Kiểm tra chiếu bí
-                if board.is_checkmate(game_state.current_player):
-                    game_state.game_over = True
-                    game_state.winner = COLOR_RED if game_state.current_player == COLOR_BLACK else COLOR_BLACK
+        game_state.ai_started = time.time()
+        game_state.ai_progress = (0, 0)
+        # Thời gian suy nghĩ được chia từ đồng hồ còn lại của bên máy
+        time_left = game_state.red_time if game_state.current_player == COLOR_RED else game_state.black_time
+        search.submit(board, time_left=time_left, move_number=board.fullmove_number - 1)
+        return
+
+    game_state.ai_progress = search.progress()
+    if search.thinking or time.time() - game_state.ai_started < AI_MOVE_DELAY:
+        return
+    best_move = search.future.result()
+    game_state.ai_thinking = False
+
+    if best_move:
+        start_pos, end_pos = best_move
+        # Chỉ đổi lượt nếu nước đi hợp lệ
+        if board.move_piece(start_pos, end_pos):
+            # Đổi lượt
+            game_state.current_player = COLOR_BLACK if game_state.current_player == COLOR_RED else COLOR_RED
+
+            # Kiểm tra chiếu bí
+            if board.is_checkmate(game_state.current_player):
+                game_state.game_over = True
+                game_state.winner = COLOR_RED if game_state.current_player == COLOR_BLACK else COLOR_BLACK
+            elif game_state.game_mode == 'human_vs_ai':
+                # Suy nghĩ tiếp trong lúc người chơi cân nhắc (dừng khi đến lượt máy ở get_move)
+                search.computer.start_pondering(board)
 
 def main():
     pygame.init()
@@ -148,26 +172,23 @@ def main():
     piece_images = load_piece_images()
     game_state = GameState()
     
-    # Khởi tạo AI players
-    red_computer = ComputerPlayer(is_red=True, depth=3)
-    black_computer = ComputerPlayer(is_red=False, depth=3)
+    # Khởi tạo AI players, mỗi máy tìm kiếm trong một luồng riêng
+    red_search = BackgroundSearch(ComputerPlayer(is_red=True, depth=3))
+    black_search = BackgroundSearch(ComputerPlayer(is_red=False, depth=3))
 
     running = True
     while running:
         game_state.update_timers()
         
-        # Xử lý AI move nếu cần
+        # Xử lý AI move nếu cần (không chặn: tìm kiếm chạy trong luồng nền)
         if game_state.game_started and not game_state.game_over:
-            # Thêm delay để tránh AI đi quá nhanh
-            pygame.time.delay(100)  # Delay 100ms giữa các nước đi
-            
             if game_state.game_mode == 'human_vs_ai' and game_state.current_player == COLOR_BLACK:
-                make_ai_move(board, game_state, black_computer)
+                make_ai_move(board, game_state, black_search)
             elif game_state.game_mode == 'ai_vs_ai':
                 if game_state.current_player == COLOR_RED:
-                    make_ai_move(board, game_state, red_computer)
+                    make_ai_move(board, game_state, red_search)
                 else:
-                    make_ai_move(board, game_state, black_computer)
+                    make_ai_move(board, game_state, black_search)
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -191,7 +212,7 @@ def main():
                     game_state.game_started = True
                     game_state.last_time_update = time.time()
                 elif event.key == pygame.K_r:  # Reset
-                    reset_game(game_state, board)
+                    reset_game(game_state, board, (red_search, black_search))
                 elif event.key == pygame.K_ESCAPE:
                     running = False
 
@@ -204,6 +225,8 @@ def main():
         pygame.display.flip()
         clock.tick(60)
     
+    red_search.close()
+    black_search.close()
     pygame.quit()
 
 if __name__ == "__main__":
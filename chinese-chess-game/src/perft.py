@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+from game.board import Board
+from utils.const import START_FEN
+
+# Bộ thế cờ chuẩn cho perft cờ tướng: (FEN, {độ sâu: số nút lá tham chiếu})
+PERFT_SUITE = [
+    (START_FEN, {1: 44, 2: 1920, 3: 79666, 4: 3290240, 5: 133312995}),
+    ("r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w - - 0 1", {1: 38, 2: 1128, 3: 43929}),
+    ("1cbak4/9/n2a5/2p1p3p/5cp2/2n2N3/6PCP/3AB4/2C6/3A1K1N1 w - - 0 1", {1: 7, 2: 281, 3: 8620}),
+    ("5a3/3k5/3aR4/9/5r3/5n3/9/3A1A3/5K3/2BC2B2 w - - 0 1", {1: 25, 2: 424, 3: 9850}),
+    ("CRN1k1b2/3ca4/4ba3/9/2nr5/9/9/4B4/4A4/4KA3 w - - 0 1", {1: 28, 2: 516, 3: 14808}),
+    ("R1N1k1b2/9/3aba3/9/2nr5/2B6/9/4B4/4A4/4KA3 w - - 0 1", {1: 21, 2: 364, 3: 7626}),
+    ("C1nNk4/9/9/9/9/9/n1pp5/B3C4/9/3A1K3 w - - 0 1", {1: 28, 2: 222, 3: 6241}),
+    ("4ka3/4a4/9/9/4N4/p8/9/4C3c/7n1/2BK5 w - - 0 1", {1: 23, 2: 345, 3: 8124}),
+    ("2b1ka3/9/b3N4/4n4/9/9/9/4C4/2p6/2BK5 w - - 0 1", {1: 21, 2: 195, 3: 3883}),
+    ("1C2ka3/9/C1Nab1n2/p3p3p/6p2/9/P3P3P/3AB4/3p2c2/c1BAK4 w - - 0 1", {1: 30, 2: 830, 3: 22787}),
+    ("CnN1k1b2/c3a4/4ba3/9/2nr5/9/9/4C4/4A4/4KA3 w - - 0 1", {1: 19, 2: 583, 3: 11714}),
+]
+
+def format_move(move):
+    (start_row, start_col), (end_row, end_col) = move
+    return f"({start_row},{start_col})->({end_row},{end_col})"
+
+def reference_count(fen, depth):
+    """
+    Trả về số nút lá tham chiếu của thế cờ fen ở độ sâu depth (None nếu không có).
+    """
+    for suite_fen, counts in PERFT_SUITE:
+        if suite_fen.split()[:2] == fen.split()[:2]:
+            return counts.get(depth)
+    return None
+
+def verify_move_generation(board, depth):
+    """
+    Duyệt cây nước đi và so sánh bộ sinh nước đi hợp lệ (game.movegen) với valid_positions
+    của rules.py được lọc bằng cách thử nước đi và kiểm tra chiếu, ở mọi nút.
+    :return: Danh sách (FEN, nước thừa, nước thiếu) của các nút không khớp
+    """
+    color = board.side_to_move
+    expected = set()
+    for piece in list(board.get_pieces_by_color(color)):
+        for end_pos in list(piece.valid_positions):
+            move = (piece.current_position, end_pos)
+            board.make_move(move)
+            if not board.is_check(color):
+                expected.add(move)
+            board.unmake_move()
+    legal_moves = board.generate_legal_moves()
+    mismatches = []
+    if set(legal_moves) != expected:
+        mismatches.append((board.to_fen(), set(legal_moves) - expected, expected - set(legal_moves)))
+    if depth > 1:
+        for move in legal_moves:
+            board.make_move(move)
+            mismatches.extend(verify_move_generation(board, depth - 1))
+            board.unmake_move()
+    return mismatches
+
+def run_perft(fen, depth, divide=False):
+    """
+    Chạy perft từ độ sâu 1 đến depth, in số nút, thời gian, tốc độ và so sánh với giá trị tham chiếu.
+    :return: True nếu mọi số nút khớp với giá trị tham chiếu (nếu có)
+    """
+    board = Board()
+    board.load_fen(fen)
+    print(f"FEN: {fen}")
+    ok = True
+    for current_depth in range(1, depth + 1):
+        start = time.perf_counter()
+        if divide and current_depth == depth:
+            counts = board.perft_divide(current_depth)
+            for move, count in sorted(counts.items()):
+                print(f"  {format_move(move)}: {count}")
+            nodes = sum(counts.values())
+        else:
+            nodes = board.perft(current_depth)
+        elapsed = time.perf_counter() - start
+        nps = nodes / elapsed if elapsed > 0 else float("inf")
+        expected = reference_count(fen, current_depth)
+        if expected is None:
+            status = ""
+        elif expected == nodes:
+            status = "OK"
+        else:
+            status = f"SAI (tham chiếu {expected})"
+            ok = False
+        print(f"  depth {current_depth}: {nodes} nút, {elapsed:.3f}s, {nps:,.0f} nút/s {status}")
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perft: đếm số thế cờ lá để kiểm tra và đo tốc độ sinh nước đi.")
+    parser.add_argument("depth", type=int, nargs="?", default=3, help="Độ sâu tối đa (mặc định 3)")
+    parser.add_argument("--fen", default=START_FEN, help="Thế cờ bắt đầu (mặc định là thế cờ ban đầu)")
+    parser.add_argument("--divide", action="store_true", help="In số nút lá theo từng nước đi ở gốc")
+    parser.add_argument("--suite", action="store_true", help="Chạy toàn bộ bộ thế cờ chuẩn")
+    parser.add_argument("--verify", action="store_true",
+                        help="So sánh game.movegen với valid_positions của rules.py ở mọi nút")
+    args = parser.parse_args(argv)
+
+    fens = [fen for fen, _ in PERFT_SUITE] if args.suite else [args.fen]
+    ok = True
+    for fen in fens:
+        ok = run_perft(fen, args.depth, args.divide) and ok
+        if args.verify:
+            board = Board()
+            board.load_fen(fen)
+            for bad_fen, extra, missing in verify_move_generation(board, args.depth):
+                ok = False
+                print(f"  KHÔNG KHỚP tại {bad_fen}: thừa {sorted(extra)}, thiếu {sorted(missing)}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
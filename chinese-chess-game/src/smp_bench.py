@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+from game.board import Board
+from utils.ComputerPlayer import ComputerPlayer
+from utils.const import COLOR_RED
+from perft import PERFT_SUITE, format_move
+
+# Đo thời gian đạt độ sâu (time-to-depth) của tìm kiếm song song Lazy SMP với số tiến trình khác nhau.
+
+def time_to_depth(fen, depth, workers):
+    """
+    Tìm kiếm thế cờ fen đến độ sâu depth với workers tiến trình (bảng chuyển vị mới cho mỗi lần đo).
+    Các tiến trình được khởi chạy trước khi bấm giờ (như trong ván cờ, chúng sống suốt ván).
+    :return: Tuple (thời gian, nước đi, độ sâu đã hoàn thành, thời gian khởi chạy tiến trình)
+    """
+    board = Board()
+    board.load_fen(fen)
+    player = ComputerPlayer(board.side_to_move == COLOR_RED, depth=depth, workers=workers, book_path=None)
+    try:
+        start = time.perf_counter()
+        player.start_workers()
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        move = player.get_move(board)
+        elapsed = time.perf_counter() - start
+        completed = player.parallel_search.completed_depth if player.parallel_search is not None else depth
+    finally:
+        player.close()
+    return elapsed, move, completed, startup
+
+def run_benchmark(fens, depth, worker_counts):
+    """
+    In thời gian đạt độ sâu và hệ số tăng tốc so với số tiến trình đầu tiên trong worker_counts.
+    :return: Dict {workers: tổng thời gian}
+    """
+    totals = {}
+    for workers in worker_counts:
+        total = 0.0
+        for fen in fens:
+            elapsed, move, completed, startup = time_to_depth(fen, depth, workers)
+            total += elapsed
+            print(f"  workers {workers}: {format_move(move)} depth {completed}, {elapsed:.2f}s "
+                  f"(khởi chạy {startup:.2f}s)  [{fen}]")
+        totals[workers] = total
+        speedup = totals[worker_counts[0]] / total if total > 0 else float("inf")
+        print(f"workers {workers}: tổng {total:.2f}s, tăng tốc {speedup:.2f}x")
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thời gian đạt độ sâu của tìm kiếm song song (Lazy SMP).")
+    parser.add_argument("depth", type=int, nargs="?", default=5, help="Độ sâu cần đạt (mặc định 5)")
+    parser.add_argument("--fen", help="Thế cờ cần đo (mặc định là 4 thế cờ đầu của bộ perft)")
+    parser.add_argument("--workers", default="1,2,4,8", help="Danh sách số tiến trình, cách nhau bởi dấu phẩy")
+    args = parser.parse_args(argv)
+
+    fens = [args.fen] if args.fen else [fen for fen, _ in PERFT_SUITE[:4]]
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    print(f"CPU: {os.cpu_count()} lõi")
+    run_benchmark(fens, args.depth, worker_counts)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,89 @@
+import os
 import random
+import threading
+import time
 from collections import defaultdict
-from copy import deepcopy
 from utils.const import *
+from game.tables import PALACE_MASK
+from utils.transposition import (
+    TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, encode_move, decode_move
+)
+from utils.timeman import SearchTimeout, allocate_time
+from utils.smp import LazySMPSearch, SharedStopTimeManager
+from utils.analysis import RootSplitAnalyzer
+from utils.book import OpeningBook, DEFAULT_BOOK_PATH
+from utils.evalcache import EvalCache
+from utils.searchstats import SearchStats
+from game.evaluation import PIECE_VALUES, POSITION_SCORES, POSITION_WEIGHT, piece_value
+from utils.tablebase import (
+    Tablebase, DEFAULT_TABLEBASE_DIR, MAX_DISTANCE as TB_MAX_DISTANCE, WIN as TB_WIN, LOSS as TB_LOSS, DRAW as TB_DRAW
+)
+
+# Các ô trong cung của từng bên (dùng cho đánh giá an toàn Tướng)
+PALACE_SQUARES = {
+    color: tuple(square for square in range(BOARD_ROWS * BOARD_COLS) if PALACE_MASK[color] >> square & 1)
+    for color in (COLOR_RED, COLOR_BLACK)
+}
 
 class ComputerPlayer:
-    def __init__(self, is_red, depth=3):
+    MATE_SCORE = 100000  # Điểm khi bị chiếu hết (lớn hơn tổng giá trị quân)
+    TABLEBASE_WIN_SCORE = MATE_SCORE // 2  # Điểm thắng theo bảng tàn cục (trừ đi số nửa nước đến khi chiếu hết)
+    MAX_DEPTH = 64  # Độ sâu tối đa khi độ sâu do thời gian quyết định
+    MAX_QUIESCENCE_DEPTH = 8  # Số nửa nước ăn quân tối đa trong tìm kiếm tĩnh
+    # Điểm từ đây trở lên là chiếu hết hoặc thắng theo bảng tàn cục (đều trừ số nửa nước từ gốc)
+    DECISIVE_BOUND = TABLEBASE_WIN_SCORE - TB_MAX_DISTANCE - MAX_DEPTH - MAX_QUIESCENCE_DEPTH
+    DELTA_MARGIN = 200  # Biên an toàn cho delta pruning trong tìm kiếm tĩnh
+    MAX_KILLERS = 2  # Số killer moves giữ lại cho mỗi ply
+    CAPTURE_ORDER_BASE = 1 << 30  # Nước ăn quân luôn xếp trước nước thường (lớn hơn mọi điểm history)
+    NULL_MOVE_MIN_DEPTH = 3  # Độ sâu tối thiểu để thử nước đi rỗng
+    NULL_MOVE_REDUCTION = 2  # Độ sâu giảm thêm khi tìm sau nước đi rỗng (R)
+    LMR_MIN_DEPTH = 3  # Độ sâu tối thiểu để giảm độ sâu nước đi muộn
+    LMR_FULL_DEPTH_MOVES = 4  # Số nước đầu tiên luôn được tìm với độ sâu đầy đủ
+    FUTILITY_MARGINS = (0, 250, 500)  # Biên futility theo độ sâu còn lại (chỉ áp dụng ở độ sâu 1 và 2)
+    ATTACKING_TYPES = (TYPE_CHARIOT, TYPE_HORSE, TYPE_CANNON)
+    PONDER_CHECK_INTERVAL = 64  # Số nút giữa hai lần kiểm tra lệnh dừng khi suy nghĩ trong giờ đối phương
+    MOVE_GEN_CACHE_ENTRIES = 64  # Số thế cờ gốc giữ lại trong move_gen_cache (bỏ mục cũ nhất khi đầy)
+
+    def __init__(self, is_red, depth=3, tt_size_mb=16,
+                 null_move=True, late_move_reductions=True, futility_pruning=True,
+                 workers=1, tt_buffer=None, book_path=DEFAULT_BOOK_PATH, tablebase_dir=DEFAULT_TABLEBASE_DIR,
+                 eval_cache_mb=2):
+        """
+        :param is_red: Máy cầm quân đỏ hay đen
+        :param depth: Độ sâu tìm kiếm khi không giới hạn theo thời gian
+        :param tt_size_mb: Dung lượng bảng chuyển vị (MB)
+        :param workers: Số tiến trình tìm kiếm song song (Lazy SMP); 1 là tìm kiếm trong tiến trình hiện tại
+        :param tt_buffer: Bộ đệm có sẵn cho bảng chuyển vị (bộ nhớ dùng chung của tiến trình tìm kiếm song song)
+        :param book_path: Tệp sách khai cuộc (None hoặc tệp không tồn tại: không dùng sách)
+        :param tablebase_dir: Thư mục bảng tàn cục (None hoặc thư mục không có bảng: không dùng)
+        :param eval_cache_mb: Dung lượng bộ nhớ đệm điểm đánh giá (MB), giữ lại giữa các nước đi
+        :param null_move: Bật null-move pruning
+        :param late_move_reductions: Bật giảm độ sâu cho nước đi muộn (LMR)
+        :param futility_pruning: Bật futility pruning gần lá
+        """
         self.is_red = is_red
         self.depth = depth
-        self.transposition_table = {}
+        self.tt_size_mb = tt_size_mb
+        self.workers = workers
+        self.parallel_search = None  # LazySMPSearch, tạo khi cần lần đầu (workers > 1)
+        self.root_split = None  # RootSplitAnalyzer cho analyse, tạo khi cần lần đầu
+        self.opening_book = OpeningBook(book_path) if book_path and os.path.exists(book_path) else None
+        tablebase = Tablebase(tablebase_dir) if tablebase_dir else None
+        self.tablebase = tablebase if tablebase else None  # Thư mục không có bảng nào: không tra cứu
+        self.null_move = null_move
+        self.late_move_reductions = late_move_reductions
+        self.futility_pruning = futility_pruning
+        # Số nút/nước bị cắt bởi từng kỹ thuật trong lần get_move gần nhất
+        self.pruning_stats = {'null_move': 0, 'late_move_reductions': 0, 'futility': 0}
+        # Bảng chuyển vị dung lượng cố định, giữ lại giữa các lần get_move (mục cũ được thay trước)
+        self.transposition_table = TranspositionTable(tt_size_mb, buffer=tt_buffer)
         self.killer_moves = defaultdict(list)
         self.history_table = defaultdict(int)
         self._pos_score_cache = {}
-        self.piece_values = {
-            TYPE_GENERAL: 10000,
-            TYPE_CHARIOT: 900,
-            TYPE_CANNON: 450,
-            TYPE_HORSE: 300,
-            TYPE_ELEPHANT: 150,
-            TYPE_ADVISOR: 120,
-            TYPE_SOLDIER: {
-                'before_river': 60,
-                'after_river': 100,
-                'near_palace': 80
-            }
-        }
+        self.piece_values = PIECE_VALUES
         self.eval_weights = {
             'material': 1.2,
-            'position': 0.8,
+            'position': POSITION_WEIGHT,
             'center_control': 1.5,
             'threats': 1.0,
             'mobility': 0.6,
@@ -34,208 +91,732 @@ class ComputerPlayer:
             'piece_coordination': 0.4,
             'pawn_structure': 0.5
         }
-        self.position_scores = self._init_position_scores()
+        self.position_scores = POSITION_SCORES  # Vật chất + điểm vị trí được Position cộng dồn (game.evaluation)
+        self.debug_eval = False  # Bật để kiểm tra điểm cộng dồn với điểm quét lại toàn bộ bàn cờ ở mỗi lá
         self.simulator_board = None
-        self.eval_cache = {}
-        self.move_gen_cache = {}
-
-    def _init_position_scores(self):
-        base_scores = [
-            [0, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 10, 20, 10, 0, 0, 0],
-            [0, 0, 10, 20, 30, 20, 10, 0, 0],
-            [0, 10, 20, 30, 40, 30, 20, 10, 0],
-            [0, 20, 30, 40, 50, 40, 30, 20, 0],
-            [0, 10, 20, 30, 40, 30, 20, 10, 0],
-            [0, 0, 10, 20, 30, 20, 10, 0, 0],
-            [0, 0, 0, 10, 20, 10, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0, 0, 0, 0, 0]
-        ]
-        scores = {
-            TYPE_CHARIOT: base_scores,
-            TYPE_CANNON: [[int(score * 0.8) for score in row] for row in base_scores],
-            TYPE_HORSE: [[int(score * 0.7) for score in row] for row in base_scores],
-            TYPE_ELEPHANT: [[int(score * 0.5) for score in row] for row in base_scores],
-            TYPE_ADVISOR: [[int(score * 0.3) for score in row] for row in base_scores],
-            TYPE_SOLDIER: [[int(score * 0.6) for score in row] for row in base_scores],
-            TYPE_GENERAL: [[0] * 9 for _ in range(10)]
-        }
-        for r in range(7, 10):
-            for c in range(3, 6):
-                scores[TYPE_GENERAL][r][c] = 20
-        for r in range(0, 3):
-            for c in range(3, 6):
-                scores[TYPE_GENERAL][r][c] = 20
-        return scores
-
-    def get_move(self, board):
-        self.simulator_board = deepcopy(board)
-        self.eval_cache.clear()
-        best_move = None
-        best_score = -float('inf') if self.is_red else float('inf')
-        alpha = -float('inf')
-        beta = float('inf')
-        depth = 1
-
-        while depth <= self.depth:
-            cache_key = hash(str(board.board))
-            if cache_key in self.move_gen_cache:
-                all_valid_moves = self.move_gen_cache[cache_key]
-            else:
-                all_valid_moves = self._get_all_valid_moves()
-                self.move_gen_cache[cache_key] = all_valid_moves
+        self.eval_cache = EvalCache(eval_cache_mb)
+        self.move_gen_cache = {}  # Nước đi hợp lệ ở gốc theo khóa Zobrist, tối đa MOVE_GEN_CACHE_ENTRIES mục
+        self.time_manager = None  # TimeManager của lần tìm kiếm hiện tại (None: tìm theo độ sâu cố định)
+        self.completed_depth = 0  # Độ sâu đã hoàn thành của lần tìm kiếm hiện tại/gần nhất
+        self._stop_event = threading.Event()  # Lệnh dừng của get_move hiện tại/gần nhất (được bật bởi stop())
+        self.search_stats = SearchStats()  # Bộ đếm của lần tìm kiếm hiện tại (kể cả khi suy nghĩ trong giờ đối phương)
+        self.last_stats = None  # SearchStats của lần get_move gần nhất
+        self.stats_callback = None  # Hàm gọi lại stats_callback(stats) sau mỗi lần lặp hoàn thành
+        # Suy nghĩ trong giờ đối phương (pondering): luồng tìm kiếm nền trên thế cờ sau nước đối phương dự kiến
+        self.ponder_move = None
+        self.ponder_depth = 0  # Độ sâu đã hoàn thành của lần suy nghĩ gần nhất
+        self.ponder_stats = {'hits': 0, 'misses': 0}
+        self._ponder_key = None
+        self._ponder_thread = None
+        self._ponder_stop = None
+        # Bắt đầu/dừng suy nghĩ được gọi từ cả luồng giao diện (reset ván) lẫn luồng tìm kiếm nền (get_move)
+        self._ponder_lock = threading.RLock()
+
+    def get_move(self, board, time_left=None, move_number=0, time_limit=None, stop_event=None):
+        """
+        Tìm nước đi tốt nhất cho bên máy bằng tìm kiếm sâu dần.
+        Tìm kiếm chạy trên bản sao gọn của board (Board.clone) nên board không bị thay đổi.
+        :param time_left: Thời gian còn lại trên đồng hồ của bên máy (giây); nếu có, độ sâu do thời gian quyết định
+        :param move_number: Số nước bên máy đã đi (dùng để chia thời gian)
+        :param time_limit: Giới hạn thời gian cố định cho nước đi này (giây), thay cho time_left
+        :param stop_event: threading.Event dừng riêng lần gọi này (mặc định tạo mới; stop() cũng bật event này)
+        :return: Nước đi trong sách khai cuộc hoặc bảng tàn cục, hoặc nước đi tốt nhất của lần lặp đã hoàn thành gần nhất
+        Thống kê của lần gọi được lưu ở self.last_stats (SearchStats).
+        """
+        # Mỗi lần tìm kiếm có lệnh dừng riêng: lệnh dừng gửi tới lần trước không ảnh hưởng lần này
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+        ponder_depth = self._finish_pondering(board)
+        if self.opening_book is not None:
+            book_move = self.opening_book.choose_move(board)
+            if book_move is not None:
+                self.last_stats = SearchStats('book').finish()
+                return book_move
+        tablebase_move = self._tablebase_move(board)
+        if tablebase_move is not None:
+            self.last_stats = SearchStats('tablebase').finish()
+            return tablebase_move
+        if time_limit is not None:
+            limits = (time_limit, time_limit)
+        elif time_left is not None:
+            limits = allocate_time(time_left, move_number)
+        else:
+            limits = None
+        max_depth = self.depth if limits is None else self.MAX_DEPTH
+        if self.workers > 1:
+            self.start_workers()
+            # Các bộ đếm nằm trong các tiến trình tìm kiếm: chỉ ghi lại thời gian
+            stats = SearchStats('parallel')
+            move = self.parallel_search.get_move(board, self.is_red, max_depth, limits)
+            self.last_stats = stats.finish()
+            return move
+        # Luôn có time manager (vô hạn khi tìm theo độ sâu cố định) để stop() dừng được và đếm số nút
+        soft_limit, hard_limit = limits if limits is not None else (float('inf'), float('inf'))
+        time_manager = SharedStopTimeManager(soft_limit, hard_limit, self._stop_event)
+        try:
+            if ponder_depth:
+                # Đối phương đi đúng nước dự kiến: bảng chuyển vị đã có kết quả đến độ sâu ponder_depth,
+                # tiếp tục sâu dần từ độ sâu đó (không tăng age để giữ các mục vừa tìm)
+                return self.search(board, time_manager, max_depth, start_depth=ponder_depth)
+            self.transposition_table.new_search()
+            return self.search(board, time_manager, max_depth)
+        finally:
+            self.last_stats = self.search_stats.finish()
+
+    def start_workers(self):
+        """
+        Khởi chạy các tiến trình tìm kiếm song song (workers > 1) nếu chưa chạy. Các tiến trình được giữ
+        suốt ván cờ; gọi trước lần get_move đầu tiên để nước đi đầu không phải chờ khởi động.
+        """
+        if self.workers <= 1:
+            return
+        if self.parallel_search is None:
+            self.parallel_search = LazySMPSearch(
+                self.workers, self.tt_size_mb, null_move=self.null_move,
+                late_move_reductions=self.late_move_reductions, futility_pruning=self.futility_pruning
+            )
+        self.parallel_search.start()
+
+    def stop(self):
+        """
+        Yêu cầu lần get_move đang chạy (trong luồng khác) dừng sớm và trả về kết quả của lần lặp
+        đã hoàn thành gần nhất. Không áp dụng cho tìm kiếm song song nhiều tiến trình.
+        """
+        self._stop_event.set()
+
+    def progress(self):
+        """
+        Tiến độ của lần tìm kiếm đang chạy (đọc được từ luồng khác, ví dụ để hiển thị trên giao diện).
+        :return: Tuple (độ sâu đã hoàn thành, số nút đã duyệt)
+        """
+        time_manager = self.time_manager
+        return self.completed_depth, time_manager.nodes if time_manager is not None else 0
 
-            if not all_valid_moves:
+    def start_pondering(self, board):
+        """
+        Bắt đầu suy nghĩ trong giờ đối phương: sau khi máy đã đi (board đến lượt đối phương), lấy nước
+        đối phương dự kiến từ biến chính và tìm kiếm sâu dần thế cờ sau nước đó trong một luồng nền,
+        không giới hạn thời gian. Lần get_move tiếp theo dừng luồng này; nếu đối phương đi đúng nước
+        dự kiến, tìm kiếm tiếp tục từ độ sâu đã đạt.
+        Chỉ dùng khi tìm kiếm trong tiến trình hiện tại (workers = 1).
+        :return: Nước đi dự kiến của đối phương, hoặc None nếu không suy nghĩ
+        """
+        with self._ponder_lock:
+            self.stop_pondering()
+            if self.workers > 1:
+                return None
+            predicted = self.principal_variation(board, 1)
+            if not predicted:
                 return None
+            ponder_board = board.clone()
+            ponder_board.make_move(predicted[0])
+            if not ponder_board.generate_legal_moves():
+                return None  # Nước dự kiến kết thúc ván cờ
+            self.ponder_move = predicted[0]
+            self.ponder_depth = 0
+            self._ponder_key = ponder_board.zobrist_key
+            self._ponder_stop = threading.Event()
+            time_manager = SharedStopTimeManager(
+                float('inf'), float('inf'), self._ponder_stop, check_interval=self.PONDER_CHECK_INTERVAL)
+            self.transposition_table.new_search()
+            self._ponder_thread = threading.Thread(target=self._ponder, args=(ponder_board, time_manager), daemon=True)
+            self._ponder_thread.start()
+            return self.ponder_move
 
-            sorted_moves = self._sort_moves(all_valid_moves)
-            aspiration_window = 50
-            alpha = max(best_score - aspiration_window, -float('inf'))
-            beta = min(best_score + aspiration_window, float('inf'))
+    def _ponder(self, board, time_manager):
+        def on_iteration(depth, move, score):
+            self.ponder_depth = depth
+        self.search(board, time_manager, self.MAX_DEPTH, on_iteration=on_iteration, source='ponder')
 
-            for i, move in enumerate(sorted_moves):
-                start_pos, end_pos = move
-                self.simulator_board.simulator_move(start_pos, end_pos)
+    def stop_pondering(self):
+        """
+        Dừng luồng suy nghĩ trong giờ đối phương (nếu có) và chờ nó kết thúc.
+        :return: Độ sâu đã hoàn thành của lần suy nghĩ vừa dừng (0 nếu không có)
+        """
+        with self._ponder_lock:
+            if self._ponder_thread is None:
+                return 0
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+            self._ponder_stop = None
+            self.time_manager = None
+            return self.ponder_depth
 
-                if i == 0:
-                    score = -self.nega_scout(depth - 1, -beta, -alpha, not self.is_red)
-                else:
-                    score = -self.nega_scout(depth - 1, -beta, -alpha, not self.is_red)
-                    if alpha < score < beta:
-                        score = -self.nega_scout(depth - 1, -beta, -score, not self.is_red)
+    @property
+    def pondering(self):
+        return self._ponder_thread is not None and self._ponder_thread.is_alive()
 
-                self.simulator_board.undo_simulator_move(start_pos, end_pos)
+    def _finish_pondering(self, board):
+        """
+        Dừng suy nghĩ trong giờ đối phương khi đến lượt máy.
+        :return: Độ sâu đã hoàn thành nếu đối phương đi đúng nước dự kiến, ngược lại 0
+        """
+        with self._ponder_lock:
+            if self._ponder_thread is None:
+                return 0
+            depth = self.stop_pondering()
+            if board.zobrist_key == self._ponder_key and depth > 0:
+                self.ponder_stats['hits'] += 1
+                return depth
+            self.ponder_stats['misses'] += 1
+            return 0
 
-                if (self.is_red and score > best_score) or (not self.is_red and score < best_score):
-                    best_score = score
-                    best_move = move
+    def close(self):
+        """
+        Giải phóng tài nguyên: luồng suy nghĩ trong giờ đối phương, sách khai cuộc, bảng tàn cục,
+        tìm kiếm song song (bộ nhớ dùng chung của bảng chuyển vị, các tiến trình phân tích).
+        """
+        self.stop_pondering()
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+        if self.root_split is not None:
+            self.root_split.close()
+            self.root_split = None
 
-                if self.is_red:
-                    alpha = max(alpha, score)
-                else:
-                    beta = min(beta, score)
+    def _tablebase_move(self, board):
+        """
+        Chọn nước đi theo bảng tàn cục ở gốc: thế thắng đi nước chiếu hết nhanh nhất,
+        thế thua đi nước kéo dài nhất. Thế hòa (hoặc có nước đi tới tổ hợp quân không có bảng)
+        để tìm kiếm thường quyết định.
+        :return: Nước đi, hoặc None nếu không dùng được bảng tàn cục
+        """
+        if self.tablebase is None:
+            return None
+        color = COLOR_RED if self.is_red else COLOR_BLACK
+        if board.side_to_move != color:
+            return None  # Kết quả trong bảng tính theo bên đến lượt, không phải bên máy
+        root = self.tablebase.probe(board.position)
+        if root is None or root[0] == TB_DRAW:
+            return None
+        simulator = board.clone()
+        best_move, best_key = None, None
+        for move in simulator.generate_legal_moves(color):
+            simulator.make_move(move)
+            child = self.tablebase.probe(simulator.position)
+            simulator.unmake_move()
+            if child is None:
+                return None
+            result, distance = child
+            if result == TB_LOSS:
+                key = (2, -distance)  # Đối phương thua: càng nhanh càng tốt
+            elif result == TB_WIN:
+                key = (0, distance)  # Đối phương thắng: kéo dài càng lâu càng tốt
+            else:
+                key = (1, 0)
+            if best_key is None or key > best_key:
+                best_move, best_key = move, key
+        return best_move
 
-                if alpha >= beta:
-                    break
+    def _probe_tablebase(self, board, ply):
+        """
+        Điểm của thế cờ theo bảng tàn cục (góc nhìn bên đang đi), hoặc None nếu không có bảng.
+        Điểm thắng trừ đi số nửa nước tính từ gốc để tìm kiếm ưu tiên đường chiếu hết ngắn nhất
+        (được đổi về khoảng cách tính từ thế cờ khi lưu vào bảng chuyển vị, xem _score_to_tt).
+        """
+        position = board.position
+        if len(position.piece_lists[COLOR_RED]) + len(position.piece_lists[COLOR_BLACK]) > self.tablebase.max_pieces:
+            return None
+        entry = self.tablebase.probe(position)
+        if entry is None:
+            return None
+        result, distance = entry
+        if result == TB_DRAW:
+            return 0
+        score = self.TABLEBASE_WIN_SCORE - distance - ply
+        return score if result == TB_WIN else -score
 
-            if best_score <= alpha or best_score >= beta:
-                alpha = -float('inf')
-                beta = float('inf')
-                continue
+    def search(self, board, time_manager=None, max_depth=None, start_depth=1, on_iteration=None, source='search'):
+        """
+        Tìm kiếm sâu dần trên bản sao của board (dùng chung cho get_move và các tiến trình tìm kiếm song song).
+        :param time_manager: TimeManager giới hạn thời gian (None: tìm đến max_depth)
+        :param max_depth: Độ sâu tối đa (mặc định self.depth, hoặc MAX_DEPTH khi có time_manager)
+        :param start_depth: Độ sâu của lần lặp đầu tiên
+        :param on_iteration: Hàm gọi lại on_iteration(depth, move, score) sau mỗi lần lặp hoàn thành
+        :param source: Nhãn của lần tìm kiếm trong SearchStats ('search' hoặc 'ponder')
+        :return: Nước đi tốt nhất của lần lặp đã hoàn thành gần nhất
+        """
+        root_board = board
+        self.simulator_board = board = board.clone()
+        self._age_heuristics()
+        self.pruning_stats = dict.fromkeys(self.pruning_stats, 0)
+        self.search_stats = stats = SearchStats(source)
+        self.completed_depth = 0
+        self.time_manager = time_manager
+        if max_depth is None:
+            max_depth = self.depth if self.time_manager is None else self.MAX_DEPTH
+
+        cache_key = board.zobrist_key
+        if cache_key in self.move_gen_cache:
+            all_valid_moves = self.move_gen_cache[cache_key]
+        else:
+            all_valid_moves = self._get_all_valid_moves(self.is_red)
+            if len(self.move_gen_cache) >= self.MOVE_GEN_CACHE_ENTRIES:
+                del self.move_gen_cache[next(iter(self.move_gen_cache))]
+            self.move_gen_cache[cache_key] = all_valid_moves
+        if not all_valid_moves:
+            return None
+        if len(all_valid_moves) == 1 and self.time_manager is not None:
+            return all_valid_moves[0]  # Chỉ có một nước đi: không cần tìm kiếm
 
-            self._update_heuristics(move)
+        best_move = None
+        best_score = 0
+        # Nước đi tốt nhất đã lưu cho gốc (ví dụ từ lần suy nghĩ trong giờ đối phương) được xét trước ở lần lặp đầu
+        root_entry = self.transposition_table.probe(cache_key)
+        hint_move = decode_move(root_entry[3]) if root_entry is not None else None
+        depth = min(start_depth, max_depth)
+        iteration_time = 0.0
+        while depth <= max_depth:
+            if self.time_manager is not None and best_move is not None and not self.time_manager.should_start_iteration(iteration_time):
+                break
+            iteration_start = time.perf_counter()
+            iteration_nodes = stats.total_nodes
+            sorted_moves = self._sort_moves(all_valid_moves, best_move if best_move is not None else hint_move)
+            # Cửa sổ khát vọng quanh điểm của lần lặp trước
+            aspiration_window = 50
+            if best_move is None:
+                alpha, beta = -float('inf'), float('inf')
+            else:
+                alpha, beta = best_score - aspiration_window, best_score + aspiration_window
+            window_alpha, window_beta = alpha, beta
+            try:
+                iteration_best_move, iteration_best_score = self._search_root(sorted_moves, depth, alpha, beta)
+                if iteration_best_move is not None and (
+                    iteration_best_score <= window_alpha or iteration_best_score >= window_beta
+                ):
+                    # Điểm nằm ngoài cửa sổ: tìm lại với cửa sổ đầy đủ
+                    iteration_best_move, iteration_best_score = self._search_root(
+                        sorted_moves, depth, -float('inf'), float('inf'))
+            except SearchTimeout:
+                # Hết giờ giữa chừng: bản sao bàn cờ đang dở dang và bị bỏ đi, dùng kết quả lần lặp trước
+                self.simulator_board = root_board.clone()
+                break
+
+            if iteration_best_move is None:
+                return best_move  # Không còn nước đi hợp lệ
+
+            if self.time_manager is not None and best_move is not None and iteration_best_move != best_move:
+                # Nước đi tốt nhất thay đổi: thế cờ chưa ổn định, cho thêm thời gian
+                self.time_manager.extend(1.5)
+            best_move, best_score = iteration_best_move, iteration_best_score
+            self.transposition_table.store(board.zobrist_key, depth, BOUND_EXACT, best_score, encode_move(best_move))
+            self.completed_depth = depth
+            iteration_time = time.perf_counter() - iteration_start
+            stats.add_iteration(depth, best_move, best_score, stats.total_nodes - iteration_nodes,
+                                iteration_time, self.principal_variation(board, depth))
+            if on_iteration is not None:
+                on_iteration(depth, best_move, best_score)
+            if self.stats_callback is not None:
+                self.stats_callback(stats)
+            if abs(best_score) >= self.MATE_SCORE - self.MAX_DEPTH:
+                break  # Đã tìm thấy chiếu hết, tìm sâu hơn không thay đổi kết quả
             depth += 1
-        return best_move
+        return best_move if best_move is not None else self._sort_moves(all_valid_moves)[0]
 
-    def _get_all_valid_moves(self):
-        """Lấy tất cả các nước đi hợp lệ cho người chơi hiện tại."""
-        all_moves = []
-        for r in range(BOARD_ROWS):
-            for c in range(BOARD_COLS):
-                piece = self.simulator_board.board[r][c]
-                if piece and piece.color == self.is_red:
-                    valid_moves = piece.get_valid_moves(self.simulator_board, (r, c))
-                    all_moves.extend([(r, c), move) for move in valid_moves]
-        return all_moves
-
-    def _sort_moves(self, moves):
-        """Sắp xếp các nước đi để tìm kiếm hiệu quả hơn."""
-        def move_score(move):
-            start_pos, end_pos = move
-            target_piece = self.simulator_board.board[end_pos[0]][end_pos[1]]
-            if target_piece:
-                return self.piece_values[target_piece.type]  # Ưu tiên ăn quân
+    def analyse(self, board, depth=None):
+        """
+        Phân tích song song theo nước đi ở gốc (dùng cho phân tích hàng loạt, cần thông lượng hơn tốc độ
+        của một lần tìm kiếm): các nước ở gốc được chia cho max(workers, 1) tiến trình.
+        :return: Danh sách (move, score, pv) sắp xếp theo điểm giảm dần (xem RootSplitAnalyzer.analyse)
+        """
+        if self.root_split is None:
+            self.root_split = RootSplitAnalyzer(
+                max(self.workers, 1), self.depth, self.tt_size_mb, null_move=self.null_move,
+                late_move_reductions=self.late_move_reductions, futility_pruning=self.futility_pruning
+            )
+        return self.root_split.analyse(board, depth)
+
+    def principal_variation(self, board, max_length):
+        """
+        Dựng biến chính từ thế cờ hiện tại của board bằng cách đi theo nước đi tốt nhất lưu trong bảng chuyển vị.
+        Dừng khi không có mục, nước đi không hợp lệ (va chạm khóa) hoặc thế cờ lặp lại. Board được giữ nguyên.
+        :return: Danh sách nước đi ((row, col), (row, col))
+        """
+        pv = []
+        records = []
+        seen = set()
+        while len(pv) < max_length:
+            key = board.zobrist_key
+            entry = self.transposition_table.probe(key)
+            if entry is None or key in seen:
+                break
+            move = decode_move(entry[3])
+            if move is None or not board.is_legal_move(move):
+                break
+            seen.add(key)
+            pv.append(move)
+            records.append(board.make_move(move))
+        for record in reversed(records):
+            board.unmake_move(record)
+        return pv
+
+    def _search_root(self, moves, depth, alpha, beta):
+        """
+        Tìm kiếm các nước đi ở gốc với cửa sổ (alpha, beta).
+        :return: Tuple (nước đi tốt nhất, điểm) theo góc nhìn của bên máy
+        """
+        board = self.simulator_board
+        best_move = None
+        best_score = -float('inf')
+        searched = 0
+
+        for move in moves:
+            record = board.make_move(move)
+            if searched == 0:
+                score = -self.nega_scout(depth - 1, -beta, -alpha, not self.is_red)
             else:
-                return 0
+                score = -self.nega_scout(depth - 1, -alpha - 1, -alpha, not self.is_red)
+                if alpha < score < beta:
+                    score = -self.nega_scout(depth - 1, -beta, -score, not self.is_red)
+            searched += 1
+
+            board.unmake_move(record)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best_move, best_score
+
+    def _get_all_valid_moves(self, is_red):
+        """Lấy tất cả các nước đi hợp lệ cho bên is_red."""
+        return self.simulator_board.generate_legal_moves(COLOR_RED if is_red else COLOR_BLACK)
+
+    def _sort_moves(self, moves, tt_move=None):
+        """
+        Sắp xếp toàn bộ danh sách nước đi (dùng ở gốc, nơi danh sách được duyệt lại ở mỗi lần lặp):
+        nước đi từ bảng chuyển vị, rồi nước ăn quân theo MVV-LVA, rồi nước thường theo history.
+        """
+        grid = self.simulator_board.board
+        history = self.history_table
+        def move_score(move):
+            if move == tt_move:
+                return self.CAPTURE_ORDER_BASE * 2
+            end_row, end_col = move[1]
+            if grid[end_row][end_col] is not None:
+                return self.CAPTURE_ORDER_BASE + self._capture_score(move)  # Ưu tiên ăn quân
+            return history[move]
         return sorted(moves, key=move_score, reverse=True)
 
-    def _update_heuristics(self, move):
-        """Cập nhật killer moves và history heuristic."""
-        start_pos, end_pos = move
-        self.killer_moves[self.depth].insert(0, move)
-        self.killer_moves[self.depth] = self.killer_moves[self.depth][:2]  # Giữ tối đa 2 killer moves
-        self.history_table[start_pos, end_pos] += 1
+    def _pick_moves(self, is_red, ply, tt_move=None):
+        """
+        Sinh nước đi theo từng giai đoạn, chỉ sinh giai đoạn sau khi giai đoạn trước đã được duyệt hết,
+        nên nút bị cắt beta sớm không phải sinh và sắp xếp phần còn lại:
+        1. Nước đi từ bảng chuyển vị (được kiểm tra hợp lệ, không cần sinh nước đi)
+        2. Nước ăn quân theo MVV-LVA
+        3. Killer moves của ply này (nước thường từng gây cắt beta ở cùng độ sâu)
+        4. Các nước thường còn lại theo điểm history
+        Bàn cờ phải được trả về đúng trạng thái cũ (unmake_move) trước khi lấy nước tiếp theo.
+        """
+        board = self.simulator_board
+        color = COLOR_RED if is_red else COLOR_BLACK
+        grid = board.board
+        if tt_move is not None and board.is_legal_move(tt_move, color):
+            yield tt_move
+        else:
+            tt_move = None
+
+        for move in self._sort_captures(board.generate_captures(color)):
+            if move != tt_move:
+                yield move
+
+        killers = tuple(self.killer_moves[ply])
+        for move in killers:
+            end_row, end_col = move[1]
+            if move != tt_move and grid[end_row][end_col] is None and board.is_legal_move(move, color):
+                yield move
+
+        history = self.history_table
+        quiet_moves = board.generate_quiet_moves(color)
+        quiet_moves.sort(key=history.__getitem__, reverse=True)
+        for move in quiet_moves:
+            if move != tt_move and move not in killers:
+                yield move
+
+    def _update_heuristics(self, move, ply, depth):
+        """
+        Ghi nhận nước thường gây cắt beta: thêm vào killer moves của ply và tăng điểm history theo depth².
+        """
+        killers = self.killer_moves[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.MAX_KILLERS:]  # Giữ tối đa MAX_KILLERS killer moves mỗi ply
+        self.history_table[move] += depth * depth
+
+    def _age_heuristics(self):
+        """
+        Trước mỗi lần tìm kiếm mới: xóa killer moves (chỉ đúng với cây cũ) và giảm một nửa điểm history.
+        """
+        self.killer_moves.clear()
+        for move in list(self.history_table):
+            self.history_table[move] //= 2
+            if not self.history_table[move]:
+                del self.history_table[move]
 
-    def nega_scout(self, depth, alpha, beta, is_red):
+    def nega_scout(self, depth, alpha, beta, is_red, ply=1, allow_null=True):
         """
         Thuật toán tìm kiếm Nega-scout với alpha-beta pruning.
+        Điểm trả về theo góc nhìn của bên đang đi (is_red).
+        Các kỹ thuật tìm kiếm chọn lọc (bật/tắt trong __init__):
+        - null-move pruning: bỏ lượt mà đối phương vẫn không đạt beta thì cắt luôn
+        - late move reductions: nước thường xếp sau được tìm với độ sâu giảm, tìm lại nếu vượt alpha
+        - futility pruning: gần lá, bỏ các nước thường không thể nâng điểm tĩnh lên quá alpha
+        :param ply: Khoảng cách từ gốc (gốc là 0), dùng cho killer moves và điểm chiếu hết
+        :param allow_null: False ngay sau một nước đi rỗng (không bỏ lượt hai lần liên tiếp)
         """
-        if depth == 0:
-            return self.evaluate_board(self.simulator_board, is_red)
+        board = self.simulator_board
+        if self.time_manager is not None:
+            self.time_manager.check()
+        if depth <= 0:
+            return self.quiescence(alpha, beta, is_red, ply)
+        stats = self.search_stats
+        stats.nodes += 1
 
-        # Kiểm tra transposition table
-        cache_key = hash(str(self.simulator_board.board) + str(depth) + str(is_red))
-        if cache_key in self.transposition_table:
-            return self.transposition_table[cache_key]
+        # Kiểm tra transposition table: chỉ dùng điểm khi đủ sâu và loại cận cho phép cắt
+        key = board.zobrist_key
+        tt_move = None
+        entry = self.transposition_table.probe(key)
+        stats.tt_probes += 1
+        if entry is not None:
+            stats.tt_hits += 1
+            tt_depth, bound, tt_score, tt_move_code = entry
+            tt_move = decode_move(tt_move_code)
+            tt_score = self._score_from_tt(tt_score, ply)
+            if tt_depth >= depth and (
+                bound == BOUND_EXACT
+                or (bound == BOUND_LOWER and tt_score >= beta)
+                or (bound == BOUND_UPPER and tt_score <= alpha)
+            ):
+                stats.tt_cutoffs += 1
+                return tt_score
 
-        best_score = -float('inf') if is_red else float('inf')
-        all_valid_moves = self._get_all_valid_moves()
-        sorted_moves = self._sort_moves(all_valid_moves)
+        # Bảng tàn cục: khi còn ít quân, kết quả chính xác thay cho tìm kiếm
+        if self.tablebase is not None:
+            tablebase_score = self._probe_tablebase(board, ply)
+            if tablebase_score is not None:
+                return tablebase_score
 
-        for i, move in enumerate(sorted_moves):
-            start_pos, end_pos = move
-            self.simulator_board.simulator_move(start_pos, end_pos)
+        color = COLOR_RED if is_red else COLOR_BLACK
+        opponent = COLOR_BLACK if is_red else COLOR_RED
+        in_check = board.is_check(color)
+        static_eval = None
+        if not in_check and (
+            (self.null_move and allow_null and depth >= self.NULL_MOVE_MIN_DEPTH
+             and abs(beta) < self.MATE_SCORE // 2)
+            or (self.futility_pruning and depth < len(self.FUTILITY_MARGINS))
+        ):
+            score = self.evaluate_board(board, is_red)
+            static_eval = score if is_red else -score
 
-            if i == 0:
-                score = -self.nega_scout(depth - 1, -beta, -alpha, not is_red)
-            else:
-                score = -self.nega_scout(depth - 1, -beta, -alpha, not is_red)
-                if alpha < score < beta:
-                    score = -self.nega_scout(depth - 1, -beta, -score, not is_red)
+        # Null-move pruning: nếu bỏ lượt mà đối phương vẫn không kéo điểm xuống dưới beta thì cắt
+        if (self.null_move and allow_null and static_eval is not None and static_eval >= beta
+                and depth >= self.NULL_MOVE_MIN_DEPTH):
+            attackers = self._count_attackers(board, color)
+            if attackers > 0:  # Chỉ còn Sĩ/Tượng/Tốt: dễ rơi vào zugzwang, không bỏ lượt
+                reduction = self.NULL_MOVE_REDUCTION + (1 if depth >= 6 else 0)
+                board.make_null_move()
+                try:
+                    score = -self.nega_scout(depth - 1 - reduction, -beta, -beta + 1, not is_red, ply + 1, False)
+                finally:
+                    board.unmake_null_move()
+                if score >= beta and attackers == 1:
+                    # Tàn cuộc ít quân: xác minh bằng tìm kiếm thật với độ sâu giảm, không bỏ lượt
+                    score = self.nega_scout(depth - reduction, beta - 1, beta, is_red, ply, False)
+                if score >= beta:
+                    self.pruning_stats['null_move'] += 1
+                    return beta
+
+        original_alpha = alpha
+        best_score = -self.MATE_SCORE + ply  # Không có nước đi hợp lệ: bị chiếu hết hoặc hết nước
+        best_move = None
+        searched = 0
+        futility = (
+            self.futility_pruning and static_eval is not None and depth < len(self.FUTILITY_MARGINS)
+            and abs(alpha) < self.MATE_SCORE // 2
+            and static_eval + self.FUTILITY_MARGINS[depth] <= alpha
+        )
+        killers = self.killer_moves[ply]
 
-            self.simulator_board.undo_simulator_move(start_pos, end_pos)
+        for move in self._pick_moves(is_red, ply, tt_move):
+            end_row, end_col = move[1]
+            is_capture = board.board[end_row][end_col] is not None
+            record = board.make_move(move)
+            quiet = not is_capture and not in_check and not board.is_check(opponent)
 
-            if is_red:
-                if score > best_score:
-                    best_score = score
-                alpha = max(alpha, score)
+            if futility and quiet and searched > 0:
+                # Futility pruning: nước thường không chiếu không thể bù khoảng cách tới alpha
+                board.unmake_move(record)
+                self.pruning_stats['futility'] += 1
+                continue
+
+            if searched == 0:
+                score = -self.nega_scout(depth - 1, -beta, -alpha, not is_red, ply + 1)
             else:
-                if score < best_score:
-                    best_score = score
-                beta = min(beta, score)
+                reduction = 0
+                if (self.late_move_reductions and quiet and depth >= self.LMR_MIN_DEPTH
+                        and searched >= self.LMR_FULL_DEPTH_MOVES and move != tt_move and move not in killers):
+                    reduction = 1 if searched < self.LMR_FULL_DEPTH_MOVES * 2 else 2
+                score = -self.nega_scout(depth - 1 - reduction, -alpha - 1, -alpha, not is_red, ply + 1)
+                if reduction:
+                    if score > alpha:
+                        # Nước bị giảm độ sâu lại vượt alpha: tìm lại với độ sâu đầy đủ
+                        score = -self.nega_scout(depth - 1, -alpha - 1, -alpha, not is_red, ply + 1)
+                    else:
+                        self.pruning_stats['late_move_reductions'] += 1
+                if alpha < score < beta:
+                    score = -self.nega_scout(depth - 1, -beta, -score, not is_red, ply + 1)
+            # Hết giờ (SearchTimeout) thì không hoàn tác: bản sao bàn cờ dở dang bị bỏ đi ở search
+            board.unmake_move(record)
+            searched += 1
 
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
             if alpha >= beta:
+                stats.beta_cutoffs += 1
+                if searched == 1:
+                    stats.first_move_cutoffs += 1
+                if not is_capture:
+                    self._update_heuristics(move, ply, depth)
                 break
 
-        self.transposition_table[cache_key] = best_score
+        if best_score <= original_alpha:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.transposition_table.store(
+            key, depth, bound, self._score_to_tt(best_score, ply), encode_move(best_move) if best_move else 0
+        )
         return best_score
 
+    def _score_to_tt(self, score, ply):
+        """
+        Điểm chiếu hết và điểm bảng tàn cục tính từ gốc (trừ ply) được đổi thành khoảng cách tính từ thế cờ
+        đang lưu, để mục trong bảng chuyển vị vẫn đúng khi gặp lại thế cờ ở ply khác hoặc ở nước đi sau.
+        """
+        if score >= self.DECISIVE_BOUND:
+            return score + ply
+        if score <= -self.DECISIVE_BOUND:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply):
+        """
+        Ngược lại với _score_to_tt: đổi điểm chiếu hết/bảng tàn cục đọc từ bảng chuyển vị về khoảng cách tính từ gốc.
+        """
+        if score >= self.DECISIVE_BOUND:
+            return score - ply
+        if score <= -self.DECISIVE_BOUND:
+            return score + ply
+        return score
+
+    def _count_attackers(self, board, color):
+        """Số quân tấn công (Xe, Mã, Pháo) của bên color, dùng để nhận biết tàn cuộc dễ zugzwang."""
+        return sum(1 for piece in board.get_pieces_by_color(color) if piece.type in self.ATTACKING_TYPES)
+
+    def quiescence(self, alpha, beta, is_red, ply=0, quiescence_depth=0):
+        """
+        Tìm kiếm tĩnh: chỉ mở rộng các nước ăn quân cho đến khi thế cờ yên tĩnh để tránh hiệu ứng đường chân trời.
+        Nếu đang bị chiếu thì xét mọi nước đỡ chiếu (không được đứng yên).
+        Điểm trả về theo góc nhìn của bên đang đi (is_red).
+        :param ply: Khoảng cách từ gốc, dùng cho điểm chiếu hết
+        :param quiescence_depth: Số nửa nước đã đi trong tìm kiếm tĩnh
+        """
+        board = self.simulator_board
+        if self.time_manager is not None:
+            self.time_manager.check()
+        self.search_stats.qnodes += 1
+        color = COLOR_RED if is_red else COLOR_BLACK
+        in_check = board.is_check(color)
+
+        if in_check:
+            moves = self._get_all_valid_moves(is_red)
+            if not moves:
+                return -self.MATE_SCORE + ply
+            best_score = -self.MATE_SCORE + ply
+            stand_pat = None
+        else:
+            # Đứng yên (stand pat): bên đi có thể không ăn quân nếu mọi nước ăn đều tệ hơn
+            score = self.evaluate_board(board, is_red)
+            stand_pat = score if is_red else -score
+            if stand_pat >= beta or quiescence_depth >= self.MAX_QUIESCENCE_DEPTH:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best_score = stand_pat
+            moves = board.generate_captures(color)
+
+        for move in self._sort_captures(moves):
+            end_row, end_col = move[1]
+            captured = board.board[end_row][end_col]
+            if stand_pat is not None and captured is not None:
+                # Delta pruning: kể cả ăn được quân này cũng không thể nâng điểm lên trên alpha
+                if stand_pat + self.get_piece_value(captured, end_row, end_col) + self.DELTA_MARGIN <= alpha:
+                    continue
+            record = board.make_move(move)
+            score = -self.quiescence(-beta, -alpha, not is_red, ply + 1, quiescence_depth + 1)
+            board.unmake_move(record)
+
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return best_score
+
+    def _sort_captures(self, moves):
+        """Sắp xếp nước ăn quân theo MVV-LVA: quân bị ăn giá trị cao trước, quân ăn giá trị thấp trước."""
+        return sorted(moves, key=self._capture_score, reverse=True)
+
+    def _capture_score(self, move):
+        """Điểm MVV-LVA của một nước đi (0 nếu không ăn quân)."""
+        grid = self.simulator_board.board
+        (start_row, start_col), (end_row, end_col) = move
+        victim = grid[end_row][end_col]
+        if victim is None:
+            return 0
+        attacker = grid[start_row][start_col]
+        return (self.get_piece_value(victim, end_row, end_col) * 10
+                - self.get_piece_value(attacker, start_row, start_col) // 10)
+
     def evaluate_board(self, board, is_red):
-        """Đánh giá điểm của bàn cờ."""
-        if hash(str(board.board)) in self.eval_cache:
-            return self.eval_cache[hash(str(board.board))]
-
-        score = 0
-        for r in range(BOARD_ROWS):
-            for c in range(BOARD_COLS):
-                piece = board.board[r][c]
-                if piece:
-                    if piece.color == COLOR_RED:
-                        mult = 1
-                    else:
-                        mult = -1
-                    score += mult * self.get_piece_value(piece, r, c)
+        """Đánh giá điểm của bàn cờ theo góc nhìn của bên đỏ."""
+        cache_key = board.zobrist_key
+        score = self.eval_cache.probe(cache_key)
+        if score is not None:
+            return score
+
+        # Vật chất và điểm vị trí được Position cập nhật dần trong make_move/unmake_move
+        score = board.position.score
+        if self.debug_eval:
+            assert score == board.position.compute_score(), "Điểm cộng dồn lệch với điểm quét lại bàn cờ"
 
-        self.eval_cache[hash(str(board.board))] = score
+        # Độ cơ động và an toàn Tướng lấy trực tiếp từ bản đồ tấn công được cập nhật dần
+        score += self.eval_weights['mobility'] * (board.mobility[COLOR_RED] - board.mobility[COLOR_BLACK])
+        score += self.eval_weights['king_safety'] * (
+            self._palace_pressure(board, COLOR_BLACK) - self._palace_pressure(board, COLOR_RED)
+        )
+
+        score = int(round(score))
+        self.eval_cache.store(cache_key, score)
         return score
 
+    def _palace_pressure(self, board, color):
+        """Tổng số lượt tấn công của đối phương vào các ô trong cung của bên color."""
+        attacks = board.attack_maps[COLOR_BLACK if color == COLOR_RED else COLOR_RED]
+        return sum(attacks[square] for square in PALACE_SQUARES[color])
+
     def get_piece_value(self, piece, row, col):
         """Lấy giá trị của một quân cờ, có tính đến vị trí."""
-        if piece.type == TYPE_SOLDIER:
-            if piece.color == COLOR_RED:
-                if row < 5:
-                    return self.piece_values[piece.type]['before_river']
-                elif 5 <= row <= 6:
-                    return self.piece_values[piece.type]['after_river']
-                else:
-                    return self.piece_values[piece.type]['near_palace']
-            else:  # Black
-                if row > 4:
-                    return self.piece_values[piece.type]['before_river']
-                elif 3 <= row <= 4:
-                    return self.piece_values[piece.type]['after_river']
-                else:
-                    return self.piece_values[piece.type]['near_palace']
-        else:
-            return self.piece_values[piece.type]
+        return piece_value(piece.type, piece.color, row)
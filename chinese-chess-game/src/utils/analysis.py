@@ -0,0 +1,113 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from utils.const import COLOR_RED
+
+# Phân tích song song theo nước đi ở gốc (root splitting) cho các tác vụ phân tích hàng loạt.
+# Mỗi tiến trình trong ProcessPoolExecutor giữ sẵn một ComputerPlayer và một Board (tạo một lần trong
+# initializer), nên mỗi tác vụ chỉ truyền chuỗi FEN và một nước đi thay vì pickle cả Board.
+# Các tiến trình dùng chung cận alpha tốt nhất hiện tại (multiprocessing.Value) để cắt nhánh sớm.
+
+NO_ALPHA = -(1 << 40)  # Giá trị khởi tạo của cận alpha dùng chung (chưa có nước nào được tìm xong)
+
+_worker_state = {}
+
+
+def _init_worker(depth, tt_size_mb, options, shared_alpha):
+    """
+    Khởi tạo engine của tiến trình (chạy một lần khi tiến trình được tạo).
+    """
+    from game.board import Board
+    from utils.ComputerPlayer import ComputerPlayer
+
+    _worker_state['engine'] = ComputerPlayer(True, depth=depth, tt_size_mb=tt_size_mb, book_path=None, **options)
+    _worker_state['board'] = Board()
+    _worker_state['fen'] = None
+    _worker_state['shared_alpha'] = shared_alpha
+
+
+def _analyse_root_move(fen, move, depth):
+    """
+    Tìm kiếm cây con của một nước đi ở gốc với cửa sổ (alpha dùng chung - 1, +vô cùng).
+    :return: Tuple (move, score, pv); score theo góc nhìn của bên đi ở gốc
+    """
+    engine = _worker_state['engine']
+    board = _worker_state['board']
+    shared_alpha = _worker_state['shared_alpha']
+    if _worker_state['fen'] != fen:
+        board.load_fen(fen)
+        _worker_state['fen'] = fen
+        engine.transposition_table.new_search()
+
+    is_red = board.side_to_move == COLOR_RED
+    engine.is_red = is_red
+    engine.simulator_board = board
+    engine.time_manager = None
+    # Cửa sổ mở từ alpha - 1 để nước đi ngang điểm nước tốt nhất vẫn nhận điểm chính xác
+    alpha = shared_alpha.value
+    alpha = -float('inf') if alpha == NO_ALPHA else alpha - 1
+
+    record = board.make_move(move)
+    try:
+        score = -engine.nega_scout(depth - 1, -float('inf'), -alpha, not is_red)
+        pv = [move] + engine.principal_variation(board, depth - 1)
+    finally:
+        board.unmake_move(record)
+
+    with shared_alpha.get_lock():
+        if score > shared_alpha.value:
+            shared_alpha.value = score
+    return move, score, pv
+
+
+class RootSplitAnalyzer:
+    """
+    Chia các nước đi ở gốc cho một nhóm tiến trình (concurrent.futures.ProcessPoolExecutor).
+    Nhóm tiến trình được giữ lại giữa các lần analyse để phân tích hàng loạt thế cờ.
+    Các lần analyse phải được gọi lần lượt (cận alpha dùng chung thuộc về một thế cờ gốc tại một thời điểm).
+    """
+
+    def __init__(self, workers=None, depth=4, tt_size_mb=16, **options):
+        """
+        :param workers: Số tiến trình (mặc định os.cpu_count())
+        :param depth: Độ sâu phân tích mặc định
+        :param tt_size_mb: Dung lượng bảng chuyển vị của mỗi tiến trình (MB)
+        :param options: Tùy chọn tìm kiếm chọn lọc truyền cho ComputerPlayer của mỗi tiến trình
+        """
+        self.depth = depth
+        self.shared_alpha = multiprocessing.Value('q', NO_ALPHA)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(depth, tt_size_mb, options, self.shared_alpha),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Dừng các tiến trình phân tích.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def analyse(self, board, depth=None):
+        """
+        Phân tích mọi nước đi hợp lệ của bên đến lượt trong board.
+        Nước đi kém hơn cận alpha lúc được tìm chỉ có cận trên (điểm thật <= score < điểm tốt nhất);
+        nước đi tốt nhất (và các nước ngang điểm) luôn có điểm chính xác.
+        :return: Danh sách (move, score, pv) sắp xếp theo điểm giảm dần; pv bắt đầu bằng move
+        """
+        depth = self.depth if depth is None else depth
+        # Nước ăn quân được gửi trước để cận alpha dùng chung sớm có giá trị tốt
+        captures = board.generate_captures()
+        moves = captures + [move for move in board.generate_legal_moves() if move not in captures]
+        if not moves:
+            return []
+        fen = board.to_fen()
+        self.shared_alpha.value = NO_ALPHA
+        futures = [self.executor.submit(_analyse_root_move, fen, move, depth) for move in moves]
+        results = [future.result() for future in futures]
+        results.sort(key=lambda result: result[1], reverse=True)
+        return results
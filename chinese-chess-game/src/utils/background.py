@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Chạy ComputerPlayer.get_move trong một luồng riêng để vòng lặp sự kiện pygame không bị chặn.
+# Mỗi BackgroundSearch có một luồng thực thi duy nhất nên các lần tìm kiếm của cùng một máy không
+# bao giờ chạy chồng lên nhau. Kết quả trả về qua Future; giao diện kiểm tra future.done() mỗi khung
+# hình và áp dụng nước đi trong luồng chính (pygame không an toàn khi gọi từ nhiều luồng).
+
+
+class BackgroundSearch:
+    """
+    Giao diện bất đồng bộ cho một ComputerPlayer.
+    """
+
+    def __init__(self, computer):
+        self.computer = computer
+        self.future = None
+        self._stop_event = None  # Lệnh dừng riêng của lần tìm kiếm hiện tại
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-search")
+
+    @property
+    def thinking(self):
+        return self.future is not None and not self.future.done()
+
+    def submit(self, board, **kwargs):
+        """
+        Bắt đầu tìm nước đi cho thế cờ hiện tại của board (tìm trên bản sao, board có thể thay đổi ngay sau đó).
+        :param kwargs: Tham số của ComputerPlayer.get_move (time_left, move_number, time_limit)
+        :return: Future chứa nước đi
+        """
+        self._stop_event = threading.Event()
+        self.future = self._executor.submit(
+            self.computer.get_move, board.clone(), stop_event=self._stop_event, **kwargs)
+        return self.future
+
+    def progress(self):
+        """
+        :return: Tuple (độ sâu đã hoàn thành, số nút) của lần tìm kiếm đang chạy
+        """
+        return self.computer.progress()
+
+    def cancel(self, wait_done=False):
+        """
+        Bỏ lần tìm kiếm hiện tại: chưa chạy thì hủy, đang chạy thì yêu cầu dừng sớm. Kết quả bị bỏ qua.
+        Lệnh dừng gắn với đúng lần tìm kiếm này nên không bị mất dù tìm kiếm vừa bắt đầu hay vừa kết thúc.
+        :param wait_done: Chờ lần tìm kiếm dừng hẳn (trước khi dùng lại máy từ luồng khác)
+        """
+        future = self.future
+        if future is not None and not future.cancel():
+            self._stop_event.set()
+            if wait_done:
+                wait([future])
+        self.future = None
+
+    def close(self):
+        """
+        Dừng tìm kiếm đang chạy, chờ luồng thực thi kết thúc và giải phóng tài nguyên của máy.
+        """
+        self.cancel(wait_done=True)
+        self._executor.shutdown(wait=True)
+        self.computer.close()
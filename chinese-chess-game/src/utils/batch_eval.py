@@ -0,0 +1,60 @@
+from game.position import PIECE_SQUARE_SCORE, NUM_SQUARES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy là phụ thuộc tùy chọn, chỉ cần cho đánh giá hàng loạt
+    np = None
+
+# Đánh giá hàng loạt phần vật chất + điểm vị trí của nhiều thế cờ bằng NumPy (dùng cho tinh chỉnh
+# tham số và phân tích). Mỗi thế cờ được mã hóa thành một hàng 90 mã quân (int8); điểm là tổng các
+# phần tử PIECE_SQUARE_SCORE[mã quân, ô], tức đúng bằng Position.score của thế cờ đó.
+
+_TABLE = None  # PIECE_SQUARE_SCORE chuyển vị và trải phẳng: phần tử square * 16 + code, tạo khi cần lần đầu
+_OFFSETS = None  # square * 16 cho từng cột của mảng mã quân
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Đánh giá hàng loạt cần NumPy: pip install numpy")
+
+
+def _tables():
+    global _TABLE, _OFFSETS
+    if _TABLE is None:
+        table = np.array(PIECE_SQUARE_SCORE, dtype=np.int32)
+        _TABLE = np.ascontiguousarray(table.T).ravel()
+        _OFFSETS = np.arange(NUM_SQUARES, dtype=np.int16) * table.shape[0]
+    return _TABLE, _OFFSETS
+
+
+def encode_positions(positions):
+    """
+    Mã hóa các thế cờ thành mảng (N, 90) int8 các mã quân.
+    :param positions: Danh sách Position hoặc Board
+    """
+    _require_numpy()
+    data = b"".join(bytes(getattr(position, "position", position).squares) for position in positions)
+    return np.frombuffer(data, dtype=np.int8).reshape(-1, NUM_SQUARES)
+
+
+def evaluate_codes(codes):
+    """
+    Tổng vật chất + điểm vị trí theo góc nhìn bên đỏ của các thế cờ đã mã hóa.
+    :param codes: Mảng (N, 90) mã quân (như kết quả của encode_positions)
+    :return: Mảng (N,) int32, phần tử thứ i bằng Position.score của thế cờ thứ i
+    """
+    _require_numpy()
+    codes = np.asarray(codes)
+    if codes.ndim != 2 or codes.shape[1] != NUM_SQUARES:
+        raise ValueError(f"Cần mảng (N, {NUM_SQUARES}) mã quân, nhận được {codes.shape}")
+    # Chỉ số phẳng ô * 16 + mã quân (vừa int16, các ô liền nhau nằm gần nhau trong bảng):
+    # một lần gather trên bảng rồi cộng theo hàng
+    table, offsets = _tables()
+    return table.take(codes.astype(np.int16) + offsets).sum(axis=1, dtype=np.int32)
+
+
+def evaluate_positions(positions):
+    """
+    Đánh giá hàng loạt các Position/Board (vật chất + điểm vị trí, góc nhìn bên đỏ).
+    """
+    return evaluate_codes(encode_positions(positions))
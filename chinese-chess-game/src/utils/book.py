@@ -0,0 +1,175 @@
+import mmap
+import os
+import random
+import struct
+from collections import defaultdict
+from utils.const import BOARD_ROWS, COLOR_RED, START_FEN
+from utils.transposition import encode_move, decode_move
+
+# Sách khai cuộc nhị phân: dãy bản ghi (key, move, weight) sắp xếp theo key, mỗi bản ghi 12 byte big-endian:
+#   key: khóa Zobrist 64 bit của thế cờ, move: nước đi mã hóa bằng encode_move (16 bit), weight: trọng số (16 bit)
+# Sách được mở bằng mmap và tra cứu bằng tìm kiếm nhị phân nên không phải đọc cả tệp khi khởi động.
+# Biên bản ván cờ dùng ký hiệu tọa độ ICCS: cột a..i từ trái sang phải, hàng 0..9 từ phía quân đỏ (ví dụ "h2e2").
+
+RECORD = struct.Struct(">QHH")
+KEY = struct.Struct(">Q")
+MAX_WEIGHT = 0xFFFF
+DEFAULT_BOOK_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "data", "book.bin"))
+RESULT_WEIGHTS = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}  # (trọng số nước đỏ, trọng số nước đen)
+
+
+def parse_iccs(text):
+    """
+    Chuyển nước đi ICCS (ví dụ "h2e2" hoặc "h2-e2") thành ((row, col), (row, col)).
+    """
+    text = text.replace("-", "").lower()
+    if len(text) != 4 or not ("a" <= text[0] <= "i" and "a" <= text[2] <= "i"
+                              and text[1].isdigit() and text[3].isdigit()):
+        raise ValueError(f"Nước đi ICCS không hợp lệ: {text}")
+    return ((BOARD_ROWS - 1 - int(text[1]), ord(text[0]) - ord("a")),
+            (BOARD_ROWS - 1 - int(text[3]), ord(text[2]) - ord("a")))
+
+
+def format_iccs(move):
+    """
+    Chuyển nước đi ((row, col), (row, col)) thành ký hiệu ICCS.
+    """
+    (start_row, start_col), (end_row, end_col) = move
+    return (f"{chr(ord('a') + start_col)}{BOARD_ROWS - 1 - start_row}"
+            f"{chr(ord('a') + end_col)}{BOARD_ROWS - 1 - end_row}")
+
+
+class OpeningBook:
+    """
+    Sách khai cuộc chỉ đọc, ánh xạ vào bộ nhớ (mmap). Tra cứu theo khóa Zobrist bằng tìm kiếm nhị phân.
+    """
+
+    def __init__(self, path, rng=None):
+        """
+        :param path: Đường dẫn tệp sách
+        :param rng: random.Random dùng cho lựa chọn ngẫu nhiên theo trọng số (mặc định tạo mới)
+        """
+        self.path = path
+        self.rng = rng if rng is not None else random.Random()
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size % RECORD.size:
+            self._file.close()
+            raise ValueError(f"Tệp sách khai cuộc bị hỏng (kích thước {size} không chia hết cho {RECORD.size})")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.num_records = size // RECORD.size
+
+    def __len__(self):
+        return self.num_records
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def _key_at(self, index):
+        return KEY.unpack_from(self._data, index * RECORD.size)[0]
+
+    def probe(self, key):
+        """
+        Tìm các nước đi trong sách của thế cờ có khóa key.
+        :return: Danh sách (move, weight) theo thứ tự trong tệp (trọng số giảm dần)
+        """
+        low, high = 0, self.num_records
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        for index in range(low, self.num_records):
+            record_key, move_code, weight = RECORD.unpack_from(self._data, index * RECORD.size)
+            if record_key != key:
+                break
+            entries.append((decode_move(move_code), weight))
+        return entries
+
+    def choose_move(self, board):
+        """
+        Chọn ngẫu nhiên theo trọng số một nước đi trong sách cho thế cờ hiện tại của board.
+        Nước đi không hợp lệ (va chạm khóa) bị bỏ qua.
+        :return: Nước đi ((row, col), (row, col)) hoặc None nếu thế cờ không có trong sách
+        """
+        entries = [(move, weight) for move, weight in self.probe(board.zobrist_key)
+                   if weight > 0 and board.is_legal_move(move)]
+        if not entries:
+            return None
+        moves, weights = zip(*entries)
+        return self.rng.choices(moves, weights=weights)[0]
+
+
+class BookBuilder:
+    """
+    Tạo sách khai cuộc từ biên bản ván cờ (hoặc ván tự đấu): cộng trọng số cho mỗi cặp (thế cờ, nước đi)
+    trong max_ply nửa nước đầu của mỗi ván, rồi ghi ra tệp đã sắp xếp.
+    """
+
+    def __init__(self, max_ply=20):
+        self.max_ply = max_ply
+        self.weights = defaultdict(int)  # (key, move_code) -> trọng số
+
+    def add_game(self, moves, result=None, fen=START_FEN, record_from=0):
+        """
+        Thêm một ván cờ.
+        :param moves: Danh sách nước đi ((row, col), (row, col)) bắt đầu từ thế cờ fen
+        :param result: "1-0", "0-1", "1/2-1/2" hoặc None; nước của bên thắng được tính gấp đôi, bên thua không tính
+        :param record_from: Bỏ qua chừng này nửa nước đầu (ví dụ các nước ngẫu nhiên của ván tự đấu)
+        """
+        from game.board import Board
+
+        board = Board()
+        board.load_fen(fen)
+        red_weight, black_weight = RESULT_WEIGHTS.get(result, (1, 1))
+        for ply, move in enumerate(moves[:self.max_ply]):
+            if not board.is_legal_move(move):
+                raise ValueError(f"Nước đi không hợp lệ ở nửa nước {ply + 1}: {format_iccs(move)}")
+            weight = red_weight if board.side_to_move == COLOR_RED else black_weight
+            if ply >= record_from and weight:
+                self.weights[board.zobrist_key, encode_move(move)] += weight
+            board.make_move(move)
+
+    def add_record_file(self, path, fen=START_FEN):
+        """
+        Đọc biên bản ván cờ dạng văn bản: mỗi dòng một ván gồm các nước ICCS cách nhau bởi khoảng trắng,
+        có thể kết thúc bằng kết quả ("1-0", "0-1", "1/2-1/2", "*"). Phần sau dấu # là chú thích, dòng trống bị bỏ qua.
+        :return: Số ván đã đọc
+        """
+        games = 0
+        with open(path, encoding="utf-8") as record_file:
+            for line_number, line in enumerate(record_file, 1):
+                tokens = line.split("#", 1)[0].split()
+                if not tokens:
+                    continue
+                result = None
+                if tokens[-1] in RESULT_WEIGHTS or tokens[-1] == "*":
+                    result = tokens.pop()
+                try:
+                    self.add_game([parse_iccs(token) for token in tokens], result, fen)
+                except ValueError as error:
+                    raise ValueError(f"{path}:{line_number}: {error}") from None
+                games += 1
+        return games
+
+    def write(self, path, min_weight=1):
+        """
+        Ghi sách ra tệp: bản ghi sắp xếp theo khóa, cùng khóa thì trọng số giảm dần.
+        :return: Số bản ghi đã ghi
+        """
+        records = sorted(
+            ((key, move_code, min(weight, MAX_WEIGHT))
+             for (key, move_code), weight in self.weights.items() if weight >= min_weight),
+            key=lambda record: (record[0], -record[2], record[1]),
+        )
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as book_file:
+            for record in records:
+                book_file.write(RECORD.pack(*record))
+        return len(records)
@@ -56,4 +56,16 @@ TYPE_ELEPHANT = "elephant"
 TYPE_HORSE = "horse"
 TYPE_CHARIOT = "chariot"
 TYPE_CANNON = "cannon"
-TYPE_SOLDIER = "soldier"
\ No newline at end of file
+TYPE_SOLDIER = "soldier"
+# --- FEN ---
+# Ký hiệu quân trong FEN (chữ thường là quân đen, chữ hoa là quân đỏ); hàng đầu tiên là hàng 0 (phía đen)
+FEN_PIECE_LETTERS = {
+    TYPE_GENERAL: "k",
+    TYPE_ADVISOR: "a",
+    TYPE_ELEPHANT: "b",
+    TYPE_HORSE: "n",
+    TYPE_CHARIOT: "r",
+    TYPE_CANNON: "c",
+    TYPE_SOLDIER: "p"
+}
+START_FEN = "rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w - - 0 1"
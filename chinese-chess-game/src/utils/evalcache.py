@@ -0,0 +1,89 @@
+from array import array
+
+# Bộ nhớ đệm điểm đánh giá tĩnh, dung lượng cố định, khóa là khóa Zobrist của thế cờ.
+# Các mục được nhóm theo cặp (tập 2 đường, set-associative): ô đầu của mỗi tập là mục dùng gần nhất.
+# Khi trúng ở ô thứ hai, hai ô đổi chỗ; mục mới đẩy ô đầu xuống ô thứ hai và bỏ mục cũ nhất (LRU).
+# Điểm đánh giá chỉ phụ thuộc vào thế cờ nên bộ đệm được giữ lại giữa các nước đi trong một ván.
+
+ENTRY_BYTES = 16  # Khóa 64 bit + điểm 64 bit
+WAYS = 2
+
+
+def entries_for_size(size_mb):
+    """
+    Số mục (lũy thừa của 2, tối thiểu một tập) vừa với dung lượng size_mb.
+    """
+    entries = WAYS
+    while entries * 2 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+        entries *= 2
+    return entries
+
+
+class EvalCache:
+    """
+    Bộ nhớ đệm điểm đánh giá dạng mảng, 2 đường mỗi tập, thay thế mục dùng lâu nhất trong tập.
+    Khóa 0 (bàn cờ trống, đỏ đi) đánh dấu ô trống nên không được lưu.
+    """
+
+    def __init__(self, size_mb=2):
+        """
+        :param size_mb: Dung lượng bộ đệm theo MB
+        """
+        self.num_entries = entries_for_size(size_mb)
+        self.set_mask = self.num_entries - WAYS
+        self.keys = array('Q', bytes(8 * self.num_entries))
+        self.scores = array('q', bytes(8 * self.num_entries))
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self):
+        return self.num_entries * ENTRY_BYTES
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """
+        Xóa toàn bộ bộ đệm và bộ đếm.
+        """
+        self.keys = array('Q', bytes(8 * self.num_entries))
+        self.scores = array('q', bytes(8 * self.num_entries))
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key):
+        """
+        Tìm điểm theo khóa Zobrist.
+        :return: Điểm đã lưu hoặc None
+        """
+        keys = self.keys
+        slot = key & self.set_mask
+        if key and keys[slot] == key:
+            self.hits += 1
+            return self.scores[slot]
+        if key and keys[slot + 1] == key:
+            # Trúng ở ô thứ hai: đưa lên đầu tập
+            scores = self.scores
+            score = scores[slot + 1]
+            keys[slot + 1], scores[slot + 1] = keys[slot], scores[slot]
+            keys[slot], scores[slot] = key, score
+            self.hits += 1
+            return score
+        self.misses += 1
+        return None
+
+    def store(self, key, score):
+        """
+        Lưu điểm của thế cờ; mục dùng lâu nhất trong tập bị thay.
+        """
+        if not key:
+            return
+        keys, scores = self.keys, self.scores
+        slot = key & self.set_mask
+        if keys[slot] != key:
+            keys[slot + 1], scores[slot + 1] = keys[slot], scores[slot]
+            keys[slot] = key
+        scores[slot] = score
@@ -0,0 +1,133 @@
+import time
+
+# Thống kê của một lần tìm kiếm, dùng để tinh chỉnh thứ tự nước đi, bảng chuyển vị và các kỹ thuật cắt tỉa.
+# Các bộ đếm là số nguyên trên một đối tượng có __slots__, được cộng trực tiếp trong nega_scout/quiescence
+# nên chi phí rất nhỏ so với sinh nước đi và đánh giá ở mỗi nút; thống kê luôn được bật.
+# Các chỉ số suy ra (nút/giây, tỉ lệ trúng bảng chuyển vị, hệ số phân nhánh...) chỉ tính khi được đọc.
+
+
+class IterationStats:
+    """
+    Kết quả của một lần lặp đã hoàn thành trong tìm kiếm sâu dần.
+    - nodes: số nút (kể cả nút tìm kiếm tĩnh) của riêng lần lặp này, gồm cả các lần tìm lại
+    - elapsed: thời gian của lần lặp (giây)
+    - pv: biến chính dựng từ bảng chuyển vị sau lần lặp
+    """
+    __slots__ = ("depth", "move", "score", "nodes", "elapsed", "pv")
+
+    def __init__(self, depth, move, score, nodes, elapsed, pv):
+        self.depth = depth
+        self.move = move
+        self.score = score
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.pv = pv
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class SearchStats:
+    """
+    Bộ đếm của một lần tìm kiếm:
+    - nodes / qnodes: số nút của tìm kiếm chính / tìm kiếm tĩnh
+    - tt_probes / tt_hits / tt_cutoffs: số lần tra bảng chuyển vị, số lần có mục, số lần dùng được điểm để cắt
+    - beta_cutoffs / first_move_cutoffs: số nút bị cắt beta, trong đó bao nhiêu nút cắt ngay ở nước đầu tiên
+    - iterations: IterationStats của từng lần lặp đã hoàn thành
+    - source: nguồn của nước đi ('search', 'book', 'tablebase' hoặc 'parallel'; với hai nguồn đầu không có bộ đếm)
+    """
+    __slots__ = (
+        "source", "nodes", "qnodes", "tt_probes", "tt_hits", "tt_cutoffs",
+        "beta_cutoffs", "first_move_cutoffs", "iterations", "start_time", "elapsed"
+    )
+
+    def __init__(self, source="search"):
+        self.source = source
+        self.nodes = 0
+        self.qnodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.iterations = []
+        self.start_time = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def total_nodes(self):
+        return self.nodes + self.qnodes
+
+    @property
+    def depth(self):
+        return self.iterations[-1].depth if self.iterations else 0
+
+    @property
+    def pv(self):
+        return self.iterations[-1].pv if self.iterations else []
+
+    @property
+    def nps(self):
+        elapsed = self.elapsed or time.perf_counter() - self.start_time
+        return self.total_nodes / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Tỉ lệ nút cắt beta ngay ở nước đầu tiên (càng gần 1 thứ tự nước đi càng tốt)."""
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Số nút của lần lặp cuối chia cho số nút của lần lặp trước đó (0 nếu chưa đủ hai lần lặp)."""
+        if len(self.iterations) < 2 or not self.iterations[-2].nodes:
+            return 0.0
+        return self.iterations[-1].nodes / self.iterations[-2].nodes
+
+    def add_iteration(self, depth, move, score, nodes, elapsed, pv):
+        """
+        Ghi lại một lần lặp đã hoàn thành.
+        :return: IterationStats vừa thêm
+        """
+        iteration = IterationStats(depth, move, score, nodes, elapsed, pv)
+        self.iterations.append(iteration)
+        return iteration
+
+    def finish(self):
+        """
+        Chốt thời gian tìm kiếm khi lần tìm kiếm kết thúc.
+        """
+        self.elapsed = time.perf_counter() - self.start_time
+        return self
+
+    def as_dict(self):
+        """
+        Toàn bộ thống kê (bộ đếm và chỉ số suy ra) dưới dạng dict, ví dụ để ghi log hoặc xuất JSON.
+        """
+        return {
+            'source': self.source,
+            'depth': self.depth,
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'nps': self.nps,
+            'elapsed': self.elapsed,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_cutoffs': self.tt_cutoffs,
+            'tt_hit_rate': self.tt_hit_rate,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'effective_branching_factor': self.effective_branching_factor,
+            'pv': self.pv,
+            'iterations': [iteration.as_dict() for iteration in self.iterations],
+        }
+
+    def __str__(self):
+        return (
+            f"{self.source}: độ sâu {self.depth}, {self.nodes} nút + {self.qnodes} nút tĩnh, "
+            f"{self.nps:.0f} nút/s, TT {self.tt_hits}/{self.tt_probes} ({self.tt_cutoffs} cắt), "
+            f"cắt ở nước đầu {self.first_move_cutoff_rate:.0%}, EBF {self.effective_branching_factor:.2f}"
+        )
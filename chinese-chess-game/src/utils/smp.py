@@ -0,0 +1,217 @@
+import multiprocessing
+import queue
+import time
+import weakref
+from multiprocessing import shared_memory
+from utils.const import COLOR_RED, COLOR_BLACK
+from utils.transposition import TranspositionTable, entries_for_size, ENTRY_BYTES
+from utils.timeman import TimeManager, SearchTimeout, CHECK_INTERVAL
+
+# Tìm kiếm song song kiểu Lazy SMP: nhiều tiến trình cùng tìm kiếm sâu dần trên cùng một thế cờ gốc,
+# chia sẻ một bảng chuyển vị đặt trong bộ nhớ dùng chung (multiprocessing.shared_memory).
+# Các tiến trình không trao đổi gì khác ngoài bảng chuyển vị: kết quả của tiến trình này giúp
+# các tiến trình khác cắt nhánh và sắp xếp nước đi. Tiến trình lẻ bắt đầu sâu hơn một nửa nước
+# để các tiến trình không đi cùng một đường.
+
+DEPTH_OFFSETS = (0, 1)      # Độ lệch độ sâu bắt đầu theo chỉ số tiến trình (lặp vòng)
+RESULT_POLL_INTERVAL = 0.05  # Khoảng thời gian chờ kết quả giữa hai lần kiểm tra hạn chót (giây)
+STOP_GRACE = 0.5            # Thời gian chờ thêm sau giới hạn cứng trước khi dừng hẳn các tiến trình (giây)
+
+
+class SharedStopTimeManager(TimeManager):
+    """
+    TimeManager của tiến trình tìm kiếm: dừng khi quá giới hạn cứng hoặc khi tiến trình chính
+    bật stop_event (ví dụ đã có tiến trình hoàn thành độ sâu yêu cầu).
+    """
+
+    def __init__(self, soft_limit, hard_limit, stop_event, check_interval=CHECK_INTERVAL):
+        super().__init__(soft_limit, hard_limit, check_interval)
+        self.stop_event = stop_event
+
+    def check(self):
+        self.nodes += 1
+        if self.nodes % self.check_interval == 0 and (
+            self.stop_event.is_set() or time.perf_counter() >= self.deadline
+        ):
+            raise SearchTimeout()
+
+    def should_start_iteration(self, last_iteration_time):
+        return not self.stop_event.is_set() and super().should_start_iteration(last_iteration_time)
+
+
+def _search_worker(worker_id, shm_name, tt_size_mb, options, tasks, stop_event, results):
+    """
+    Vòng lặp của một tiến trình tìm kiếm, sống suốt ván cờ: engine (bảng tàn cục, bảng chuyển vị dùng chung)
+    được tạo một lần. Mỗi tác vụ (search_id, fen, is_red, max_depth, limits, tt_age) lấy từ tasks là một lần
+    tìm kiếm; gửi (search_id, worker_id, depth, move, score) qua results sau mỗi lần lặp hoàn thành và
+    (search_id, worker_id, None, None, None) khi kết thúc. Tác vụ None kết thúc tiến trình.
+    """
+    from game.board import Board
+    from utils.ComputerPlayer import ComputerPlayer
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    player = None
+    try:
+        player = ComputerPlayer(True, tt_size_mb=tt_size_mb, tt_buffer=shm.buf, book_path=None, **options)
+        board = Board()
+        start_depth_offset = DEPTH_OFFSETS[worker_id % len(DEPTH_OFFSETS)]
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            search_id, fen, is_red, max_depth, limits, tt_age = task
+            try:
+                player.is_red = is_red
+                player.depth = max_depth
+                player.transposition_table.age = tt_age
+                board.load_fen(fen)
+                soft_limit, hard_limit = limits if limits is not None else (float('inf'), float('inf'))
+                time_manager = SharedStopTimeManager(soft_limit, hard_limit, stop_event)
+                player.search(
+                    board, time_manager, max_depth, 1 + start_depth_offset,
+                    on_iteration=lambda depth, move, score: results.put((search_id, worker_id, depth, move, score))
+                )
+            finally:
+                results.put((search_id, worker_id, None, None, None))
+    finally:
+        if player is not None:
+            player.transposition_table.close()
+            player.close()
+        shm.close()
+
+
+def _stop_workers(processes, task_queues):
+    """
+    Gửi tác vụ kết thúc cho các tiến trình tìm kiếm và chờ chúng thoát (dừng hẳn nếu quá STOP_GRACE).
+    """
+    for process, tasks in zip(processes, task_queues):
+        if process.is_alive():
+            tasks.put(None)
+    for process in processes:
+        process.join(STOP_GRACE)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+def _release_shared_memory(shm, table, pool):
+    if pool:
+        _stop_workers(*pool)
+        pool.clear()
+    table.close()
+    shm.close()
+    shm.unlink()
+
+
+class LazySMPSearch:
+    """
+    Điều phối tìm kiếm song song: tạo bảng chuyển vị trong bộ nhớ dùng chung và workers tiến trình tìm kiếm
+    (giữ lại giữa các nước đi, tạo khi tìm kiếm lần đầu), gửi thế cờ cho các tiến trình ở mỗi lần tìm kiếm
+    và chọn kết quả của lần lặp sâu nhất đã hoàn thành.
+    """
+
+    def __init__(self, workers, tt_size_mb=16, **options):
+        """
+        :param workers: Số tiến trình tìm kiếm
+        :param tt_size_mb: Dung lượng bảng chuyển vị dùng chung (MB)
+        :param options: Tùy chọn tìm kiếm chọn lọc truyền cho ComputerPlayer của mỗi tiến trình
+        """
+        self.workers = workers
+        self.tt_size_mb = tt_size_mb
+        self.options = options
+        self.shared_memory = shared_memory.SharedMemory(create=True, size=entries_for_size(tt_size_mb) * ENTRY_BYTES)
+        self.transposition_table = TranspositionTable(tt_size_mb, buffer=self.shared_memory.buf)
+        self.completed_depth = 0  # Độ sâu của kết quả được chọn trong lần tìm kiếm gần nhất
+        self._context = multiprocessing.get_context()
+        self._stop_event = self._context.Event()  # Bật để dừng lần tìm kiếm đang chạy ở mọi tiến trình
+        self._results = self._context.Queue()
+        self._pool = []  # [processes, task_queues] khi các tiến trình đang chạy
+        self._search_id = 0
+        self._finalizer = weakref.finalize(
+            self, _release_shared_memory, self.shared_memory, self.transposition_table, self._pool)
+
+    def start(self):
+        """
+        Khởi chạy các tiến trình tìm kiếm (nếu chưa chạy), ví dụ trước khi ván cờ bắt đầu
+        để lần tìm kiếm đầu tiên không phải chờ.
+        """
+        if self._pool:
+            return
+        task_queues = [self._context.Queue() for _ in range(self.workers)]
+        processes = [
+            self._context.Process(
+                target=_search_worker,
+                args=(worker_id, self.shared_memory.name, self.tt_size_mb, self.options,
+                      task_queues[worker_id], self._stop_event, self._results),
+                daemon=True,
+            )
+            for worker_id in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        self._pool.extend((processes, task_queues))
+
+    def close(self):
+        """
+        Dừng các tiến trình tìm kiếm và giải phóng bộ nhớ dùng chung của bảng chuyển vị.
+        """
+        self._finalizer()
+
+    def get_move(self, board, is_red, max_depth, limits=None):
+        """
+        Tìm nước đi tốt nhất bằng workers tiến trình.
+        :param max_depth: Độ sâu tối đa; tìm kiếm dừng ngay khi một tiến trình hoàn thành độ sâu này
+        :param limits: Tuple (soft_limit, hard_limit) tính bằng giây, hoặc None nếu chỉ giới hạn độ sâu
+        :return: Nước đi của lần lặp sâu nhất đã hoàn thành (ưu tiên tiến trình 0 khi cùng độ sâu)
+        """
+        legal_moves = board.generate_legal_moves(COLOR_RED if is_red else COLOR_BLACK)
+        self.completed_depth = 0
+        if not legal_moves:
+            return None
+        if len(legal_moves) == 1 and limits is not None:
+            return legal_moves[0]  # Chỉ có một nước đi: không cần tìm kiếm
+
+        self.start()
+        processes, task_queues = self._pool
+        self.transposition_table.new_search()
+        # Lần tìm kiếm trước đã nhận đủ thông báo kết thúc của mọi tiến trình nên có thể xóa lệnh dừng
+        self._stop_event.clear()
+        self._search_id += 1
+        task = (self._search_id, board.to_fen(), is_red, max_depth, limits, self.transposition_table.age)
+        for tasks in task_queues:
+            tasks.put(task)
+
+        deadline = None if limits is None else time.perf_counter() + limits[1] + STOP_GRACE
+        best = None  # (depth, ưu tiên tiến trình 0, move)
+        running = len(processes)
+        while running:
+            try:
+                search_id, worker_id, depth, move, _ = self._results.get(timeout=RESULT_POLL_INTERVAL)
+            except queue.Empty:
+                if deadline is not None and time.perf_counter() > deadline:
+                    self._stop_event.set()
+                if not all(process.is_alive() for process in processes):
+                    # Tiến trình kết thúc bất thường: dừng cả nhóm, lần tìm kiếm sau khởi chạy lại
+                    self._stop_event.set()
+                    _stop_workers(processes, task_queues)
+                    self._pool.clear()
+                    break
+                continue
+            if search_id != self._search_id:
+                continue  # Thông báo muộn của lần tìm kiếm trước
+            if depth is None:
+                running -= 1
+                if worker_id == 0:
+                    self._stop_event.set()  # Tiến trình chính quyết định thời gian: dừng các tiến trình còn lại
+                continue
+            candidate = (depth, worker_id == 0, move)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+            if depth >= max_depth:
+                self._stop_event.set()
+
+        self._stop_event.set()
+        if best is None:
+            return legal_moves[0]
+        self.completed_depth = best[0]
+        return best[2]
@@ -0,0 +1,451 @@
+import mmap
+import os
+from array import array
+from utils.const import (
+    BOARD_ROWS, BOARD_COLS, COLOR_RED, COLOR_BLACK, FEN_PIECE_LETTERS, START_FEN,
+    TYPE_GENERAL, TYPE_ADVISOR, TYPE_ELEPHANT, TYPE_SOLDIER
+)
+from game.position import Position, BLACK_FLAG, TYPE_CODES, ROW_OF, COL_OF, NUM_SQUARES
+from game.movegen import generate_legal_moves, square_attacked
+from game.tables import GENERAL_REACH, ADVISOR_REACH, ELEPHANT_REACH, SOLDIER_REACH
+
+# Bảng tàn cục (endgame tablebase) cho các thế cờ ít quân, tạo bằng phân tích ngược (retrograde analysis).
+# Mỗi tổ hợp quân (ví dụ "KRvKAA": đỏ có Tướng + Xe, đen có Tướng + 2 Sĩ) là một tệp <tên>.tb,
+# mỗi thế cờ một byte theo chỉ số (lượt đi, ô của từng quân):
+#   0: hòa (hoặc thế cờ không hợp lệ); v > 0: còn d = v - 1 nửa nước đến khi bị chiếu hết/hết nước,
+#   d lẻ là bên đến lượt thắng, d chẵn là bên đến lượt thua.
+# Tổ hợp mà đen mạnh hơn dùng bảng của tổ hợp đảo màu (lật bàn cờ theo chiều dọc và đổi lượt).
+# Luật cấm chiếu/đuổi dai không được xét: lặp lại được coi là hòa.
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+MAX_DISTANCE = 254
+DEFAULT_TABLEBASE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "data", "tablebases"))
+TABLE_EXTENSION = ".tb"
+
+GENERAL = TYPE_CODES[TYPE_GENERAL]
+_LETTER_CODES = {letter.upper(): TYPE_CODES[piece_type] for piece_type, letter in FEN_PIECE_LETTERS.items()}
+_CODE_LETTERS = {code: letter for letter, code in _LETTER_CODES.items()}
+
+
+def _start_squares():
+    """
+    Ô xuất phát của từng mã quân trong thế cờ ban đầu.
+    """
+    squares = {}
+    for row, text in enumerate(START_FEN.split()[0].split("/")):
+        col = 0
+        for char in text:
+            if char.isdigit():
+                col += int(char)
+                continue
+            code = _LETTER_CODES[char.upper()] | (0 if char.isupper() else BLACK_FLAG)
+            squares.setdefault(code, []).append(row * BOARD_COLS + col)
+            col += 1
+    return squares
+
+
+def _allowed_squares():
+    """
+    Các ô mà mỗi mã quân có thể đứng được (Tướng, Sĩ trong cung, Tượng không qua sông, Tốt không lùi).
+    """
+    start = _start_squares()
+    reach_tables = {
+        TYPE_CODES[TYPE_GENERAL]: GENERAL_REACH, TYPE_CODES[TYPE_ADVISOR]: ADVISOR_REACH,
+        TYPE_CODES[TYPE_ELEPHANT]: ELEPHANT_REACH, TYPE_CODES[TYPE_SOLDIER]: SOLDIER_REACH,
+    }
+    allowed = {}
+    for code, squares in start.items():
+        kind = code & 7
+        color = COLOR_BLACK if code & BLACK_FLAG else COLOR_RED
+        if kind not in reach_tables:
+            allowed[code] = tuple(range(NUM_SQUARES))
+            continue
+        reach = reach_tables[kind][color]
+        seen = set(squares)
+        frontier = list(squares)
+        while frontier:
+            square = frontier.pop()
+            mask = reach[square]
+            for target in range(NUM_SQUARES):
+                if mask >> target & 1 and target not in seen:
+                    seen.add(target)
+                    frontier.append(target)
+        allowed[code] = tuple(sorted(seen))
+    return allowed
+
+
+ALLOWED_SQUARES = _allowed_squares()
+
+
+def flip_square(square):
+    """
+    Lật ô theo chiều dọc (hàng r thành hàng 9 - r), dùng khi đổi màu hai bên.
+    """
+    return (BOARD_ROWS - 1 - ROW_OF[square]) * BOARD_COLS + COL_OF[square]
+
+
+def material_name(red_kinds, black_kinds):
+    """
+    Tên tổ hợp quân, ví dụ ([1, 5], [1, 2, 2]) -> "KRvKAA".
+    """
+    return ("".join(_CODE_LETTERS[kind] for kind in sorted(red_kinds)) + "v"
+            + "".join(_CODE_LETTERS[kind] for kind in sorted(black_kinds)))
+
+
+def parse_material(name):
+    """
+    Tách tên tổ hợp quân thành (loại quân đỏ, loại quân đen), ví dụ "KRvKAA" -> ([1, 5], [1, 2, 2]).
+    """
+    try:
+        red, black = name.upper().split("V")
+        red_kinds, black_kinds = sorted(_LETTER_CODES[c] for c in red), sorted(_LETTER_CODES[c] for c in black)
+    except (ValueError, KeyError):
+        raise ValueError(f"Tên tổ hợp quân không hợp lệ: {name}") from None
+    if red_kinds.count(GENERAL) != 1 or black_kinds.count(GENERAL) != 1:
+        raise ValueError(f"Mỗi bên phải có đúng một Tướng: {name}")
+    return red_kinds, black_kinds
+
+
+# Giá trị ước lượng của từng loại quân (theo mã quân), chỉ dùng để chọn bên mạnh hơn khi đặt tên bảng
+_KIND_VALUES = (0, 0, 2, 2, 4, 9, 4, 1)
+
+
+def _strength(kinds):
+    return sum(_KIND_VALUES[kind] for kind in kinds), sorted(kinds, reverse=True)
+
+
+def canonical_material(red_kinds, black_kinds):
+    """
+    Tên bảng chứa tổ hợp quân này và cho biết có phải đổi màu hay không.
+    Bảng luôn được lưu với bên mạnh hơn (tổng giá trị quân lớn hơn) là quân đỏ.
+    :return: Tuple (tên bảng, flipped)
+    """
+    if _strength(black_kinds) > _strength(red_kinds):
+        return material_name(black_kinds, red_kinds), True
+    return material_name(red_kinds, black_kinds), False
+
+
+def encode_value(result, distance):
+    return DRAW if result == DRAW else distance + 1
+
+
+def decode_value(value):
+    """
+    :return: Tuple (WIN/DRAW/LOSS theo góc nhìn bên đến lượt, số nửa nước đến khi kết thúc)
+    """
+    if value == 0:
+        return DRAW, 0
+    distance = value - 1
+    return (WIN if distance & 1 else LOSS), distance
+
+
+class MaterialLayout:
+    """
+    Cách đánh chỉ số các thế cờ của một tổ hợp quân:
+    index = side * size + sum(local[j][ô của quân j] * stride[j]); side 0 là đỏ đi, 1 là đen đi.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        red_kinds, black_kinds = parse_material(name)
+        self.codes = [kind for kind in red_kinds] + [kind | BLACK_FLAG for kind in black_kinds]
+        self.squares = [ALLOWED_SQUARES[code] for code in self.codes]
+        self.local = []
+        for squares in self.squares:
+            local = [-1] * NUM_SQUARES
+            for index, square in enumerate(squares):
+                local[square] = index
+            self.local.append(local)
+        self.strides = []
+        size = 1
+        for squares in reversed(self.squares):
+            self.strides.append(size)
+            size *= len(squares)
+        self.strides.reverse()
+        self.size = size
+        self.total = 2 * size
+
+    def decode(self, index):
+        """
+        :return: Tuple (side, danh sách ô của từng quân)
+        """
+        side, rest = divmod(index, self.size)
+        squares = []
+        for stride, allowed in zip(self.strides, self.squares):
+            local, rest = divmod(rest, stride)
+            squares.append(allowed[local])
+        return side, squares
+
+    def index_of(self, side, squares):
+        """
+        Chỉ số của thế cờ, hoặc None nếu có quân đứng ở ô không thể đứng được.
+        """
+        index = side * self.size
+        for local, stride, square in zip(self.local, self.strides, squares):
+            slot = local[square]
+            if slot < 0:
+                return None
+            index += slot * stride
+        return index
+
+    def index_of_pieces(self, side, pieces):
+        """
+        Chỉ số của thế cờ cho bởi danh sách (mã quân, ô) bất kỳ thứ tự; các quân cùng mã được xếp
+        vào các vị trí theo thứ tự gặp (bảng chứa mọi hoán vị nên kết quả như nhau).
+        """
+        remaining = list(pieces)
+        squares = []
+        for code in self.codes:
+            for position, (piece_code, square) in enumerate(remaining):
+                if piece_code == code:
+                    squares.append(square)
+                    del remaining[position]
+                    break
+            else:
+                return None
+        return self.index_of(side, squares) if not remaining else None
+
+
+def _table_pieces(pieces, side, flipped):
+    """
+    Chuyển danh sách (mã quân, ô) và lượt đi sang hệ của bảng (đổi màu nếu flipped).
+    """
+    if not flipped:
+        return side, pieces
+    return 1 - side, [(code ^ BLACK_FLAG, flip_square(square)) for code, square in pieces]
+
+
+class TablebaseGenerator:
+    """
+    Tạo bảng tàn cục bằng phân tích ngược. Các bảng con (sau khi ăn quân) được tạo trước
+    hoặc đọc lại từ thư mục nếu đã có.
+    """
+
+    def __init__(self, directory=DEFAULT_TABLEBASE_DIR, log=None):
+        self.directory = directory
+        self.log = log
+        self.tables = {}  # tên bảng -> bytes/bytearray giá trị
+        self.layouts = {}
+
+    def _message(self, text):
+        if self.log is not None:
+            self.log(text)
+
+    def _layout(self, name):
+        layout = self.layouts.get(name)
+        if layout is None:
+            layout = self.layouts[name] = MaterialLayout(name)
+        return layout
+
+    def table(self, name):
+        """
+        Giá trị của bảng name: đọc từ tệp nếu có, nếu không thì tạo (kèm các bảng con) và ghi ra tệp.
+        """
+        if name in self.tables:
+            return self.tables[name]
+        path = os.path.join(self.directory, name + TABLE_EXTENSION)
+        layout = self._layout(name)
+        if os.path.exists(path) and os.path.getsize(path) == layout.total:
+            with open(path, "rb") as table_file:
+                values = table_file.read()
+        else:
+            values = self._solve(layout)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "wb") as table_file:
+                table_file.write(values)
+            self._message(f"{name}: {layout.total} thế cờ -> {path}")
+        self.tables[name] = values
+        return values
+
+    def _capture_value(self, layout, pieces, captured_slot, child_side):
+        """
+        Giá trị (theo góc nhìn bên đi ở thế cờ con) của thế cờ sau khi ăn quân, tra trong bảng con.
+        """
+        remaining = [piece for slot, piece in enumerate(pieces) if slot != captured_slot]
+        red_kinds = [code for code, _ in remaining if not code & BLACK_FLAG]
+        black_kinds = [code & 7 for code, _ in remaining if code & BLACK_FLAG]
+        name, flipped = canonical_material(red_kinds, black_kinds)
+        values = self.table(name)
+        side, table_pieces = _table_pieces(remaining, child_side, flipped)
+        index = self._layout(name).index_of_pieces(side, table_pieces)
+        return decode_value(values[index])
+
+    def _solve(self, layout):
+        """
+        Phân tích ngược trên đồ thị tường minh:
+        1. Sinh nước đi hợp lệ của mọi thế cờ; cạnh tới thế cờ cùng bảng được lưu lại,
+           nước ăn quân được tra ngay trong bảng con.
+        2. Từ các thế cờ đã biết (bị chiếu hết/hết nước, ăn quân dẫn tới thắng), lan ngược theo
+           thứ tự số nửa nước tăng dần: cha của thế thua là thế thắng; thế cờ mà mọi nước đều dẫn tới
+           thế thắng của đối phương là thế thua. Các thế còn lại là hòa.
+        """
+        total = layout.total
+        codes = layout.codes
+        position = Position()
+        offsets = array('I', [0]) * (total + 1)
+        edges = array('I')
+        counters = array('H', [0]) * total
+        longest_loss = array('H', [0]) * total
+        buckets = {}
+
+        def push(distance, index, result):
+            buckets.setdefault(distance, []).append((index, result))
+
+        for index in range(total):
+            offsets[index] = len(edges)
+            side, squares = layout.decode(index)
+            if len(set(squares)) != len(squares):
+                continue
+            for code, square in zip(codes, squares):
+                position.put(square, code)
+            color = COLOR_RED if side == 0 else COLOR_BLACK
+            opponent = COLOR_BLACK if side == 0 else COLOR_RED
+            position.side_to_move = color
+            valid = not square_attacked(position, position.general_square(opponent), color)
+            moves = generate_legal_moves(position, color) if valid else ()
+            for square in squares:
+                position.remove(square)
+            if not valid:
+                continue
+
+            slot_of = {square: slot for slot, square in enumerate(squares)}
+            child_base = (1 - side) * layout.size + (index - side * layout.size)
+            draws = 0
+            winning_capture = False
+            for from_square, to_square in moves:
+                slot = slot_of[from_square]
+                captured_slot = slot_of.get(to_square)
+                if captured_slot is None:
+                    local = layout.local[slot]
+                    edges.append(child_base + (local[to_square] - local[from_square]) * layout.strides[slot])
+                    continue
+                pieces = [(code, to_square if moved == slot else square)
+                          for moved, (code, square) in enumerate(zip(codes, squares))]
+                result, distance = self._capture_value(layout, pieces, captured_slot, 1 - side)
+                if result == LOSS:
+                    push(distance + 1, index, WIN)
+                    winning_capture = True
+                elif result == WIN:
+                    longest_loss[index] = max(longest_loss[index], distance + 1)
+                else:
+                    draws += 1
+            counters[index] = len(edges) - offsets[index] + draws
+            if counters[index] == 0 and not winning_capture:
+                push(longest_loss[index], index, LOSS)  # Hết nước, hoặc mọi nước ăn quân đều thua
+        offsets[total] = len(edges)
+
+        # Cạnh ngược (thế cờ con -> các thế cờ cha) theo kiểu CSR
+        parent_offsets = array('I', [0]) * (total + 1)
+        for child in edges:
+            parent_offsets[child + 1] += 1
+        for index in range(total):
+            parent_offsets[index + 1] += parent_offsets[index]
+        fill = parent_offsets[:-1]
+        parents = array('I', [0]) * len(edges)
+        for index in range(total):
+            for edge in range(offsets[index], offsets[index + 1]):
+                child = edges[edge]
+                parents[fill[child]] = index
+                fill[child] += 1
+        del edges, fill
+
+        values = bytearray(total)
+        resolved = bytearray(total)
+        distance = 0
+        while buckets:
+            if distance not in buckets:
+                distance += 1
+                continue
+            for index, result in buckets.pop(distance):
+                if resolved[index]:
+                    continue
+                if distance > MAX_DISTANCE:
+                    raise ValueError(f"{layout.name}: khoảng cách {distance} vượt quá {MAX_DISTANCE}")
+                resolved[index] = 1
+                values[index] = encode_value(result, distance)
+                for edge in range(parent_offsets[index], parent_offsets[index + 1]):
+                    parent = parents[edge]
+                    if resolved[parent]:
+                        continue
+                    if result == LOSS:
+                        push(distance + 1, parent, WIN)
+                    else:
+                        longest_loss[parent] = max(longest_loss[parent], distance + 1)
+                        counters[parent] -= 1
+                        if counters[parent] == 0:
+                            push(longest_loss[parent], parent, LOSS)
+            distance += 1
+        return values
+
+
+class Tablebase:
+    """
+    Tra cứu bảng tàn cục: các tệp trong thư mục được ánh xạ vào bộ nhớ (mmap) khi cần lần đầu.
+    """
+
+    def __init__(self, directory=DEFAULT_TABLEBASE_DIR):
+        self.directory = directory
+        self.layouts = {}
+        self._files = {}
+        self._maps = {}
+        names = []
+        if os.path.isdir(directory):
+            names = [entry[:-len(TABLE_EXTENSION)] for entry in os.listdir(directory) if entry.endswith(TABLE_EXTENSION)]
+        for name in names:
+            try:
+                self.layouts[name] = MaterialLayout(name)
+            except ValueError:
+                continue
+        # Số quân tối đa có bảng: chỉ tra cứu khi tổng số quân không vượt quá giá trị này
+        self.max_pieces = max((len(layout.codes) for layout in self.layouts.values()), default=0)
+
+    def __bool__(self):
+        return bool(self.layouts)
+
+    def close(self):
+        for data in self._maps.values():
+            data.close()
+        for table_file in self._files.values():
+            table_file.close()
+        self._maps.clear()
+        self._files.clear()
+
+    def _values(self, name):
+        data = self._maps.get(name)
+        if data is None:
+            layout = self.layouts[name]
+            table_file = open(os.path.join(self.directory, name + TABLE_EXTENSION), "rb")
+            if os.fstat(table_file.fileno()).st_size != layout.total:
+                table_file.close()
+                raise ValueError(f"Bảng tàn cục {name} có kích thước sai")
+            self._files[name] = table_file
+            data = self._maps[name] = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return data
+
+    def probe(self, position):
+        """
+        Tra thế cờ (Position) trong bảng tàn cục.
+        :return: Tuple (WIN/DRAW/LOSS theo góc nhìn bên đến lượt, số nửa nước đến khi kết thúc),
+                 hoặc None nếu không có bảng cho tổ hợp quân này
+        """
+        squares = position.squares
+        red = position.piece_lists[COLOR_RED]
+        black = position.piece_lists[COLOR_BLACK]
+        if len(red) + len(black) > self.max_pieces:
+            return None
+        red_kinds = [squares[square] for square in red]
+        black_kinds = [squares[square] & 7 for square in black]
+        name, flipped = canonical_material(red_kinds, black_kinds)
+        layout = self.layouts.get(name)
+        if layout is None:
+            return None
+        pieces = [(squares[square], square) for square in red] + [(squares[square], square) for square in black]
+        side = 0 if position.side_to_move == COLOR_RED else 1
+        side, pieces = _table_pieces(pieces, side, flipped)
+        index = layout.index_of_pieces(side, pieces)
+        if index is None:
+            return None
+        return decode_value(self._values(name)[index])
@@ -0,0 +1,80 @@
+import time
+
+# Quản lý thời gian cho tìm kiếm sâu dần theo đồng hồ ván cờ.
+
+EXPECTED_GAME_MOVES = 60   # Số nước dự kiến của một ván (mỗi bên)
+MIN_MOVES_TO_GO = 15       # Luôn chừa thời gian cho ít nhất chừng này nước nữa
+MOVE_OVERHEAD = 0.1        # Thời gian dự phòng cho vẽ giao diện và thực hiện nước đi (giây)
+HARD_LIMIT_FACTOR = 4.0    # Giới hạn cứng gấp bao nhiêu lần giới hạn mềm
+MAX_TIME_FRACTION = 0.25   # Không bao giờ dùng quá phần này của thời gian còn lại cho một nước
+BRANCHING_FACTOR = 3.0     # Ước lượng lần lặp sau tốn gấp bao nhiêu lần lần lặp trước
+CHECK_INTERVAL = 256       # Số nút giữa hai lần đọc đồng hồ
+
+
+class SearchTimeout(Exception):
+    """
+    Hết thời gian tìm kiếm: dừng ngay và dùng kết quả của lần lặp đã hoàn thành gần nhất.
+    """
+
+
+def allocate_time(remaining, move_number, increment=0.0):
+    """
+    Chia thời gian còn lại cho nước đi hiện tại.
+    :param remaining: Thời gian còn lại trên đồng hồ của bên đi (giây)
+    :param move_number: Số nước bên đi đã đi trong ván
+    :param increment: Thời gian cộng thêm sau mỗi nước (giây)
+    :return: Tuple (soft_limit, hard_limit) tính bằng giây
+    """
+    available = max(0.0, remaining - MOVE_OVERHEAD)
+    moves_to_go = max(MIN_MOVES_TO_GO, EXPECTED_GAME_MOVES - move_number)
+    soft_limit = available / moves_to_go + increment * 0.75
+    hard_limit = min(soft_limit * HARD_LIMIT_FACTOR, available * MAX_TIME_FRACTION + increment)
+    soft_limit = min(soft_limit, hard_limit)
+    return soft_limit, hard_limit
+
+
+class TimeManager:
+    """
+    Theo dõi thời gian của một lần tìm kiếm:
+    - check(): gọi ở mỗi nút, chỉ đọc đồng hồ sau mỗi CHECK_INTERVAL nút; ném SearchTimeout khi quá giới hạn cứng
+    - should_start_iteration(): có nên bắt đầu lần lặp sâu hơn hay không, dựa trên giới hạn mềm
+    """
+
+    def __init__(self, soft_limit, hard_limit, check_interval=CHECK_INTERVAL):
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self.check_interval = check_interval
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + hard_limit
+        self.nodes = 0
+
+    @classmethod
+    def for_clock(cls, remaining, move_number, increment=0.0):
+        """
+        Tạo TimeManager với ngân sách thời gian suy ra từ đồng hồ ván cờ.
+        """
+        return cls(*allocate_time(remaining, move_number, increment))
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def check(self):
+        """
+        Đếm nút và kiểm tra hạn chót sau mỗi check_interval nút.
+        """
+        self.nodes += 1
+        if self.nodes % self.check_interval == 0 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+    def should_start_iteration(self, last_iteration_time):
+        """
+        Chỉ bắt đầu lần lặp mới nếu còn trong giới hạn mềm và lần lặp đó dự kiến xong trước giới hạn cứng.
+        """
+        elapsed = self.elapsed()
+        return elapsed < self.soft_limit and elapsed + last_iteration_time * BRANCHING_FACTOR < self.hard_limit
+
+    def extend(self, factor):
+        """
+        Nới giới hạn mềm (ví dụ khi nước đi tốt nhất thay đổi giữa hai lần lặp), không vượt giới hạn cứng.
+        """
+        self.soft_limit = min(self.soft_limit * factor, self.hard_limit)
@@ -0,0 +1,177 @@
+from utils.const import BOARD_ROWS, BOARD_COLS
+
+# Bảng chuyển vị kích thước cố định cho tìm kiếm.
+# Mỗi mục gồm 2 từ 64 bit nằm liền nhau trong một bộ đệm phẳng:
+#   - từ 0: key ^ data (kiểm tra tính toàn vẹn khi nhiều tiến trình cùng ghi, không cần khóa)
+#   - từ 1: data = score (32 bit) | age (8 bit) | bound (2 bit) | depth (8 bit) | move (14 bit)
+# Các mục được nhóm theo cặp (bucket 2 ô): ô thứ hai được thay thế theo độ sâu và tuổi.
+
+NUM_SQUARES = BOARD_ROWS * BOARD_COLS
+ENTRY_BYTES = 16
+BUCKET_SIZE = 2
+
+# Loại cận của điểm lưu trong bảng (0 là ô trống)
+BOUND_NONE = 0
+BOUND_EXACT = 1
+BOUND_LOWER = 2  # Điểm >= giá trị lưu (cắt beta)
+BOUND_UPPER = 3  # Điểm <= giá trị lưu (không vượt alpha)
+
+NO_MOVE = 0
+_MOVE_BITS = 14
+_DEPTH_SHIFT = _MOVE_BITS
+_BOUND_SHIFT = _DEPTH_SHIFT + 8
+_AGE_SHIFT = _BOUND_SHIFT + 2
+_SCORE_SHIFT = _AGE_SHIFT + 8
+_SCORE_OFFSET = 1 << 31
+_MASK_64 = (1 << 64) - 1
+
+
+def encode_move(move):
+    """
+    Mã hóa nước đi ((row, col), (row, col)) thành số nguyên 14 bit (0 là không có nước đi).
+    """
+    (start_row, start_col), (end_row, end_col) = move
+    return (start_row * BOARD_COLS + start_col) * NUM_SQUARES + end_row * BOARD_COLS + end_col + 1
+
+
+def decode_move(code):
+    """
+    Giải mã số nguyên từ encode_move thành nước đi ((row, col), (row, col)), hoặc None.
+    """
+    if code == NO_MOVE:
+        return None
+    from_square, to_square = divmod(code - 1, NUM_SQUARES)
+    return divmod(from_square, BOARD_COLS), divmod(to_square, BOARD_COLS)
+
+
+def entries_for_size(size_mb):
+    """
+    Số mục (lũy thừa của 2, tối thiểu một bucket) vừa với dung lượng size_mb.
+    """
+    entries = BUCKET_SIZE
+    while entries * 2 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+        entries *= 2
+    return entries
+
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị có dung lượng cố định (tính theo MB).
+    Mỗi mục lưu khóa, độ sâu, loại cận, điểm và nước đi tốt nhất.
+    Thay thế: cùng khóa thì ghi đè; nếu không, ô đầu của bucket giữ mục sâu nhất,
+    ô thứ hai luôn nhận mục mới. Mục của lần tìm kiếm cũ (khác age) được thay trước.
+    """
+
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        :param size_mb: Dung lượng bảng theo MB
+        :param buffer: Bộ đệm có sẵn (ví dụ bộ nhớ dùng chung); mặc định tạo bytearray mới
+        """
+        self.num_entries = entries_for_size(size_mb)
+        if buffer is None:
+            buffer = bytearray(self.num_entries * ENTRY_BYTES)
+        elif len(buffer) < self.num_entries * ENTRY_BYTES:
+            raise ValueError("Bộ đệm nhỏ hơn dung lượng bảng chuyển vị")
+        self.buffer = buffer
+        self.words = memoryview(buffer)[:self.num_entries * ENTRY_BYTES].cast("Q")
+        self.bucket_mask = self.num_entries - BUCKET_SIZE
+        self.age = 0
+
+    @property
+    def size_bytes(self):
+        return self.num_entries * ENTRY_BYTES
+
+    def new_search(self):
+        """
+        Bắt đầu một lần tìm kiếm mới: các mục cũ được ưu tiên thay thế.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        """
+        Xóa toàn bộ bảng.
+        """
+        memoryview(self.buffer)[:self.size_bytes] = bytes(self.size_bytes)
+        self.age = 0
+
+    def close(self):
+        """
+        Giải phóng view trên bộ đệm (bắt buộc trước khi đóng bộ nhớ dùng chung). Bảng không dùng được nữa.
+        """
+        self.words.release()
+        self.words = None
+        self.buffer = None
+
+    def probe(self, key):
+        """
+        Tìm mục theo khóa Zobrist.
+        :return: Tuple (depth, bound, score, move_code) hoặc None nếu không có
+        """
+        words = self.words
+        slot = (key & self.bucket_mask) * 2
+        for offset in (0, 2):
+            data = words[slot + offset + 1]
+            if data and words[slot + offset] ^ data == key:
+                return (
+                    data >> _DEPTH_SHIFT & 0xFF,
+                    data >> _BOUND_SHIFT & 3,
+                    (data >> _SCORE_SHIFT) - _SCORE_OFFSET,
+                    data & ((1 << _MOVE_BITS) - 1),
+                )
+        return None
+
+    def store(self, key, depth, bound, score, move_code=NO_MOVE):
+        """
+        Lưu kết quả tìm kiếm của một thế cờ.
+        :param key: Khóa Zobrist 64 bit
+        :param depth: Độ sâu còn lại đã tìm (0..255)
+        :param bound: BOUND_EXACT, BOUND_LOWER hoặc BOUND_UPPER
+        :param score: Điểm nguyên (vừa 32 bit có dấu)
+        :param move_code: Nước đi tốt nhất đã mã hóa bằng encode_move
+        """
+        words = self.words
+        slot = (key & self.bucket_mask) * 2
+        first_data = words[slot + 1]
+        second_data = words[slot + 3]
+
+        if first_data and words[slot] ^ first_data == key:
+            target, old_data = slot, first_data
+        elif second_data and words[slot + 2] ^ second_data == key:
+            target, old_data = slot + 2, second_data
+        elif (not first_data or (first_data >> _AGE_SHIFT & 0xFF) != self.age
+              or depth >= (first_data >> _DEPTH_SHIFT & 0xFF)):
+            # Ô đầu: giữ mục sâu nhất của lần tìm kiếm hiện tại; mục cũ bị đẩy xuống ô thứ hai
+            if first_data and (first_data >> _AGE_SHIFT & 0xFF) == self.age:
+                words[slot + 2] = words[slot]
+                words[slot + 3] = first_data
+            target, old_data = slot, 0
+        else:
+            target, old_data = slot + 2, 0
+
+        if old_data:
+            # Cùng thế cờ: không ghi đè kết quả sâu hơn bằng kết quả nông hơn (trừ khi là điểm chính xác)
+            old_depth = old_data >> _DEPTH_SHIFT & 0xFF
+            if bound != BOUND_EXACT and depth < old_depth and (old_data >> _AGE_SHIFT & 0xFF) == self.age:
+                return
+            if move_code == NO_MOVE:
+                move_code = old_data & ((1 << _MOVE_BITS) - 1)
+
+        score = max(-_SCORE_OFFSET, min(_SCORE_OFFSET - 1, int(score)))
+        data = (
+            (score + _SCORE_OFFSET) << _SCORE_SHIFT | self.age << _AGE_SHIFT | bound << _BOUND_SHIFT
+            | min(depth, 0xFF) << _DEPTH_SHIFT | move_code
+        )
+        words[target] = (key ^ data) & _MASK_64
+        words[target + 1] = data
+
+    def hashfull(self, sample=1000):
+        """
+        Tỷ lệ phần nghìn số mục được dùng trong lần tìm kiếm hiện tại (ước lượng từ mẫu đầu bảng).
+        """
+        words = self.words
+        count = min(sample, self.num_entries)
+        used = sum(
+            1 for index in range(count)
+            if words[index * 2 + 1] and (words[index * 2 + 1] >> _AGE_SHIFT & 0xFF) == self.age
+        )
+        return used * 1000 // count
@@ -1,5 +1,6 @@
 import pygame
 import os
+import time
 from utils.const import *
 from game.pieces import *
 
@@ -229,6 +230,12 @@ def draw_game_interface(screen, game_state, board, piece_images, fonts):
     status_text = ""
     if game_state.game_over:
         status_text = f"{'ĐỎ' if game_state.winner == COLOR_RED else 'ĐEN'} THẮNG! Nhấn R để chơi lại"
+    elif game_state.ai_thinking:
+        # Máy đang tìm kiếm trong luồng nền: hiển thị tiến độ, dấu chấm nhấp nháy cho biết giao diện vẫn chạy
+        depth, nodes = game_state.ai_progress
+        dots = "." * (int(time.time() * 3) % 3 + 1)
+        status_text = (f"{'ĐỎ' if game_state.current_player == COLOR_RED else 'ĐEN'} đang nghĩ{dots:<3} "
+                       f"| độ sâu {depth} | {nodes:,} nút | R: Reset")
     else:
         status_text = f"Lượt đi: {'ĐỎ' if game_state.current_player == COLOR_RED else 'ĐEN'} | R: Reset | U: Undo"
     
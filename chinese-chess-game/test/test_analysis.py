@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.analysis import RootSplitAnalyzer
+from utils.ComputerPlayer import ComputerPlayer
+from utils.const import COLOR_BLACK
+
+FEN = "r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w - - 0 1"
+
+class TestRootSplitAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = RootSplitAnalyzer(workers=2, depth=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.analyzer.close()
+
+    def test_every_root_move_is_analysed(self):
+        board = Board()
+        board.load_fen(FEN)
+        results = self.analyzer.analyse(board)
+        self.assertCountEqual([move for move, _, _ in results], board.generate_legal_moves())
+        scores = [score for _, score, _ in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for move, _, pv in results:
+            self.assertEqual(pv[0], move)
+        self.assertEqual(board.undo_stack, [])
+
+    def test_principal_variation_is_legal(self):
+        board = Board()
+        board.load_fen(FEN)
+        _, _, pv = self.analyzer.analyse(board, depth=3)[0]
+        self.assertGreater(len(pv), 1)
+        for move in pv:
+            self.assertTrue(board.is_legal_move(move), move)
+            board.make_move(move)
+
+    def test_batch_reuses_workers(self):
+        # Nhiều thế cờ liên tiếp dùng lại cùng các tiến trình (kể cả khi đến lượt bên đen)
+        board = Board()
+        board.initialize_board()
+        board.make_move(((7, 1), (7, 4)))
+        self.assertEqual(board.side_to_move, COLOR_BLACK)
+        best_move, _, _ = self.analyzer.analyse(board)[0]
+        self.assertIn(best_move, board.generate_legal_moves(COLOR_BLACK))
+
+    def test_matches_single_process_best_score(self):
+        board = Board()
+        board.load_fen(FEN)
+        _, best_score, _ = self.analyzer.analyse(board)[0]
+        player = ComputerPlayer(is_red=True, depth=2, null_move=False,
+                                late_move_reductions=False, futility_pruning=False)
+        player.simulator_board = board
+        scores = []
+        for move in board.generate_legal_moves():
+            board.make_move(move)
+            scores.append(-player.nega_scout(1, -float('inf'), float('inf'), False))
+            board.unmake_move()
+        self.assertEqual(best_score, max(scores))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.background import BackgroundSearch
+from utils.ComputerPlayer import ComputerPlayer
+from utils.const import COLOR_RED, COLOR_BLACK
+import main
+
+def wait_for(condition, timeout=20):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+class TestBackgroundSearch(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+        self.search = BackgroundSearch(ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None))
+
+    def tearDown(self):
+        self.search.close()
+
+    def test_future_returns_legal_move(self):
+        legal_moves = self.board.generate_legal_moves(COLOR_RED)
+        future = self.search.submit(self.board)
+        self.board.make_move(legal_moves[0])  # Tìm kiếm chạy trên bản sao
+        self.assertIn(future.result(timeout=20), legal_moves)
+        self.assertFalse(self.search.thinking)
+        depth, nodes = self.search.progress()
+        self.assertEqual(depth, 2)
+        self.assertGreater(nodes, 0)
+
+    def test_cancel_stops_running_search(self):
+        self.search.computer.depth = 30
+        future = self.search.submit(self.board)
+        self.assertTrue(wait_for(lambda: self.search.progress()[0] >= 1))
+        self.assertTrue(self.search.thinking)
+        start = time.perf_counter()
+        self.search.cancel()
+        self.assertIn(future.result(timeout=5), self.board.generate_legal_moves(COLOR_RED))
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertFalse(self.search.thinking)
+        # Lệnh dừng không ảnh hưởng lần tìm kiếm sau
+        self.search.computer.depth = 1
+        self.assertIsNotNone(self.search.submit(self.board).result(timeout=20))
+
+    def test_cancel_right_after_submit_is_not_lost(self):
+        self.search.computer.depth = 30
+        for _ in range(5):
+            future = self.search.submit(self.board)
+            start = time.perf_counter()
+            self.search.cancel(wait_done=True)  # Có thể tới trước khi get_move bắt đầu tìm kiếm
+            self.assertTrue(future.done())
+            self.assertLess(time.perf_counter() - start, 2)
+
+    def test_stale_stop_does_not_affect_next_search(self):
+        computer = self.search.computer
+        computer.stop()  # Không có lần tìm kiếm nào đang chạy
+        self.search.submit(self.board).result(timeout=20)
+        self.assertEqual(computer.completed_depth, 2)
+
+class TestNonBlockingAIMove(unittest.TestCase):
+    def test_make_ai_move_does_not_block(self):
+        board = Board()
+        board.initialize_board()
+        game_state = main.GameState()
+        game_state.game_mode = 'ai_vs_ai'
+        game_state.game_started = True
+        game_state.red_time = 10  # Đồng hồ ngắn: máy chỉ được vài phần mười giây cho nước đi
+        search = BackgroundSearch(ComputerPlayer(is_red=True, depth=3, book_path=None, tablebase_dir=None))
+        try:
+            start = time.perf_counter()
+            main.make_ai_move(board, game_state, search)
+            self.assertLess(time.perf_counter() - start, 0.1)  # Chỉ khởi động tìm kiếm rồi trả về ngay
+            self.assertTrue(game_state.ai_thinking)
+            self.assertTrue(wait_for(lambda: (main.make_ai_move(board, game_state, search),
+                                              game_state.current_player == COLOR_BLACK)[1]))
+            self.assertFalse(game_state.ai_thinking)
+            self.assertEqual(board.undo_stack, [])  # Nước đi của ván không giữ thông tin hoàn tác
+            self.assertEqual(board.side_to_move, COLOR_BLACK)
+        finally:
+            search.close()
+
+if __name__ == "__main__":
+    unittest.main()
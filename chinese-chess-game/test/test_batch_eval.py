@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.ComputerPlayer import ComputerPlayer
+from utils.batch_eval import np, encode_positions, evaluate_codes, evaluate_positions
+
+def random_boards(count, plies, seed=1):
+    """
+    Các thế cờ sau những ván đi ngẫu nhiên từ thế cờ ban đầu.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = Board()
+        board.initialize_board()
+        for _ in range(plies):
+            moves = board.generate_legal_moves()
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+            boards.append(board.clone())
+    return boards[:count]
+
+@unittest.skipIf(np is None, "Cần NumPy (phụ thuộc tùy chọn, chỉ dùng cho utils/batch_eval.py)")
+class TestBatchEval(unittest.TestCase):
+    def setUp(self):
+        self.boards = random_boards(200, 40)
+
+    def test_encoding(self):
+        codes = encode_positions(self.boards)
+        self.assertEqual(codes.shape, (200, 90))
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertEqual(bytes(codes[7]), bytes(self.boards[7].position.squares))
+
+    def test_matches_incremental_score(self):
+        scores = evaluate_positions(self.boards)
+        self.assertEqual(scores.tolist(), [board.position.score for board in self.boards])
+        self.assertEqual(evaluate_positions([self.boards[0].position]).tolist(), [self.boards[0].position.score])
+
+    def test_matches_evaluate_board(self):
+        # Không tính độ cơ động và an toàn Tướng (cần bản đồ tấn công): chỉ còn vật chất + điểm vị trí
+        player = ComputerPlayer(is_red=True, book_path=None, tablebase_dir=None)
+        player.eval_weights['mobility'] = player.eval_weights['king_safety'] = 0
+        expected = [player.evaluate_board(board, True) for board in self.boards]
+        self.assertEqual(evaluate_codes(encode_positions(self.boards)).tolist(), expected)
+
+    def test_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            evaluate_codes(np.zeros((3, 89), dtype=np.int8))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from game.pieces import General, Chariot
+from game.rules import place_piece_on_board
+from utils.const import COLOR_BLACK, COLOR_RED, START_FEN
+
+def board_state(board):
+    """
+    Chụp lại toàn bộ trạng thái có thể quan sát của bàn cờ để so sánh.
+    """
+    return (
+        [row[:] for row in board.board],
+        [(piece, piece.current_position, list(piece.can_moves), list(piece.valid_positions))
+         for piece in board.red_pieces + board.black_pieces],
+        bytes(board.position.squares),
+        dict(board.general_positions),
+        {color: list(counts) for color, counts in board.attack_maps.items()},
+        dict(board.mobility),
+    )
+
+class TestMakeUnmake(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+
+    def test_unmake_quiet_move(self):
+        """
+        Nước đi không ăn quân cũng phải được hoàn tác.
+        """
+        before = board_state(self.board)
+        record = self.board.make_move(((9, 1), (7, 2)))
+        self.assertIsNone(self.board.board[9][1])
+        self.board.unmake_move(record)
+        self.assertEqual(board_state(self.board), before)
+
+    def test_unmake_capture(self):
+        before = board_state(self.board)
+        horse = self.board.board[0][1]
+        record = self.board.make_move(((7, 1), (0, 1)))
+        self.assertNotIn(horse, self.board.black_pieces)
+        self.board.unmake_move(record)
+        self.assertIs(self.board.board[0][1], horse)
+        self.assertEqual(board_state(self.board), before)
+
+    def test_nested_moves(self):
+        before = board_state(self.board)
+        first = self.board.make_move(((7, 1), (7, 4)))
+        second = self.board.make_move(((0, 1), (2, 2)))
+        third = self.board.make_move(((7, 4), (3, 4)))
+        self.board.unmake_move(third)
+        self.board.unmake_move(second)
+        self.board.unmake_move(first)
+        self.assertEqual(board_state(self.board), before)
+        self.assertEqual(self.board.undo_stack, [])
+
+    def test_general_position_restored(self):
+        record = self.board.make_move(((9, 4), (8, 4)))
+        self.assertEqual(self.board.get_general_position(COLOR_RED), (8, 4))
+        self.board.unmake_move(record)
+        self.assertEqual(self.board.get_general_position(COLOR_RED), (9, 4))
+
+    def test_unmake_out_of_order(self):
+        first = self.board.make_move(((7, 1), (7, 4)))
+        self.board.make_move(((0, 1), (2, 2)))
+        with self.assertRaises(ValueError):
+            self.board.unmake_move(first)
+
+    def test_move_piece_rejects_self_check(self):
+        """
+        Nước đi khiến Tướng bên mình bị chiếu bị từ chối và bàn cờ giữ nguyên.
+        """
+        board = Board()
+        place_piece_on_board(board, General(COLOR_RED), (9, 4))
+        place_piece_on_board(board, Chariot(COLOR_RED), (8, 4))
+        place_piece_on_board(board, Chariot(COLOR_BLACK), (5, 4))
+        place_piece_on_board(board, General(COLOR_BLACK), (0, 3))
+        before = board_state(board)
+        self.assertFalse(board.move_piece((8, 4), (8, 0)))
+        self.assertEqual(board_state(board), before)
+        self.assertTrue(board.move_piece((8, 4), (5, 4)))
+
+class TestZobrist(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+
+    def test_incremental_key_matches_full_computation(self):
+        self.assertEqual(self.board.zobrist_key, self.board.position.compute_key())
+        records = [
+            self.board.make_move(((7, 1), (7, 4))),
+            self.board.make_move(((0, 1), (2, 2))),
+            self.board.make_move(((7, 4), (3, 4))),  # Ăn quân
+        ]
+        self.assertEqual(self.board.zobrist_key, self.board.position.compute_key())
+        self.assertEqual(self.board.side_to_move, COLOR_BLACK)
+        for record in reversed(records):
+            self.board.unmake_move(record)
+        self.assertEqual(self.board.zobrist_key, self.board.position.compute_key())
+        self.assertEqual(self.board.side_to_move, COLOR_RED)
+
+    def test_incremental_score_matches_full_computation(self):
+        self.assertEqual(self.board.position.score, 0)  # Thế cờ ban đầu đối xứng
+        self.assertEqual(self.board.position.score, self.board.position.compute_score())
+        records = [
+            self.board.make_move(((7, 1), (7, 4))),
+            self.board.make_move(((3, 4), (4, 4))),
+            self.board.make_move(((7, 4), (4, 4))),  # Ăn quân
+        ]
+        self.assertGreater(self.board.position.score, 0)
+        self.assertEqual(self.board.position.score, self.board.position.compute_score())
+        self.assertEqual(self.board.clone().position.score, self.board.position.score)
+        for record in reversed(records):
+            self.board.unmake_move(record)
+        self.assertEqual(self.board.position.score, 0)
+
+    def test_transpositions_share_key(self):
+        """
+        Hai thứ tự nước đi dẫn đến cùng một thế cờ phải cho cùng một khóa.
+        """
+        other = Board()
+        other.initialize_board()
+        for move in [((9, 1), (7, 2)), ((0, 1), (2, 2)), ((9, 7), (7, 6)), ((0, 7), (2, 6))]:
+            self.board.make_move(move)
+        for move in [((9, 7), (7, 6)), ((0, 7), (2, 6)), ((9, 1), (7, 2)), ((0, 1), (2, 2))]:
+            other.make_move(move)
+        self.assertEqual(self.board.zobrist_key, other.zobrist_key)
+
+    def test_side_to_move_changes_key(self):
+        key = self.board.zobrist_key
+        self.board.position.switch_side()
+        self.assertNotEqual(self.board.zobrist_key, key)
+
+    def test_null_move(self):
+        key = self.board.zobrist_key
+        self.board.make_null_move()
+        self.assertEqual(self.board.side_to_move, COLOR_BLACK)
+        self.assertEqual(self.board.zobrist_key, self.board.position.compute_key())
+        self.assertEqual(self.board.undo_stack, [])
+        self.board.unmake_null_move()
+        self.assertEqual((self.board.side_to_move, self.board.zobrist_key), (COLOR_RED, key))
+
+class TestAttackMaps(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+
+    def recount(self):
+        """
+        Tính lại bản đồ tấn công từ valid_positions của từng quân để so sánh.
+        """
+        counts = {COLOR_RED: [0] * 90, COLOR_BLACK: [0] * 90}
+        for piece in self.board.get_all_pieces():
+            for row, col in piece.valid_positions:
+                counts[piece.color][row * 9 + col] += 1
+        return counts
+
+    def test_maps_follow_moves(self):
+        self.assertEqual(self.board.attack_maps, self.recount())
+        self.assertEqual(self.board.mobility[COLOR_RED], 44)
+        for move in [((7, 1), (7, 4)), ((0, 1), (2, 2)), ((7, 4), (3, 4)), ((0, 0), (0, 1))]:
+            self.board.make_move(move)
+            self.assertEqual(self.board.attack_maps, self.recount())
+
+    def test_is_square_attacked(self):
+        # Pháo đỏ ở (7, 1) ăn được Mã đen ở (0, 1) qua ngòi
+        self.assertTrue(self.board.is_square_attacked((0, 1), COLOR_RED))
+        self.assertFalse(self.board.is_square_attacked((0, 1), COLOR_BLACK))
+        # Ô (7, 2): Mã đỏ ở (9, 1) và hai Pháo đỏ trên hàng 7
+        self.assertEqual(self.board.attack_count((7, 2), COLOR_RED), 3)
+        self.assertEqual(self.board.attack_count((4, 4), COLOR_RED), 0)
+
+    def test_check_uses_attack_map(self):
+        board = Board()
+        place_piece_on_board(board, General(COLOR_RED), (9, 4))
+        place_piece_on_board(board, General(COLOR_BLACK), (0, 3))
+        place_piece_on_board(board, Chariot(COLOR_BLACK), (5, 4))
+        self.assertTrue(board.is_square_attacked((9, 4), COLOR_BLACK))
+        self.assertTrue(board.is_check(COLOR_RED))
+        place_piece_on_board(board, Chariot(COLOR_RED), (7, 4))
+        self.assertFalse(board.is_check(COLOR_RED))
+        self.assertEqual(board.attack_count((7, 4), COLOR_BLACK), 1)
+
+class TestCloneSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+        for move in [((7, 1), (7, 4)), ((0, 1), (2, 2)), ((7, 4), (3, 4))]:
+            self.board.make_move(move)
+
+    def summary(self, board):
+        """
+        Trạng thái không phụ thuộc vào danh tính và thứ tự các đối tượng quân cờ.
+        """
+        pieces = {
+            (piece.color, piece.type, piece.current_position): sorted(piece.valid_positions)
+            for piece in board.get_all_pieces()
+        }
+        attack_maps = {color: list(counts) for color, counts in board.attack_maps.items()}
+        return pieces, attack_maps, dict(board.general_positions), board.to_fen(), board.zobrist_key
+
+    def test_clone_is_independent(self):
+        clone = self.board.clone()
+        self.assertEqual(self.summary(clone), self.summary(self.board))
+        clone.make_move(((0, 0), (0, 1)))
+        self.assertIsNotNone(self.board.board[0][0])
+        self.assertNotEqual(clone.zobrist_key, self.board.zobrist_key)
+
+    def test_clone_is_lazy(self):
+        clone = self.board.clone()
+        self.assertNotIn("board", clone.__dict__)
+        # Các thao tác chỉ cần trạng thái gọn không dựng lại lưới quân cờ
+        self.assertEqual(len(clone.generate_legal_moves()), len(self.board.generate_legal_moves()))
+        self.assertNotIn("board", clone.__dict__)
+        self.assertIsNotNone(clone.get_piece_at(9, 4))
+        self.assertIn("board", clone.__dict__)
+
+    def test_clear_resets_general_positions(self):
+        self.board.move_piece((9, 4), (8, 4))
+        self.board.clear()
+        self.assertIsNone(self.board.get_general_position(COLOR_RED))
+        self.assertIsNone(self.board.get_general_position(COLOR_BLACK))
+        self.board.load_fen("3k5/9/9/9/9/9/9/9/4K4/9 w - - 0 1")
+        self.assertEqual(self.board.get_general_position(COLOR_BLACK), (0, 3))
+        self.assertEqual(self.board.get_general_position(COLOR_RED), (8, 4))
+        self.assertEqual(self.board.clone().get_general_position(COLOR_RED), (8, 4))
+
+    def test_snapshot_restore(self):
+        expected = self.summary(self.board)
+        snapshot = self.board.snapshot()
+        self.board.make_move(((0, 0), (0, 1)))
+        self.board.make_move(((9, 0), (8, 0)))
+        self.board.restore(snapshot)
+        self.assertEqual(self.summary(self.board), expected)
+        self.assertEqual(self.board.undo_stack, [])
+        # Bàn cờ đã khôi phục vẫn đi tiếp và hoàn tác được
+        before = board_state(self.board)
+        self.board.make_move(((0, 0), (0, 1)))
+        self.board.unmake_move()
+        self.assertEqual(board_state(self.board), before)
+
+class TestFenAndPerft(unittest.TestCase):
+    def test_fen_round_trip(self):
+        board = Board()
+        board.initialize_board()
+        self.assertEqual(board.to_fen(), START_FEN)
+        fen = "r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 b - - 0 1"
+        board.load_fen(fen)
+        self.assertEqual(board.to_fen(), fen)
+        self.assertEqual(board.side_to_move, COLOR_BLACK)
+        self.assertEqual(board.zobrist_key, board.position.compute_key())
+
+    def test_fullmove_number(self):
+        board = Board()
+        board.load_fen("r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 b - - 0 12")
+        self.assertEqual(board.fullmove_number, 12)
+        move = board.generate_legal_moves()[0]
+        board.make_move(move)
+        self.assertEqual(board.fullmove_number, 13)  # Tăng sau nước của bên đen
+        self.assertTrue(board.to_fen().endswith(" 0 13"))
+        board.unmake_move()
+        self.assertEqual(board.fullmove_number, 12)
+        self.assertEqual(board.clone().fullmove_number, 12)
+        board.initialize_board()
+        self.assertEqual(board.fullmove_number, 1)
+
+    def test_move_piece_keeps_no_undo_record(self):
+        board = Board()
+        board.initialize_board()
+        self.assertTrue(board.move_piece((9, 1), (7, 2)))
+        self.assertTrue(board.move_piece((0, 1), (2, 2)))
+        self.assertEqual(board.undo_stack, [])
+        self.assertEqual(board.fullmove_number, 2)
+        self.assertEqual(board.zobrist_key, board.position.compute_key())
+
+    def test_invalid_fen(self):
+        with self.assertRaises(ValueError):
+            Board().load_fen("rnbakabnr/9/1c5c1 w")
+
+    def test_perft_initial_position(self):
+        board = Board()
+        board.initialize_board()
+        before = board_state(board)
+        self.assertEqual(board.perft(1), 44)
+        self.assertEqual(board.perft(2), 1920)
+        self.assertEqual(board_state(board), before)
+
+    def test_perft_divide_sums_to_perft(self):
+        board = Board()
+        board.load_fen("5a3/3k5/3aR4/9/5r3/5n3/9/3A1A3/5K3/2BC2B2 w - - 0 1")
+        divide = board.perft_divide(2)
+        self.assertEqual(len(divide), 25)
+        self.assertEqual(sum(divide.values()), 424)
+
+if __name__ == "__main__":
+    unittest.main()
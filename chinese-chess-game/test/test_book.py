@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.book import (
+    OpeningBook, BookBuilder, RECORD, DEFAULT_BOOK_PATH, parse_iccs, format_iccs
+)
+from utils.ComputerPlayer import ComputerPlayer
+
+CENTRAL_CANNON = parse_iccs("h2e2")
+SCREEN_HORSE = parse_iccs("h9g7")
+ELEPHANT = parse_iccs("c0e2")
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+        builder = BookBuilder(max_ply=4)
+        builder.add_game([CENTRAL_CANNON, SCREEN_HORSE])
+        builder.add_game([CENTRAL_CANNON, parse_iccs("h7e7")], result="1-0")
+        builder.add_game([ELEPHANT, SCREEN_HORSE], result="0-1")
+        self.count = builder.write(self.path)
+        self.book = OpeningBook(self.path, rng=random.Random(1))
+        self.board = Board()
+        self.board.initialize_board()
+
+    def tearDown(self):
+        self.book.close()
+        self.directory.cleanup()
+
+    def test_iccs(self):
+        self.assertEqual(CENTRAL_CANNON, ((7, 7), (7, 4)))
+        self.assertEqual(parse_iccs("h2-e2"), CENTRAL_CANNON)
+        self.assertEqual(format_iccs(SCREEN_HORSE), "h9g7")
+        with self.assertRaises(ValueError):
+            parse_iccs("z2e2")
+
+    def test_records_sorted_by_key(self):
+        self.assertEqual(os.path.getsize(self.path), self.count * RECORD.size)
+        with open(self.path, "rb") as book_file:
+            data = book_file.read()
+        keys = [RECORD.unpack_from(data, index * RECORD.size)[0] for index in range(self.count)]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_probe_weights(self):
+        # Nước của bên thắng được tính gấp đôi, nước của bên thua không được đưa vào sách
+        self.assertEqual(self.book.probe(self.board.zobrist_key), [(CENTRAL_CANNON, 3)])
+        self.board.make_move(CENTRAL_CANNON)
+        self.assertEqual(self.book.probe(self.board.zobrist_key), [(SCREEN_HORSE, 1)])
+        self.assertEqual(self.book.probe(12345), [])
+
+    def test_weighted_choice(self):
+        builder = BookBuilder()
+        for _ in range(3):
+            builder.add_game([CENTRAL_CANNON])
+        builder.add_game([ELEPHANT])
+        path = os.path.join(self.directory.name, "weighted.bin")
+        builder.write(path)
+        book = OpeningBook(path, rng=random.Random(7))
+        choices = [book.choose_move(self.board) for _ in range(400)]
+        book.close()
+        self.assertEqual(set(choices), {CENTRAL_CANNON, ELEPHANT})
+        self.assertGreater(choices.count(CENTRAL_CANNON), choices.count(ELEPHANT) * 2)
+
+    def test_choose_move(self):
+        self.assertEqual(self.book.choose_move(self.board), CENTRAL_CANNON)
+        self.board.make_move(CENTRAL_CANNON)
+        self.assertEqual(self.book.choose_move(self.board), SCREEN_HORSE)
+        self.board.make_move(SCREEN_HORSE)
+        self.assertIsNone(self.book.choose_move(self.board))
+
+    def test_corrupt_file(self):
+        with open(self.path, "ab") as book_file:
+            book_file.write(b"\0")
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_illegal_record_rejected(self):
+        with self.assertRaises(ValueError):
+            BookBuilder().add_game([parse_iccs("h2h8")])
+
+    def test_computer_player_uses_book(self):
+        self.assertTrue(os.path.exists(DEFAULT_BOOK_PATH))
+        player = ComputerPlayer(is_red=True, depth=8)
+        move = player.get_move(self.board)
+        self.assertIn(move, [move for move, _ in player.opening_book.probe(self.board.zobrist_key)])
+        player.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+import unittest
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.ComputerPlayer import ComputerPlayer
+from game.pieces import General, Chariot, Soldier
+from game.rules import place_piece_on_board
+from utils.const import COLOR_BLACK, COLOR_RED
+
+class TestComputerPlayer(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+
+    def test_get_move_leaves_board_untouched(self):
+        """
+        Tìm kiếm chạy trên bản sao nên bàn cờ thật giữ nguyên trạng.
+        """
+        before = [row[:] for row in self.board.board]
+        before_core = bytes(self.board.position.squares)
+        move = ComputerPlayer(is_red=True, depth=2).get_move(self.board)
+        self.assertEqual(self.board.board, before)
+        self.assertEqual(bytes(self.board.position.squares), before_core)
+        self.assertEqual(self.board.undo_stack, [])
+
+        start_pos, end_pos = move
+        piece = self.board.board[start_pos[0]][start_pos[1]]
+        self.assertEqual(piece.color, COLOR_RED)
+        self.assertTrue(self.board.move_piece(start_pos, end_pos))
+
+    def test_black_moves_black_piece(self):
+        self.board.move_piece((9, 1), (7, 2))
+        start_pos, _ = ComputerPlayer(is_red=False, depth=2).get_move(self.board)
+        self.assertEqual(self.board.board[start_pos[0]][start_pos[1]].color, COLOR_BLACK)
+
+    def test_incremental_eval_matches_rescan(self):
+        """
+        Điểm vật chất + vị trí cộng dồn trong make/unmake khớp với điểm quét lại ở mọi lá của tìm kiếm.
+        """
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None)
+        player.debug_eval = True
+        player.search(self.board)
+        # Cùng một bảng điểm vị trí áp dụng cho cả hai bên: thế cờ ban đầu đối xứng có điểm 0
+        self.assertEqual(player.evaluate_board(self.board, True), 0)
+        advanced = Board()
+        advanced.load_fen("rnbakabnr/9/1c5c1/p1p1p1p1p/4P4/9/P1P3P1P/1C5C1/9/RNBAKABNR w - - 0 1")
+        # Tốt đỏ đã qua sông có giá trị cao hơn Tốt chưa qua sông
+        self.assertGreater(advanced.position.score, 0)
+
+    def test_quiescence_avoids_poisoned_capture(self):
+        """
+        Ở độ sâu 1, Xe đỏ không được ăn Tốt đang được Xe đen bảo vệ (tìm kiếm tĩnh thấy nước ăn lại).
+        """
+        board = Board()
+        place_piece_on_board(board, General(COLOR_RED), (9, 5))
+        place_piece_on_board(board, General(COLOR_BLACK), (0, 3))
+        place_piece_on_board(board, Chariot(COLOR_RED), (6, 0))
+        place_piece_on_board(board, Soldier(COLOR_BLACK), (3, 0))
+        place_piece_on_board(board, Chariot(COLOR_BLACK), (0, 0))
+        self.assertIn(((6, 0), (3, 0)), board.generate_captures(COLOR_RED))
+        move = ComputerPlayer(is_red=True, depth=1).get_move(board)
+        self.assertNotEqual(move, ((6, 0), (3, 0)))
+
+    def test_staged_move_picker(self):
+        """
+        Bộ chọn nước đi theo giai đoạn: nước từ bảng chuyển vị, nước ăn quân, killer, rồi nước thường;
+        mỗi nước hợp lệ xuất hiện đúng một lần.
+        """
+        board = self.board
+        for move in [((7, 1), (7, 4)), ((0, 1), (2, 2)), ((7, 4), (3, 4)), ((0, 0), (0, 1))]:
+            board.make_move(move)
+        player = ComputerPlayer(is_red=True)
+        player.simulator_board = board
+        tt_move, killer = ((9, 0), (8, 0)), ((9, 1), (7, 2))
+        player.killer_moves[1] = [killer, ((0, 0), (5, 5))]  # Killer không hợp lệ bị bỏ qua
+        moves = list(player._pick_moves(True, 1, tt_move))
+
+        legal = board.generate_legal_moves(COLOR_RED)
+        captures = board.generate_captures(COLOR_RED)
+        self.assertCountEqual(moves, legal)
+        self.assertEqual(moves[0], tt_move)
+        self.assertCountEqual(moves[1:1 + len(captures)], captures)
+        self.assertEqual(moves[1 + len(captures)], killer)
+        # Nước từ bảng chuyển vị không hợp lệ (va chạm khóa) bị bỏ qua
+        self.assertCountEqual(list(player._pick_moves(True, 1, ((9, 0), (5, 0)))), legal)
+
+    def test_selective_search_switches(self):
+        """
+        Null move, LMR và futility pruning có thể tắt riêng; mỗi kỹ thuật đếm số nút đã cắt.
+        """
+        self.board.load_fen("r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w - - 0 1")
+        full = ComputerPlayer(is_red=True, depth=4)
+        full_move = full.get_move(self.board)
+        self.assertIn(full_move, self.board.generate_legal_moves(COLOR_RED))
+        self.assertTrue(all(count > 0 for count in full.pruning_stats.values()), full.pruning_stats)
+
+        plain = ComputerPlayer(is_red=True, depth=2, null_move=False,
+                               late_move_reductions=False, futility_pruning=False)
+        plain.get_move(self.board)
+        self.assertEqual(sum(plain.pruning_stats.values()), 0)
+
+    def test_no_null_move_without_attackers(self):
+        """
+        Tàn cuộc chỉ còn Tốt, Sĩ, Tượng dễ rơi vào zugzwang: không dùng nước đi rỗng.
+        """
+        self.board.load_fen("3k5/4a4/9/9/9/2p3P2/9/9/4A4/4K4 w - - 0 1")
+        player = ComputerPlayer(is_red=True, depth=4)
+        player.get_move(self.board)
+        self.assertEqual(player.pruning_stats['null_move'], 0)
+
+    def test_time_limited_search(self):
+        """
+        Tìm kiếm theo thời gian dừng gần hạn chót và trả về nước đi của lần lặp đã hoàn thành.
+        """
+        player = ComputerPlayer(is_red=True)
+        start = time.perf_counter()
+        move = player.get_move(self.board, time_limit=0.3)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(move, self.board.generate_legal_moves(COLOR_RED))
+        self.assertEqual(self.board.undo_stack, [])
+
+    def play_and_ponder(self, player):
+        """
+        Máy (đỏ) đi một nước rồi suy nghĩ trong giờ đối phương cho đến khi hoàn thành ít nhất độ sâu 2.
+        """
+        self.board.make_move(player.get_move(self.board))
+        predicted = player.start_pondering(self.board)
+        self.assertIn(predicted, self.board.generate_legal_moves(COLOR_BLACK))
+        deadline = time.perf_counter() + 10
+        while player.ponder_depth < 2 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(player.pondering)
+        return predicted
+
+    def test_ponder_hit_continues_from_pondered_depth(self):
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None)
+        predicted = self.play_and_ponder(player)
+        self.board.make_move(predicted)
+        depths = []
+        player.search = lambda board, time_manager=None, max_depth=None, start_depth=1, on_iteration=None: \
+            depths.append(start_depth)
+        player.get_move(self.board, time_limit=1.0)
+        self.assertFalse(player.pondering)
+        self.assertEqual(player.ponder_stats, {'hits': 1, 'misses': 0})
+        self.assertGreaterEqual(depths[0], 2)
+
+    def test_ponder_miss_stops_quickly(self):
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None)
+        predicted = self.play_and_ponder(player)
+        other = next(move for move in self.board.generate_legal_moves(COLOR_BLACK) if move != predicted)
+        self.board.make_move(other)
+        start = time.perf_counter()
+        move = player.get_move(self.board)
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertFalse(player.pondering)
+        self.assertEqual(player.ponder_stats, {'hits': 0, 'misses': 1})
+        self.assertIn(move, self.board.generate_legal_moves(COLOR_RED))
+        self.board.make_move(move)
+        self.assertIsNotNone(player.start_pondering(self.board))
+        start = time.perf_counter()
+        player.close()
+        self.assertLess(time.perf_counter() - start, 0.5)  # Luồng nền dừng gần như ngay lập tức
+
+    def test_move_gen_cache_is_bounded(self):
+        player = ComputerPlayer(is_red=True, depth=1, book_path=None, tablebase_dir=None)
+        player.MOVE_GEN_CACHE_ENTRIES = 2
+        keys = []
+        for move in self.board.generate_legal_moves(COLOR_RED)[:2]:
+            keys.append(self.board.zobrist_key)
+            player.search(self.board)
+            self.board.make_move(move)
+            self.board.make_move(self.board.generate_legal_moves(COLOR_BLACK)[0])
+        keys.append(self.board.zobrist_key)
+        player.search(self.board)
+        self.assertEqual(list(player.move_gen_cache), keys[1:])  # Mục cũ nhất bị bỏ
+
+    def test_concurrent_stop_pondering(self):
+        """
+        Giao diện (reset ván) và luồng tìm kiếm nền có thể cùng dừng suy nghĩ: chỉ một bên dừng luồng.
+        """
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None)
+        for _ in range(5):
+            self.play_and_ponder(player)
+            errors = []
+
+            def stop():
+                try:
+                    player.stop_pondering()
+                except Exception as error:
+                    errors.append(error)
+            threads = [threading.Thread(target=stop) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertFalse(player.pondering)
+            self.setUp()
+        player.close()
+
+    def test_mate_score_counts_plies(self):
+        """
+        Điểm chiếu hết trừ số nửa nước từ gốc; bảng chuyển vị lưu khoảng cách tính từ thế cờ được lưu.
+        """
+        board = Board()
+        board.load_fen("3k5/9/9/9/9/R8/9/9/9/4K4 w - - 0 1")
+        player = ComputerPlayer(is_red=True, depth=3, book_path=None, tablebase_dir=None)
+        scores = []
+        move = player.search(board, on_iteration=lambda depth, move, score: scores.append(score))
+        self.assertEqual(scores[-1], ComputerPlayer.MATE_SCORE - 1)
+        record = board.make_move(move)
+        self.assertTrue(board.is_checkmate(COLOR_BLACK))
+        board.unmake_move(record)
+
+        mate_in_two = ComputerPlayer.MATE_SCORE - 2
+        self.assertEqual(player._score_to_tt(mate_in_two - 3, 3), mate_in_two)
+        self.assertEqual(player._score_from_tt(mate_in_two, 5), mate_in_two - 5)
+        self.assertEqual(player._score_to_tt(-mate_in_two + 3, 3), -mate_in_two)
+        self.assertEqual(player._score_from_tt(-mate_in_two, 5), -mate_in_two + 5)
+        self.assertEqual(player._score_to_tt(450, 7), 450)
+
+    def test_single_legal_move_is_instant(self):
+        board = Board()
+        place_piece_on_board(board, General(COLOR_RED), (9, 3))
+        place_piece_on_board(board, General(COLOR_BLACK), (0, 4))
+        place_piece_on_board(board, Chariot(COLOR_BLACK), (9, 8))
+        player = ComputerPlayer(is_red=True, tablebase_dir=None)
+        self.assertEqual(player.get_move(board, time_left=900), ((9, 3), (8, 3)))
+        self.assertEqual(player.time_manager.nodes, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.evalcache import EvalCache, entries_for_size, ENTRY_BYTES
+from utils.ComputerPlayer import ComputerPlayer
+
+class TestEvalCache(unittest.TestCase):
+    def test_capacity(self):
+        cache = EvalCache(1)
+        self.assertEqual(cache.num_entries, entries_for_size(1))
+        self.assertEqual(cache.num_entries & (cache.num_entries - 1), 0)
+        self.assertLessEqual(cache.size_bytes, 1024 * 1024)
+        self.assertEqual(EvalCache(0).num_entries * ENTRY_BYTES, 32)  # Tối thiểu một tập
+
+    def test_store_and_probe(self):
+        cache = EvalCache(1)
+        self.assertIsNone(cache.probe(12345))
+        cache.store(12345, -420)
+        self.assertEqual(cache.probe(12345), -420)
+        cache.store(12345, 7)
+        self.assertEqual(cache.probe(12345), 7)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        cache.store(0, 99)  # Khóa 0 không được lưu
+        self.assertIsNone(cache.probe(0))
+
+    def test_least_recently_used_evicted(self):
+        cache = EvalCache(0)  # Một tập 2 đường: mọi khóa cùng tập
+        cache.store(1, 10)
+        cache.store(2, 20)
+        self.assertEqual(cache.probe(1), 10)  # 1 trở thành mục dùng gần nhất
+        cache.store(3, 30)  # Thay 2
+        self.assertIsNone(cache.probe(2))
+        self.assertEqual(cache.probe(1), 10)
+        self.assertEqual(cache.probe(3), 30)
+
+    def test_clear(self):
+        cache = EvalCache(1)
+        cache.store(5, 1)
+        cache.probe(5)
+        cache.clear()
+        self.assertIsNone(cache.probe(5))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_persists_across_moves(self):
+        board = Board()
+        board.initialize_board()
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None, eval_cache_mb=1)
+        player.search(board)
+        hits = player.eval_cache.hits
+        player.search(board)
+        # Lần tìm kiếm thứ hai dùng lại điểm đã tính ở lần trước
+        self.assertGreater(player.eval_cache.hits - hits, 0)
+        self.assertGreater(player.eval_cache.hit_rate, 0)
+
+if __name__ == "__main__":
+    unittest.main()
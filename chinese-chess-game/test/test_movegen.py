@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from game.movegen import generate_legal_moves, has_legal_move, square_attacked, CheckInfo
+from game.position import square_of
+from game.rules import place_piece_on_board
+from game.pieces import General, Chariot, Cannon, Horse, Soldier
+from utils.const import COLOR_BLACK, COLOR_RED
+
+def build_board(pieces):
+    """
+    Tạo bàn cờ chỉ gồm các quân cho trước: danh sách (lớp quân, màu, vị trí).
+    """
+    board = Board()
+    for piece_class, color, pos in pieces:
+        place_piece_on_board(board, piece_class(color), pos)
+    return board
+
+def legal_targets(board, color, pos):
+    origin = square_of(*pos)
+    return sorted(to for frm, to in generate_legal_moves(board.position, color) if frm == origin)
+
+class TestLegalMoveGeneration(unittest.TestCase):
+    def test_initial_position(self):
+        board = Board()
+        board.initialize_board()
+        self.assertEqual(len(board.generate_legal_moves(COLOR_RED)), 44)
+        self.assertEqual(len(board.generate_legal_moves(COLOR_BLACK)), 44)
+
+    def test_pinned_by_chariot(self):
+        # Xe đỏ ở (8, 4) bị Xe đen ghim trên cột Tướng: chỉ đi dọc cột hoặc ăn Xe đen
+        board = build_board([
+            (General, COLOR_RED, (9, 4)), (Chariot, COLOR_RED, (8, 4)),
+            (Chariot, COLOR_BLACK, (5, 4)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        targets = legal_targets(board, COLOR_RED, (8, 4))
+        self.assertEqual(targets, [square_of(r, 4) for r in (5, 6, 7)])
+
+    def test_cannon_screen(self):
+        # Không được đặt quân vào giữa Tướng và Pháo đối phương (tạo ngòi)
+        board = build_board([
+            (General, COLOR_RED, (9, 4)), (Chariot, COLOR_RED, (7, 0)),
+            (Cannon, COLOR_BLACK, (4, 4)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        targets = legal_targets(board, COLOR_RED, (7, 0))
+        self.assertNotIn(square_of(7, 4), targets)
+        self.assertIn(square_of(7, 3), targets)
+
+    def test_piece_blocking_horse_leg_is_pinned(self):
+        # Tốt đỏ ở (8, 4) đang cản chân Mã đen ở (8, 3): rời đi sẽ để Tướng bị chiếu
+        board = build_board([
+            (General, COLOR_RED, (9, 5)), (Soldier, COLOR_RED, (8, 4)),
+            (Horse, COLOR_BLACK, (8, 3)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        self.assertFalse(square_attacked(board.position, square_of(9, 5), COLOR_BLACK))
+        info = CheckInfo(board.position, COLOR_RED)
+        self.assertTrue(info.pinned_mask >> square_of(8, 4) & 1)
+        self.assertEqual(legal_targets(board, COLOR_RED, (8, 4)), [])
+
+    def test_flying_general(self):
+        # Tướng không được đi sang cột có Tướng đối phương mà không có quân cản
+        board = build_board([
+            (General, COLOR_RED, (9, 4)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        targets = legal_targets(board, COLOR_RED, (9, 4))
+        self.assertNotIn(square_of(9, 3), targets)
+        self.assertIn(square_of(9, 5), targets)
+
+    def test_checkmate_and_stalemate(self):
+        # Hai Xe đen khóa Tướng đỏ: bị chiếu hết
+        board = build_board([
+            (General, COLOR_RED, (9, 4)), (Chariot, COLOR_BLACK, (9, 0)),
+            (Chariot, COLOR_BLACK, (8, 8)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        self.assertFalse(has_legal_move(board.position, COLOR_RED))
+        self.assertTrue(board.is_checkmate(COLOR_RED))
+
+        # Tướng đỏ không bị chiếu nhưng không còn nước đi: hết nước
+        board = build_board([
+            (General, COLOR_RED, (9, 3)), (Chariot, COLOR_BLACK, (8, 8)),
+            (General, COLOR_BLACK, (0, 4)),
+        ])
+        self.assertFalse(board.is_checkmate(COLOR_RED))
+        self.assertTrue(board.is_stalemate(COLOR_RED))
+        self.assertFalse(board.is_stalemate(COLOR_BLACK))
+
+    def test_matches_make_unmake_filter(self):
+        """
+        Sinh nước đi hợp lệ phải khớp với cách lọc cũ: thử từng nước và kiểm tra chiếu.
+        """
+        board = Board()
+        board.initialize_board()
+        for move in [((7, 1), (0, 1)), ((0, 0), (0, 1)), ((7, 7), (7, 4)), ((3, 4), (4, 4))]:
+            board.make_move(move)
+        for color in (COLOR_RED, COLOR_BLACK):
+            expected = []
+            for piece in board.get_pieces_by_color(color):
+                for end_pos in piece.valid_positions:
+                    move = (piece.current_position, end_pos)
+                    record = board.make_move(move)
+                    if not board.is_check(color):
+                        expected.append(move)
+                    board.unmake_move(record)
+            self.assertCountEqual(board.generate_legal_moves(color), expected)
+
+    def test_captures_match_legal_moves(self):
+        """
+        Bộ sinh nước ăn quân phải trả về đúng các nước hợp lệ có đích là quân đối phương.
+        """
+        board = Board()
+        board.initialize_board()
+        for move in [((7, 1), (7, 4)), ((0, 1), (2, 2)), ((7, 4), (3, 4)), ((0, 0), (0, 1))]:
+            board.make_move(move)
+        for color in (COLOR_RED, COLOR_BLACK):
+            expected = [move for move in board.generate_legal_moves(color)
+                        if board.get_piece_at(*move[1]) is not None]
+            self.assertCountEqual(board.generate_captures(color), expected)
+            quiets = [move for move in board.generate_legal_moves(color) if move not in expected]
+            self.assertCountEqual(board.generate_quiet_moves(color), quiets)
+
+    def test_is_legal_move(self):
+        board = build_board([
+            (General, COLOR_RED, (9, 4)), (Chariot, COLOR_RED, (8, 4)), (Cannon, COLOR_RED, (7, 1)),
+            (Chariot, COLOR_BLACK, (5, 4)), (General, COLOR_BLACK, (0, 3)),
+        ])
+        self.assertTrue(board.is_legal_move(((8, 4), (5, 4)), COLOR_RED))
+        self.assertFalse(board.is_legal_move(((8, 4), (8, 0)), COLOR_RED))  # Xe bị ghim
+        self.assertTrue(board.is_legal_move(((7, 1), (0, 1)), COLOR_RED))
+        self.assertFalse(board.is_legal_move(((7, 1), (6, 2)), COLOR_RED))  # Pháo không đi chéo
+        self.assertFalse(board.is_legal_move(((5, 4), (6, 4)), COLOR_RED))  # Quân của đối phương
+        self.assertTrue(board.is_legal_move(((5, 4), (6, 4)), COLOR_BLACK))
+
+if __name__ == "__main__":
+    unittest.main()
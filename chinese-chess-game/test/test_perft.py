@@ -0,0 +1,32 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from perft import PERFT_SUITE, reference_count, verify_move_generation
+
+class TestPerftSuite(unittest.TestCase):
+    def test_suite_depth_two(self):
+        """
+        Số nút lá ở độ sâu 2 phải khớp giá trị tham chiếu với mọi thế cờ trong bộ chuẩn.
+        """
+        board = Board()
+        for fen, counts in PERFT_SUITE:
+            board.load_fen(fen)
+            self.assertEqual(board.perft(2), counts[2], fen)
+
+    def test_reference_lookup(self):
+        fen = PERFT_SUITE[0][0]
+        self.assertEqual(reference_count(fen, 3), 79666)
+        self.assertIsNone(reference_count("4k4/9/9/9/9/9/9/9/9/4K4 w - - 0 1", 1))
+
+    def test_movegen_matches_rules(self):
+        """
+        Bộ sinh nước đi hợp lệ phải khớp với valid_positions của rules.py ở mọi nút.
+        """
+        board = Board()
+        board.load_fen(PERFT_SUITE[1][0])
+        self.assertEqual(verify_move_generation(board, 2), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.position import (
+    Position, SquareSet, EMPTY, square_of, row_col, encode_piece, color_of_code, type_of_code, iter_squares
+)
+from game.board import Board
+from game.rules import place_piece_on_board, remove_piece_from_board
+from game.pieces import Chariot
+from utils.const import COLOR_BLACK, COLOR_RED, TYPE_CHARIOT, TYPE_GENERAL, BOARD_ROWS, BOARD_COLS
+
+class TestPosition(unittest.TestCase):
+    def test_square_conversion(self):
+        self.assertEqual(square_of(0, 0), 0)
+        self.assertEqual(square_of(9, 8), 89)
+        for square in range(BOARD_ROWS * BOARD_COLS):
+            self.assertEqual(square_of(*row_col(square)), square)
+
+    def test_piece_codes(self):
+        code = encode_piece(COLOR_BLACK, TYPE_CHARIOT)
+        self.assertEqual(color_of_code(code), COLOR_BLACK)
+        self.assertEqual(type_of_code(code), TYPE_CHARIOT)
+        self.assertNotEqual(code, encode_piece(COLOR_RED, TYPE_CHARIOT))
+
+    def test_put_remove_and_copy(self):
+        position = Position()
+        code = encode_piece(COLOR_RED, TYPE_GENERAL)
+        position.put(square_of(9, 4), code)
+        copy = position.copy()
+        self.assertEqual(position.remove(square_of(9, 4)), code)
+        self.assertEqual(position.piece_at(square_of(9, 4)), EMPTY)
+        self.assertEqual(list(position.piece_lists[COLOR_RED]), [])
+        # Bản sao không bị ảnh hưởng
+        self.assertEqual(copy.general_square(COLOR_RED), square_of(9, 4))
+
+    def test_board_keeps_position_in_sync(self):
+        """
+        Trạng thái gọn phải luôn khớp với lưới quân cờ của Board.
+        """
+        board = Board()
+        board.initialize_board()
+        self.assertEqual(len(board.position.piece_lists[COLOR_RED]), 16)
+        self.assertEqual(len(board.position.piece_lists[COLOR_BLACK]), 16)
+
+        place_piece_on_board(board, Chariot(COLOR_RED), (4, 4))
+        remove_piece_from_board(board, (0, 0))
+        for row in range(BOARD_ROWS):
+            for col in range(BOARD_COLS):
+                piece = board.board[row][col]
+                expected = EMPTY if piece is None else encode_piece(piece.color, piece.type)
+                self.assertEqual(board.position.piece_at(square_of(row, col)), expected)
+
+        # Khởi tạo lại không để sót quân cũ
+        board.initialize_board()
+        self.assertEqual(len(board.get_all_pieces()), 32)
+        self.assertEqual(len(board.position.piece_lists[COLOR_RED]), 16)
+
+class TestSquareSet(unittest.TestCase):
+    def test_behaves_like_position_list(self):
+        squares = SquareSet((1 << square_of(0, 0)) | (1 << square_of(9, 8)) | (1 << square_of(4, 4)))
+        self.assertIn((4, 4), squares)
+        self.assertNotIn((4, 5), squares)
+        self.assertNotIn((10, 0), squares)
+        self.assertEqual(list(squares), [(0, 0), (4, 4), (9, 8)])
+        self.assertEqual(len(squares), 3)
+        self.assertFalse(SquareSet())
+        self.assertEqual(list(iter_squares(squares.mask)), [0, 40, 89])
+
+    def test_piece_masks(self):
+        board = Board()
+        board.initialize_board()
+        chariot = board.board[9][0]
+        self.assertCountEqual(chariot.valid_positions, [(8, 0), (7, 0)])
+        self.assertEqual(chariot.valid_mask, (1 << square_of(8, 0)) | (1 << square_of(7, 0)))
+        self.assertEqual(len(chariot.can_moves), 17)
+
+if __name__ == "__main__":
+    unittest.main()
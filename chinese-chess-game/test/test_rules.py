@@ -316,6 +316,23 @@ class TestRules(unittest.TestCase):
         self.assertIn((6, 0), self.soldier_black.valid_positions)
         remove_piece_from_board(self.board, (5, 0))
 
+    def test_horse_moves_stay_blocked_when_destination_changes(self):
+        """
+        Khi một ô đích của Mã thay đổi, Mã vẫn phải bị cản nếu chân Mã có quân.
+        """
+        place_piece_on_board(self.board, self.horse_black, (4, 4))
+        place_piece_on_board(self.board, Soldier(COLOR_BLACK), (4, 3))
+        self.assertNotIn((3, 2), self.horse_black.valid_positions)
+
+        # Đặt rồi xóa quân đối phương ở ô đích (3, 2): Mã vẫn bị cản chân
+        place_piece_on_board(self.board, Soldier(COLOR_RED), (3, 2))
+        remove_piece_from_board(self.board, (3, 2))
+        self.assertNotIn((3, 2), self.horse_black.valid_positions)
+
+        # Bỏ quân cản chân: Mã đi được
+        remove_piece_from_board(self.board, (4, 3))
+        self.assertIn((3, 2), self.horse_black.valid_positions)
+
     def test_count_pieces_between(self):
         """
         Test hàm _count_pieces_between để đếm số quân cờ giữa hai vị trí.
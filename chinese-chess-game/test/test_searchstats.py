@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.ComputerPlayer import ComputerPlayer
+from utils.searchstats import SearchStats
+from utils.const import COLOR_RED
+
+class TestSearchStats(unittest.TestCase):
+    def test_derived_values(self):
+        stats = SearchStats()
+        self.assertEqual(stats.depth, 0)
+        self.assertEqual(stats.pv, [])
+        self.assertEqual(stats.tt_hit_rate, 0.0)
+        self.assertEqual(stats.first_move_cutoff_rate, 0.0)
+        self.assertEqual(stats.effective_branching_factor, 0.0)
+        stats.nodes, stats.qnodes = 300, 700
+        stats.tt_probes, stats.tt_hits = 300, 75
+        stats.beta_cutoffs, stats.first_move_cutoffs = 40, 30
+        stats.add_iteration(1, ((9, 1), (7, 2)), 10, 100, 0.1, [((9, 1), (7, 2))])
+        stats.add_iteration(2, ((9, 7), (7, 6)), 5, 400, 0.4, [((9, 7), (7, 6)), ((0, 1), (2, 2))])
+        stats.elapsed = 0.5
+        self.assertEqual(stats.total_nodes, 1000)
+        self.assertEqual(stats.depth, 2)
+        self.assertEqual(stats.pv, [((9, 7), (7, 6)), ((0, 1), (2, 2))])
+        self.assertAlmostEqual(stats.nps, 2000)
+        self.assertAlmostEqual(stats.tt_hit_rate, 0.25)
+        self.assertAlmostEqual(stats.first_move_cutoff_rate, 0.75)
+        self.assertAlmostEqual(stats.effective_branching_factor, 4.0)
+        data = stats.as_dict()
+        self.assertEqual(data['source'], 'search')
+        self.assertEqual([iteration['depth'] for iteration in data['iterations']], [1, 2])
+        self.assertIn("độ sâu 2", str(stats))
+
+class TestComputerPlayerStats(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.initialize_board()
+
+    def test_get_move_records_stats(self):
+        player = ComputerPlayer(is_red=True, depth=3, book_path=None, tablebase_dir=None)
+        streamed = []
+        player.stats_callback = lambda stats: streamed.append((stats.depth, stats.total_nodes))
+        move = player.get_move(self.board)
+        stats = player.last_stats
+        self.assertEqual(stats.source, 'search')
+        self.assertEqual(stats.depth, 3)
+        self.assertEqual([iteration.depth for iteration in stats.iterations], [1, 2, 3])
+        self.assertEqual([depth for depth, _ in streamed], [1, 2, 3])
+        self.assertEqual(stats.pv[0], move)
+        self.assertLessEqual(len(stats.pv), 3)
+        self.assertGreater(stats.nodes, 0)
+        self.assertGreater(stats.qnodes, 0)
+        self.assertLessEqual(stats.tt_cutoffs, stats.tt_hits)
+        self.assertLessEqual(stats.tt_hits, stats.tt_probes)
+        self.assertLessEqual(stats.first_move_cutoffs, stats.beta_cutoffs)
+        self.assertGreater(stats.beta_cutoffs, 0)
+        self.assertEqual(sum(iteration.nodes for iteration in stats.iterations), stats.total_nodes)
+        self.assertGreater(stats.elapsed, 0)
+        self.assertGreater(stats.nps, 0)
+        self.assertGreater(stats.effective_branching_factor, 1)
+
+    def test_stats_are_per_search(self):
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=None)
+        player.get_move(self.board)
+        first = player.last_stats
+        player.get_move(self.board)
+        self.assertIsNot(player.last_stats, first)
+        # Lần thứ hai dùng lại bảng chuyển vị nên duyệt ít nút hơn
+        self.assertLess(player.last_stats.total_nodes, first.total_nodes)
+
+    def test_book_move_source(self):
+        player = ComputerPlayer(is_red=True, depth=2, tablebase_dir=None)
+        if player.opening_book is None:
+            self.skipTest("Không có sách khai cuộc")
+        self.assertIn(player.get_move(self.board), self.board.generate_legal_moves(COLOR_RED))
+        self.assertEqual(player.last_stats.source, 'book')
+        self.assertEqual(player.last_stats.total_nodes, 0)
+
+if __name__ == "__main__":
+    unittest.main()
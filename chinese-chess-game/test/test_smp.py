@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.ComputerPlayer import ComputerPlayer
+from utils.smp import LazySMPSearch, SharedStopTimeManager
+from utils.timeman import SearchTimeout
+from utils.const import COLOR_RED
+
+class TestLazySMP(unittest.TestCase):
+    def test_parallel_search_returns_deepest_result(self):
+        board = Board()
+        board.initialize_board()
+        player = ComputerPlayer(is_red=True, depth=2, workers=2, book_path=None)
+        try:
+            move = player.get_move(board)
+            self.assertIn(move, board.generate_legal_moves(COLOR_RED))
+            self.assertEqual(player.parallel_search.completed_depth, 2)
+            self.assertEqual(board.undo_stack, [])
+            # Bảng chuyển vị dùng chung đã nhận kết quả của các tiến trình
+            self.assertGreater(player.parallel_search.transposition_table.hashfull(), 0)
+        finally:
+            player.close()
+
+    def test_worker_pool_persists_between_searches(self):
+        board = Board()
+        board.initialize_board()
+        legal_moves = board.generate_legal_moves(COLOR_RED)
+        search = LazySMPSearch(workers=2, tt_size_mb=1)
+        try:
+            self.assertIn(search.get_move(board, True, 2), legal_moves)
+            processes = search._pool[0]
+            pids = [process.pid for process in processes]
+            self.assertIn(search.get_move(board, True, 3), legal_moves)
+            self.assertEqual([process.pid for process in search._pool[0]], pids)  # Không khởi chạy lại
+            self.assertEqual(search.completed_depth, 3)
+            # Một tiến trình chết bất thường: lần tìm kiếm vẫn trả về nước đi, lần sau khởi chạy nhóm mới
+            processes[1].terminate()
+            processes[1].join()
+            self.assertIn(search.get_move(board, True, 2), legal_moves)
+            self.assertIn(search.get_move(board, True, 2), legal_moves)
+            self.assertTrue(all(process.is_alive() for process in search._pool[0]))
+            processes = search._pool[0]
+        finally:
+            search.close()
+        self.assertFalse(any(process.is_alive() for process in processes))
+
+    def test_close_releases_shared_memory(self):
+        search = LazySMPSearch(workers=2, tt_size_mb=1)
+        name = search.shared_memory.name
+        search.close()
+        self.assertFalse(os.path.exists(os.path.join("/dev/shm", name)))
+        search.close()  # Gọi lại không lỗi
+
+    def test_stop_event_interrupts_search(self):
+        stop_event = multiprocessing.Event()
+        manager = SharedStopTimeManager(float('inf'), float('inf'), stop_event, check_interval=1)
+        manager.check()
+        stop_event.set()
+        self.assertFalse(manager.should_start_iteration(0.0))
+        with self.assertRaises(SearchTimeout):
+            manager.check()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.board import Board
+from utils.tablebase import (
+    Tablebase, TablebaseGenerator, MaterialLayout, WIN, DRAW, LOSS,
+    canonical_material, parse_material, flip_square, decode_value
+)
+from utils.ComputerPlayer import ComputerPlayer
+from utils.const import COLOR_RED
+
+# Tướng đen ở d9, Tướng đỏ ở e0 (khống chế cột e), Xe đỏ ở a4: Xe đi d4 là chiếu hết
+MATE_IN_ONE_FEN = "3k5/9/9/9/9/R8/9/9/9/4K4 w - - 0 1"
+MATED_FEN = "3k5/9/9/9/9/3R5/9/9/9/4K4 b - - 0 1"
+# Cùng thế cờ nhưng đổi màu hai bên: đen có Xe, đỏ bị chiếu hết
+MIRRORED_MATED_FEN = "4k4/9/9/9/3r5/9/9/9/9/3K5 w - - 0 1"
+
+class TestTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        TablebaseGenerator(cls.directory.name).table("KRvK")
+        cls.tablebase = Tablebase(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        cls.directory.cleanup()
+
+    def probe_fen(self, fen):
+        board = Board()
+        board.load_fen(fen)
+        return self.tablebase.probe(board.position)
+
+    def test_material_names(self):
+        self.assertEqual(parse_material("KRvKAA"), ([1, 5], [1, 2, 2]))
+        self.assertEqual(canonical_material([1], [1, 5]), ("KRvK", True))
+        self.assertEqual(canonical_material([1, 2, 2], [1, 5]), ("KRvKAA", True))
+        with self.assertRaises(ValueError):
+            parse_material("KRvR")
+        self.assertEqual(flip_square(3), 84)
+
+    def test_layout_round_trip(self):
+        layout = MaterialLayout("KRvK")
+        self.assertEqual(layout.total, 2 * 9 * 90 * 9)
+        for index in (0, 1234, layout.total - 1):
+            side, squares = layout.decode(index)
+            self.assertEqual(layout.index_of(side, squares), index)
+        self.assertIsNone(layout.index_of(0, [0, 0, 3]))  # Tướng đỏ ngoài cung
+
+    def test_files_written(self):
+        self.assertEqual(sorted(self.tablebase.layouts), ["KRvK", "KvK"])
+        self.assertEqual(self.tablebase.max_pieces, 3)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory.name, "KRvK.tb")), 14580)
+
+    def test_probe(self):
+        self.assertEqual(self.probe_fen(MATE_IN_ONE_FEN), (WIN, 1))
+        self.assertEqual(self.probe_fen(MATED_FEN), (LOSS, 0))
+        self.assertEqual(self.probe_fen("3k5/9/9/9/9/9/9/9/9/4K4 w - - 0 1"), (DRAW, 0))
+        self.assertIsNone(self.probe_fen("3k5/9/9/9/9/R8/9/9/4A4/4K4 w - - 0 1"))
+
+    def test_probe_mirrored_material(self):
+        self.assertEqual(self.probe_fen(MIRRORED_MATED_FEN), (LOSS, 0))
+
+    def test_distances_consistent_with_moves(self):
+        # Thế thắng có nước đi tới thế thua ngắn hơn một nửa nước; thế thua mọi nước đều tới thế thắng
+        board = Board()
+        for fen in (MATE_IN_ONE_FEN, "3k5/9/9/9/9/9/9/9/4R4/5K3 b - - 0 1"):
+            board.load_fen(fen)
+            result, distance = self.tablebase.probe(board.position)
+            children = []
+            for move in board.generate_legal_moves():
+                board.make_move(move)
+                children.append(self.tablebase.probe(board.position))
+                board.unmake_move()
+            if result == WIN:
+                self.assertEqual(min(d for r, d in children if r == LOSS), distance - 1)
+            else:
+                self.assertEqual(result, LOSS)
+                self.assertTrue(all(r == WIN for r, _ in children))
+                self.assertEqual(max(d for _, d in children), distance - 1)
+
+    def test_decode_value(self):
+        self.assertEqual(decode_value(0), (DRAW, 0))
+        self.assertEqual(decode_value(1), (LOSS, 0))
+        self.assertEqual(decode_value(2), (WIN, 1))
+
+    def test_computer_player_uses_tablebase(self):
+        board = Board()
+        board.load_fen(MATE_IN_ONE_FEN)
+        player = ComputerPlayer(is_red=True, depth=1, book_path=None, tablebase_dir=self.directory.name)
+        move = player.get_move(board)
+        board.make_move(move)
+        self.assertTrue(board.is_checkmate(board.side_to_move))
+        player.close()
+
+    def test_tablebase_move_only_for_side_to_move(self):
+        board = Board()
+        board.load_fen(MATE_IN_ONE_FEN)  # Đỏ đến lượt
+        player = ComputerPlayer(is_red=False, depth=1, book_path=None, tablebase_dir=self.directory.name)
+        self.assertIsNone(player._tablebase_move(board))
+        player.close()
+
+    def test_search_scores_tablebase_win(self):
+        board = Board()
+        board.load_fen("3k5/9/9/9/9/9/9/9/4R4/5K3 w - - 0 1")
+        result, distance = self.tablebase.probe(board.position)
+        self.assertEqual(result, WIN)
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=self.directory.name)
+        scores = []
+        player.search(board, on_iteration=lambda depth, move, score: scores.append(score))
+        player.close()
+        # Các nút con được tra trong bảng: điểm là điểm thắng theo bảng trừ số nửa nước đến khi chiếu hết
+        self.assertEqual(scores[-1], ComputerPlayer.TABLEBASE_WIN_SCORE - distance)
+
+    def test_tablebase_scores_are_ply_independent_in_tt(self):
+        """
+        Điểm suy ra từ bảng tàn cục được lưu theo khoảng cách tính từ thế cờ, nên dùng lại đúng ở ply khác.
+        """
+        board = Board()
+        board.load_fen("4k4/9/3a5/9/9/9/9/9/9/3R1K3 w - - 0 1")  # 4 quân: chỉ các nút con ăn Sĩ có trong bảng
+        player = ComputerPlayer(is_red=True, depth=2, book_path=None, tablebase_dir=self.directory.name)
+        player.simulator_board = board.clone()
+        deep_score = player.nega_scout(2, -float('inf'), float('inf'), True, ply=5)
+        self.assertGreaterEqual(deep_score, ComputerPlayer.DECISIVE_BOUND)
+        self.assertEqual(player.transposition_table.probe(board.zobrist_key)[2], deep_score + 5)
+        # Gặp lại ở ply 1: điểm đọc từ bảng chuyển vị gần hơn 4 nửa nước
+        nodes = player.search_stats.nodes
+        self.assertEqual(player.nega_scout(2, -float('inf'), float('inf'), True, ply=1), deep_score + 4)
+        self.assertEqual(player.search_stats.tt_cutoffs, 1)
+        self.assertEqual(player.search_stats.nodes, nodes + 1)
+        player.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from game.tables import (
+    RANK_ATTACKS, FILE_ATTACKS, LINE_BITS, HORSE_MOVES, ELEPHANT_MOVES, ADVISOR_MOVES, SOLDIER_MOVES,
+    FILE_SQUARES, HORSE_LEGS, LINE_REACH
+)
+from game.position import square_of
+from utils.const import COLOR_BLACK, COLOR_RED
+
+class TestLineTables(unittest.TestCase):
+    def test_empty_line(self):
+        # Quân ở cột 4 trên hàng trống: đi được mọi ô còn lại, không có quân chặn
+        slides, blockers, screens = RANK_ATTACKS[4][1 << 4]
+        self.assertEqual(LINE_BITS[slides], (0, 1, 2, 3, 5, 6, 7, 8))
+        self.assertEqual(blockers, 0)
+        self.assertEqual(screens, 0)
+
+    def test_blockers_and_screens(self):
+        # Hàng: quân ở cột 4, có quân ở cột 1, 2, 6 và 8
+        occupancy = (1 << 4) | (1 << 1) | (1 << 2) | (1 << 6) | (1 << 8)
+        slides, blockers, screens = RANK_ATTACKS[4][occupancy]
+        self.assertEqual(LINE_BITS[slides], (3, 5))
+        self.assertEqual(LINE_BITS[blockers], (2, 6))
+        self.assertEqual(LINE_BITS[screens], (1, 8))
+
+    def test_file_table_covers_ten_rows(self):
+        # Cột: quân ở hàng 0, ngòi ở hàng 5, mục tiêu ở hàng 9
+        occupancy = 1 | (1 << 5) | (1 << 9)
+        slides, blockers, screens = FILE_ATTACKS[0][occupancy]
+        self.assertEqual(LINE_BITS[slides], (1, 2, 3, 4))
+        self.assertEqual(LINE_BITS[blockers], (5,))
+        self.assertEqual(LINE_BITS[screens], (9,))
+
+    def test_file_squares(self):
+        # Mặt nạ theo hàng của cột 3 được chuyển thành mặt nạ 90 bit
+        self.assertEqual(FILE_SQUARES[3][(1 << 0) | (1 << 9)], (1 << square_of(0, 3)) | (1 << square_of(9, 3)))
+        self.assertEqual(bin(LINE_REACH[square_of(4, 4)]).count("1"), 17)
+
+class TestLeaperTables(unittest.TestCase):
+    def test_horse_legs(self):
+        # Mã ở góc (0, 0) chỉ có 2 nước, chân Mã nằm kề theo hướng đi dài
+        moves = {pos: leg for _, leg, pos in HORSE_MOVES[square_of(0, 0)]}
+        self.assertEqual(moves, {(2, 1): square_of(1, 0), (1, 2): square_of(0, 1)})
+        self.assertEqual(HORSE_LEGS[square_of(0, 0)], (1 << square_of(1, 0)) | (1 << square_of(0, 1)))
+
+    def test_elephant_stays_on_home_side(self):
+        # Tượng đỏ ở (5, 2) không được vượt sông lên hàng 3
+        moves = {pos: eye for _, eye, pos in ELEPHANT_MOVES[COLOR_RED][square_of(5, 2)]}
+        self.assertEqual(moves, {(7, 0): square_of(6, 1), (7, 4): square_of(6, 3)})
+
+    def test_advisor_stays_in_palace(self):
+        moves = [pos for _, pos in ADVISOR_MOVES[COLOR_BLACK][square_of(0, 3)]]
+        self.assertEqual(moves, [(1, 4)])
+
+    def test_soldier_after_river(self):
+        before = [pos for _, pos in SOLDIER_MOVES[COLOR_RED][square_of(5, 0)]]
+        after = [pos for _, pos in SOLDIER_MOVES[COLOR_RED][square_of(4, 0)]]
+        self.assertEqual(before, [(4, 0)])
+        self.assertCountEqual(after, [(3, 0), (4, 1)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from utils.timeman import TimeManager, SearchTimeout, allocate_time
+
+class TestTimeManager(unittest.TestCase):
+    def test_allocation_follows_clock(self):
+        soft, hard = allocate_time(900, 0)
+        self.assertGreater(soft, 0)
+        self.assertLessEqual(soft, hard)
+        # Ít thời gian hơn thì ngân sách nhỏ hơn, và không bao giờ vượt một phần tư thời gian còn lại
+        low_soft, low_hard = allocate_time(30, 0)
+        self.assertLess(low_soft, soft)
+        self.assertLessEqual(low_hard, 30 * 0.25)
+        self.assertEqual(allocate_time(0, 10), (0.0, 0.0))
+
+    def test_later_moves_get_more_time_per_move(self):
+        self.assertGreater(allocate_time(300, 50)[0], allocate_time(300, 0)[0])
+
+    def test_check_raises_after_deadline(self):
+        manager = TimeManager(0.0, 0.0, check_interval=4)
+        time.sleep(0.01)
+        with self.assertRaises(SearchTimeout):
+            for _ in range(4):
+                manager.check()
+
+    def test_iteration_decision(self):
+        manager = TimeManager(10.0, 40.0)
+        self.assertTrue(manager.should_start_iteration(0.1))
+        # Lần lặp sau dự kiến vượt giới hạn cứng
+        self.assertFalse(manager.should_start_iteration(20.0))
+        manager.extend(100)
+        self.assertEqual(manager.soft_limit, 40.0)
+
+if __name__ == "__main__":
+    unittest.main()
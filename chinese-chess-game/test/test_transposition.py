@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+from utils.transposition import (
+    TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, ENTRY_BYTES,
+    encode_move, decode_move, entries_for_size
+)
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(size_mb=1)
+
+    def colliding_keys(self, count):
+        """
+        Các khóa khác nhau rơi vào cùng một bucket.
+        """
+        return [12345 + i * self.table.num_entries for i in range(count)]
+
+    def test_move_encoding(self):
+        for move in [((0, 0), (0, 1)), ((9, 8), (0, 0)), ((7, 1), (0, 1))]:
+            self.assertEqual(decode_move(encode_move(move)), move)
+        self.assertIsNone(decode_move(0))
+
+    def test_store_and_probe(self):
+        move = encode_move(((7, 1), (7, 4)))
+        self.table.store(0xDEADBEEF, 5, BOUND_LOWER, -1234, move)
+        self.assertEqual(self.table.probe(0xDEADBEEF), (5, BOUND_LOWER, -1234, move))
+        self.assertIsNone(self.table.probe(0xDEADBEF0))
+
+    def test_size_is_bounded(self):
+        self.assertEqual(self.table.size_bytes, 1024 * 1024)
+        self.assertEqual(entries_for_size(4) * ENTRY_BYTES, 4 * 1024 * 1024)
+        # Ghi rất nhiều khóa không làm bảng lớn lên
+        for key in range(100000):
+            self.table.store(key * 2654435761, 1, BOUND_EXACT, key % 1000)
+        self.assertEqual(len(self.table.buffer), 1024 * 1024)
+
+    def test_same_key_keeps_deeper_bound(self):
+        self.table.store(42, 6, BOUND_LOWER, 100, encode_move(((9, 0), (8, 0))))
+        self.table.store(42, 2, BOUND_UPPER, -50)
+        depth, bound, score, move = self.table.probe(42)
+        self.assertEqual((depth, bound, score), (6, BOUND_LOWER, 100))
+        # Điểm chính xác luôn được ghi, nước đi cũ được giữ nếu không có nước mới
+        self.table.store(42, 3, BOUND_EXACT, 10)
+        self.assertEqual(self.table.probe(42), (3, BOUND_EXACT, 10, move))
+
+    def test_depth_preferred_replacement(self):
+        deep, shallow, newer = self.colliding_keys(3)
+        self.table.store(deep, 8, BOUND_EXACT, 1)
+        self.table.store(shallow, 2, BOUND_EXACT, 2)
+        self.table.store(newer, 1, BOUND_EXACT, 3)
+        # Mục sâu nhất được giữ, mục nông bị thay bởi mục mới
+        self.assertIsNotNone(self.table.probe(deep))
+        self.assertIsNone(self.table.probe(shallow))
+        self.assertIsNotNone(self.table.probe(newer))
+
+    def test_aging_replaces_old_entries(self):
+        deep, other = self.colliding_keys(2)[0], self.colliding_keys(3)[2]
+        self.table.store(deep, 10, BOUND_EXACT, 1)
+        self.table.new_search()
+        self.table.store(other, 1, BOUND_EXACT, 2)
+        self.table.store(self.colliding_keys(4)[3], 1, BOUND_EXACT, 3)
+        # Mục sâu của lần tìm kiếm trước không còn được bảo vệ
+        self.assertIsNone(self.table.probe(deep))
+
+    def test_clear(self):
+        self.table.store(7, 1, BOUND_EXACT, 0)
+        self.table.clear()
+        self.assertIsNone(self.table.probe(7))
+
+if __name__ == "__main__":
+    unittest.main()